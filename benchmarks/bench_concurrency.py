@@ -0,0 +1,276 @@
+"""
+Concurrent read/write benchmark: notebook-style reads during ingestion.
+
+Runs ``run_weather_etl`` for synthetic locations against the fake forecast
+server while reader threads issue ``WeatherQuery.latest_values`` and
+``WeatherQuery.time_series`` calls against the same Postgres (PG*
+environment variables). Reports read latency percentiles per query, lock
+waits sampled from pg_stat_activity, and rows written per second, so
+schema, index and loader changes can be compared on numbers.
+
+Point PGDATABASE at a scratch database: weather_data is truncated first.
+
+    python -m benchmarks.bench_concurrency --locations 2000 --seed-locations 2000 \\
+        --readers 8 --series-ratio 0.8 --pipeline 8,4,2 --output concurrency.json
+"""
+
+import argparse
+import json
+import logging
+import random
+import threading
+import time
+from functools import partial
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import create_engine, text
+
+from benchmarks.bench_etl import db_config_from_env, etl_config, percentile, synthetic_locations
+from benchmarks.fake_server import FakeServerSettings, FakeTomorrowServer
+from tomorrow.db import build_db_url
+from tomorrow.etl import run_weather_etl
+from tomorrow.query import WeatherQuery
+
+# Sessions of this database (other than the sampler) blocked on a
+# heavyweight lock: row/tuple locks, relation locks, ON CONFLICT waits.
+LOCK_SAMPLE_SQL = """
+SELECT
+    COUNT(*) FILTER (WHERE wait_event_type = 'Lock'),
+    COUNT(*) FILTER (WHERE state = 'active')
+FROM pg_stat_activity
+WHERE datname = current_database() AND pid <> pg_backend_pid()
+"""
+
+DEADLOCKS_SQL = "SELECT deadlocks FROM pg_stat_database WHERE datname = current_database()"
+
+
+class Reader(threading.Thread):
+    """Issues latest-value / time-series reads until stopped; records latencies in ms."""
+
+    def __init__(
+        self,
+        query: Any,
+        locations: List[Dict[str, float]],
+        series_ratio: float,
+        stop: threading.Event,
+        seed: int = 0,
+    ):
+        super().__init__(daemon=True)
+        self.query = query
+        self.locations = locations
+        self.series_ratio = series_ratio
+        self.stop = stop
+        self.rng = random.Random(seed)
+        self.latencies: Dict[str, List[float]] = {"latest_values": [], "time_series": []}
+        self.errors = 0
+
+    def read_once(self) -> None:
+        if self.rng.random() < self.series_ratio:
+            kind = "time_series"
+            location = self.rng.choice(self.locations)
+            call = partial(self.query.time_series, location["lat"], location["lon"])
+        else:
+            kind, call = "latest_values", self.query.latest_values
+
+        started = time.perf_counter()
+        try:
+            call()
+        except Exception:
+            self.errors += 1
+            return
+        self.latencies[kind].append((time.perf_counter() - started) * 1000)
+
+    def run(self) -> None:
+        while not self.stop.is_set():
+            self.read_once()
+
+
+class LockSampler(threading.Thread):
+    """Samples lock waiters every ``interval`` seconds on its own connection."""
+
+    def __init__(self, engine: Any, interval: float, stop: threading.Event):
+        super().__init__(daemon=True)
+        self.engine = engine
+        self.interval = interval
+        self.stop = stop
+        self.samples: List[Tuple[int, int]] = []
+
+    def run(self) -> None:
+        with self.engine.connect() as conn:
+            while not self.stop.wait(self.interval):
+                waiting, active = conn.execute(text(LOCK_SAMPLE_SQL)).one()
+                conn.rollback()
+                self.samples.append((waiting, active))
+
+
+def summarize(
+    latencies: Dict[str, List[float]],
+    lock_samples: List[Tuple[int, int]],
+    sample_interval: float,
+    rows_written: int,
+    wall: float,
+    read_errors: int = 0,
+    deadlocks: int = 0,
+) -> Dict[str, Any]:
+    """Flatten one run's measurements into the reported metrics."""
+    result: Dict[str, Any] = {}
+    total_reads = 0
+    for kind, values in latencies.items():
+        total_reads += len(values)
+        result[kind] = {
+            "reads": len(values),
+            "p50_ms": round(percentile(values, 50), 2),
+            "p95_ms": round(percentile(values, 95), 2),
+            "p99_ms": round(percentile(values, 99), 2),
+            "max_ms": round(max(values), 2) if values else float("nan"),
+        }
+
+    waiting = [w for w, _ in lock_samples]
+    result.update(
+        {
+            "reads_per_s": round(total_reads / wall, 1) if wall else 0.0,
+            "read_errors": read_errors,
+            "lock_wait_samples": sum(1 for w in waiting if w),
+            "lock_samples": len(waiting),
+            "max_lock_waiters": max(waiting, default=0),
+            "max_active_sessions": max((a for _, a in lock_samples), default=0),
+            # Waiting sessions x sampling interval: an estimate of the
+            # total time sessions spent blocked on locks.
+            "lock_wait_s_est": round(sum(waiting) * sample_interval, 2),
+            "deadlocks": deadlocks,
+            "rows_written": rows_written,
+            "write_rows_per_s": round(rows_written / wall, 1) if wall else 0.0,
+            "wall_s": round(wall, 3),
+        }
+    )
+    return result
+
+
+def _count_and_deadlocks(engine: Any) -> Tuple[int, int]:
+    with engine.connect() as conn:
+        rows = conn.execute(text("SELECT COUNT(*) FROM weather_data")).scalar_one()
+        deadlocks = conn.execute(text(DEADLOCKS_SQL)).scalar_one()
+    return rows, deadlocks
+
+
+def run(
+    locations: int,
+    seed_locations: int,
+    readers: int,
+    series_ratio: float,
+    sample_interval: float,
+    settings: FakeServerSettings,
+    pipeline: Optional[Dict[str, int]] = None,
+) -> Dict[str, Any]:
+    """Seed, then load ``locations`` new points with ``readers`` concurrent readers."""
+    db_config = db_config_from_env()
+    engine = create_engine(build_db_url(db_config), future=True)
+    with engine.begin() as conn:
+        conn.execute(text("TRUNCATE TABLE weather_data RESTART IDENTITY"))
+
+    points = synthetic_locations(seed_locations + locations)
+    seeded, loaded = points[:seed_locations], points[seed_locations:]
+    stop = threading.Event()
+
+    with FakeTomorrowServer(settings) as server:
+        if seeded:
+            run_weather_etl(etl_config(server.base_url, db_config, seeded, pipeline))
+        rows_before, deadlocks_before = _count_and_deadlocks(engine)
+
+        queries = [WeatherQuery(db_config) for _ in range(readers)]
+        workers = [
+            # Readers target the whole grid: seeded points have data from the
+            # start, the rest fill in while the load runs.
+            Reader(query, points, series_ratio, stop, seed=i)
+            for i, query in enumerate(queries)
+        ]
+        sampler = LockSampler(engine, sample_interval, stop)
+
+        for worker in workers:
+            worker.start()
+        sampler.start()
+        wall_start = time.perf_counter()
+        try:
+            run_weather_etl(etl_config(server.base_url, db_config, loaded, pipeline))
+        finally:
+            wall = time.perf_counter() - wall_start
+            stop.set()
+            for worker in workers + [sampler]:
+                worker.join()
+            for query in queries:
+                query.close()
+
+    rows_after, deadlocks_after = _count_and_deadlocks(engine)
+    engine.dispose()
+
+    latencies: Dict[str, List[float]] = {"latest_values": [], "time_series": []}
+    for worker in workers:
+        for kind, values in worker.latencies.items():
+            latencies[kind].extend(values)
+
+    result = summarize(
+        latencies,
+        sampler.samples,
+        sample_interval,
+        rows_after - rows_before,
+        wall,
+        read_errors=sum(w.errors for w in workers),
+        deadlocks=deadlocks_after - deadlocks_before,
+    )
+    result.update(
+        {
+            "locations": locations,
+            "seed_locations": seed_locations,
+            "readers": readers,
+            "pipeline": pipeline,
+        }
+    )
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--locations", type=int, default=1000,
+                        help="Locations loaded while the readers run")
+    parser.add_argument("--seed-locations", type=int, default=1000,
+                        help="Locations loaded before the measured run")
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--series-ratio", type=float, default=0.8,
+                        help="Share of reads that are time-series (rest: latest values)")
+    parser.add_argument("--sample-ms", type=float, default=50.0,
+                        help="pg_stat_activity lock sampling interval")
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--pipeline", metavar="FETCH,PARSE,LOAD",
+                        help="Run the staged pipeline with these worker counts")
+    parser.add_argument("--output", help="Write the result as JSON")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+
+    pipeline = None
+    if args.pipeline:
+        fetch_workers, parse_workers, load_workers = (int(n) for n in args.pipeline.split(","))
+        pipeline = {
+            "fetch_workers": fetch_workers,
+            "parse_workers": parse_workers,
+            "load_workers": load_workers,
+        }
+
+    result = run(
+        args.locations,
+        args.seed_locations,
+        args.readers,
+        args.series_ratio,
+        args.sample_ms / 1000,
+        FakeServerSettings(latency_ms=args.latency_ms),
+        pipeline,
+    )
+    print(json.dumps(result, indent=2))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+"""
+End-to-end ETL benchmark against the local fake Tomorrow.io server.
+
+Runs ``run_weather_etl`` for synthetic location sets (10 / 1k / 10k points by
+default) against the fake forecast server and the Postgres described by the
+PG* environment variables, and reports throughput, p50/p99 per-location
+latency and peak memory. Each size runs in a fresh process so peak RSS is
+not inherited from the previous run.
+
+Point PGDATABASE at a scratch database: weather_data is truncated before
+every run.
+
+    python -m benchmarks.bench_etl --sizes 10,1000 --latency-ms 50 \\
+        --output bench_output.json --baseline bench_baseline.json
+"""
+
+import argparse
+import json
+import logging
+import os
+import resource
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import create_engine, text
+
+from benchmarks.fake_server import FakeServerSettings, FakeTomorrowServer
+from tomorrow.api import TomorrowAPIClient
+from tomorrow.db import WeatherDB, build_db_url
+from tomorrow.etl import run_weather_etl
+
+# Metrics where higher is worse; used for --baseline comparisons.
+REGRESSION_METRICS = ("p50_ms", "p99_ms", "peak_rss_mb")
+
+
+def synthetic_locations(count: int) -> List[Dict[str, float]]:
+    """Unique points on a 0.01° grid starting at 25.0, -98.0."""
+    side = max(int(count ** 0.5), 1)
+    return [
+        {"lat": round(25.0 + (i // side) * 0.01, 4), "lon": round(-98.0 + (i % side) * 0.01, 4)}
+        for i in range(count)
+    ]
+
+
+def db_config_from_env() -> Dict[str, str]:
+    return {
+        "host": os.getenv("PGHOST", "localhost"),
+        "port": os.getenv("PGPORT", "5432"),
+        "user": os.getenv("PGUSER", "postgres"),
+        "password": os.getenv("PGPASSWORD", "postgres"),
+        "database": os.getenv("PGDATABASE", "tomorrow_bench"),
+    }
+
+
+def etl_config(
+    base_url: str,
+    db_config: Dict[str, str],
+    locations: List[Dict[str, float]],
+    pipeline: Optional[Dict[str, int]] = None,
+) -> Dict[str, Any]:
+    """run_weather_etl config pointed at the fake server."""
+    config: Dict[str, Any] = {
+        "api": {
+            "base_url": base_url,
+            "forecast_endpoint": "/v4/weather/forecast",
+            "fields": ["temperature", "windSpeed", "humidity", "precipitationType"],
+            "timesteps": ["1h"],
+            "units": "imperial",
+            "timeout_seconds": 15,
+            "max_retries": 3,
+            "retry_backoff_seconds": 0,
+            "key": "bench",
+        },
+        "db": db_config,
+        "locations": locations,
+        "rate_limit_sleep_seconds": 0,
+    }
+    if pipeline:
+        config["pipeline"] = pipeline
+    return config
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def run_once(
+    size: int,
+    settings: FakeServerSettings,
+    trace_memory: bool,
+    pipeline: Optional[Dict[str, int]] = None,
+) -> Dict[str, Any]:
+    """Run one ETL pass for ``size`` locations; executed in a child process."""
+    logging.basicConfig(level=logging.WARNING)
+
+    db_config = db_config_from_env()
+    engine = create_engine(build_db_url(db_config), future=True)
+    with engine.begin() as conn:
+        conn.execute(text("TRUNCATE TABLE weather_data RESTART IDENTITY"))
+    engine.dispose()
+
+    started: Dict[str, float] = {}
+    latencies: List[float] = []
+
+    # fetch_raw is shared by the sequential path and the staged pipeline.
+    fetch = TomorrowAPIClient.fetch_raw
+    insert = WeatherDB.bulk_insert_weather_data
+
+    def timed_fetch(self, lat, lon):
+        started[f"{lat},{lon}"] = time.perf_counter()
+        return fetch(self, lat, lon)
+
+    def timed_insert(self, rows):
+        result = insert(self, rows)
+        if rows:
+            key = f"{rows[0]['latitude']},{rows[0]['longitude']}"
+            latencies.append((time.perf_counter() - started[key]) * 1000)
+        return result
+
+    TomorrowAPIClient.fetch_raw = timed_fetch
+    WeatherDB.bulk_insert_weather_data = timed_insert
+
+    with FakeTomorrowServer(settings) as server:
+        config = etl_config(server.base_url, db_config, synthetic_locations(size), pipeline)
+
+        if trace_memory:
+            tracemalloc.start()
+        wall_start = time.perf_counter()
+        records = run_weather_etl(config)
+        wall = time.perf_counter() - wall_start
+        traced_peak = tracemalloc.get_traced_memory()[1] if trace_memory else 0
+
+    # ru_maxrss is KiB on Linux.
+    peak_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+    return {
+        "locations": size,
+        "pipeline": pipeline,
+        "loaded_locations": len(latencies),
+        "records": records,
+        "wall_s": round(wall, 3),
+        "records_per_s": round(records / wall, 1) if wall else 0.0,
+        "locations_per_s": round(len(latencies) / wall, 2) if wall else 0.0,
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+        "peak_rss_mb": round(peak_rss_mb, 1),
+        "peak_traced_mb": round(traced_peak / 1024 / 1024, 1),
+    }
+
+
+def compare(results: List[Dict[str, Any]], baseline_path: str, tolerance: float) -> List[str]:
+    """Return a message for every metric that regressed beyond ``tolerance``."""
+    with open(baseline_path) as f:
+        baseline = {r["locations"]: r for r in json.load(f)}
+
+    regressions = []
+    for result in results:
+        base = baseline.get(result["locations"])
+        if not base:
+            continue
+        for metric in REGRESSION_METRICS:
+            if base[metric] and result[metric] > base[metric] * (1 + tolerance):
+                regressions.append(
+                    f"{result['locations']} locations: {metric} "
+                    f"{base[metric]} -> {result[metric]}"
+                )
+        if result["records_per_s"] < base["records_per_s"] * (1 - tolerance):
+            regressions.append(
+                f"{result['locations']} locations: records_per_s "
+                f"{base['records_per_s']} -> {result['records_per_s']}"
+            )
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", default="10,1000,10000")
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--latency-jitter-ms", type=float, default=10.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--extra-fields", type=int, default=0)
+    parser.add_argument("--trace-memory", action="store_true",
+                        help="Also report tracemalloc peak (slower)")
+    parser.add_argument("--pipeline", metavar="FETCH,PARSE,LOAD",
+                        help="Run the staged pipeline with these worker counts")
+    parser.add_argument("--output", help="Write results as JSON")
+    parser.add_argument("--baseline", help="Fail if results regress against this JSON")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    settings = FakeServerSettings(
+        latency_ms=args.latency_ms,
+        latency_jitter_ms=args.latency_jitter_ms,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        extra_fields=args.extra_fields,
+    )
+
+    pipeline = None
+    if args.pipeline:
+        fetch_workers, parse_workers, load_workers = (int(n) for n in args.pipeline.split(","))
+        pipeline = {
+            "fetch_workers": fetch_workers,
+            "parse_workers": parse_workers,
+            "load_workers": load_workers,
+        }
+
+    results = []
+    for size in (int(s) for s in args.sizes.split(",")):
+        with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as pool:
+            result = pool.submit(run_once, size, settings, args.trace_memory, pipeline).result()
+        results.append(result)
+        print(json.dumps(result))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        regressions = compare(results, args.baseline, args.tolerance)
+        for message in regressions:
+            print(f"REGRESSION: {message}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+"""
+Index benchmark for the read queries in tomorrow.query.
+
+Builds a synthetic ``bench.weather_data`` table (10M rows by default) in the
+database described by the PG* environment variables, then for the baseline
+and the tuned index layouts prints the EXPLAIN (ANALYZE, BUFFERS) plan and
+p50/p95 latency of each prepared read statement.
+
+    python -m benchmarks.bench_indexes --rows 10000000 --locations 2000
+"""
+
+import argparse
+import os
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Sequence
+
+from sqlalchemy import create_engine
+
+from tomorrow.db import build_db_url
+from tomorrow.query import PREPARED_STATEMENTS
+from tomorrow.schema import INDEXES, SUPERSEDED_INDEXES, TABLE_SETTINGS
+
+SCHEMA = "bench"
+
+BASELINE_INDEXES = [
+    "CREATE INDEX idx_weather_location_time "
+    "ON weather_data (latitude, longitude, time_stamp DESC)",
+]
+
+TUNED_INDEXES = [
+    f"CREATE INDEX {name} {definition.strip()}" for name, definition in INDEXES
+]
+
+TABLE_DDL = """
+CREATE TABLE weather_data (
+    id BIGSERIAL PRIMARY KEY,
+    ingestion_timestamp TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    latitude NUMERIC(10,6) NOT NULL,
+    longitude NUMERIC(10,6) NOT NULL,
+    time_stamp TIMESTAMPTZ NOT NULL,
+    is_forecast BOOLEAN NOT NULL,
+    temperature NUMERIC,
+    wind_speed NUMERIC,
+    humidity NUMERIC,
+    precipitation_type INTEGER,
+    CONSTRAINT uq_weather_unique
+        UNIQUE (latitude, longitude, time_stamp, is_forecast)
+)
+"""
+
+# Observed rows for every past hour plus forecast rows for the next 120
+# hours, mirroring what hourly scrapes of the -24h..+5d window accumulate.
+LOAD_SQL = """
+INSERT INTO weather_data (
+    latitude, longitude, time_stamp, is_forecast,
+    temperature, wind_speed, humidity, precipitation_type
+)
+SELECT
+    25.0 + (loc / 100) * 0.02,
+    -98.0 + (loc % 100) * 0.02,
+    CASE WHEN f.is_forecast
+        THEN %(end)s + make_interval(hours => h)
+        ELSE %(end)s - make_interval(hours => h)
+    END,
+    f.is_forecast,
+    round((20 + 10 * random())::numeric, 2),
+    round((15 * random())::numeric, 2),
+    round((100 * random())::numeric, 2),
+    (random() * 3)::int
+FROM generate_series(0, %(locations)s - 1) AS loc
+CROSS JOIN generate_series(0, %(hours)s - 1) AS h
+CROSS JOIN (VALUES (FALSE), (TRUE)) AS f(is_forecast)
+WHERE NOT f.is_forecast OR h < 120
+"""
+
+
+def _connect(db_config: Dict[str, Any]):
+    engine = create_engine(build_db_url(db_config), future=True)
+    conn = engine.raw_connection()
+    conn.autocommit = True
+    cursor = conn.cursor()
+    cursor.execute(f"CREATE SCHEMA IF NOT EXISTS {SCHEMA}")
+    cursor.execute(f"SET search_path TO {SCHEMA}")
+    return engine, conn, cursor
+
+
+def load(cursor, rows: int, locations: int) -> datetime:
+    end = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+    hours = max(rows // locations - 120, 1)
+
+    cursor.execute("DROP TABLE IF EXISTS weather_data")
+    cursor.execute(TABLE_DDL)
+    cursor.execute(TABLE_SETTINGS)
+
+    started = time.perf_counter()
+    cursor.execute(LOAD_SQL, {"end": end, "locations": locations, "hours": hours})
+    print(f"Loaded {cursor.rowcount:,} rows in {time.perf_counter() - started:.1f}s")
+    return end
+
+
+def use_layout(cursor, statements: Sequence[str]) -> None:
+    for name in [n for n, _ in INDEXES] + SUPERSEDED_INDEXES:
+        cursor.execute(f"DROP INDEX IF EXISTS {name}")
+    for statement in statements:
+        cursor.execute(statement)
+    cursor.execute("VACUUM ANALYZE weather_data")
+
+
+def bench_queries(cursor, now: datetime, repeat: int) -> None:
+    cursor.execute("DEALLOCATE ALL")
+    for name, (arg_types, sql) in PREPARED_STATEMENTS.items():
+        cursor.execute(f"PREPARE {name}{arg_types} AS {sql}")
+
+    lat, lon = 25.2, -97.5
+    cases: List[tuple] = [
+        ("tomorrow_latest_values", ()),
+        (
+            "tomorrow_time_series",
+            (lat, lon, now - timedelta(hours=24), now + timedelta(days=5)),
+        ),
+        (
+            "tomorrow_window_aggregates",
+            (lat, lon, now - timedelta(days=90), now, "day"),
+        ),
+    ]
+
+    for name, params in cases:
+        placeholders = "(" + ", ".join(["%s"] * len(params)) + ")" if params else ""
+        execute = f"EXECUTE {name}{placeholders}"
+
+        cursor.execute(f"EXPLAIN (ANALYZE, BUFFERS) {execute}", params)
+        plan = "\n".join(f"    {row[0]}" for row in cursor.fetchall())
+
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            cursor.execute(execute, params)
+            cursor.fetchall()
+            timings.append((time.perf_counter() - started) * 1000)
+
+        timings.sort()
+        p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+        print(f"\n  {name}: p50={statistics.median(timings):.2f}ms p95={p95:.2f}ms")
+        print(plan)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--locations", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument(
+        "--skip-load", action="store_true", help="Reuse the existing bench table"
+    )
+    args = parser.parse_args()
+
+    db_config = {
+        "host": os.getenv("PGHOST", "localhost"),
+        "port": os.getenv("PGPORT", "5432"),
+        "user": os.getenv("PGUSER", "postgres"),
+        "password": os.getenv("PGPASSWORD", "postgres"),
+        "database": os.getenv("PGDATABASE", "tomorrow"),
+    }
+
+    engine, conn, cursor = _connect(db_config)
+    try:
+        if args.skip_load:
+            cursor.execute("SELECT MAX(time_stamp) FROM weather_data WHERE NOT is_forecast")
+            now = cursor.fetchone()[0]
+        else:
+            now = load(cursor, args.rows, args.locations)
+
+        for label, statements in (
+            ("baseline", BASELINE_INDEXES),
+            ("tuned", TUNED_INDEXES),
+        ):
+            print(f"\n=== {label} index layout ===")
+            use_layout(cursor, statements)
+            bench_queries(cursor, now, args.repeat)
+    finally:
+        cursor.close()
+        conn.close()
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""
+Local stand-in for the Tomorrow.io v4 forecast endpoint.
+
+Serves deterministic hourly timelines for any ``location`` between the
+requested ``startTime`` and ``endTime`` with configurable latency, payload
+size and error/429 rates, so the ETL can be exercised without the network.
+"""
+
+import gzip
+import json
+import random
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+FORECAST_PATH = "/v4/weather/forecast"
+
+
+@dataclass
+class FakeServerSettings:
+    latency_ms: float = 0.0
+    latency_jitter_ms: float = 0.0
+    error_rate: float = 0.0
+    rate_limit_rate: float = 0.0
+    # Extra numeric fields per interval to inflate the payload.
+    extra_fields: int = 0
+    # gzip responses when the client accepts it.
+    compress: bool = True
+    seed: int = 42
+
+
+def _parse_time(value: str) -> datetime:
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+def build_timeline(
+    location: str,
+    start: datetime,
+    end: datetime,
+    extra_fields: int = 0,
+    fields: Optional[List[str]] = None,
+) -> Dict[str, Any]:
+    """
+    Hourly timeline shaped like the real forecast response. With ``fields``
+    only those core fields are returned (the synthetic extra fields always are).
+    """
+    rng = random.Random(location)
+    hour = start.replace(minute=0, second=0, microsecond=0)
+
+    intervals: List[Dict[str, Any]] = []
+    while hour <= end:
+        values = {
+            "temperature": round(20 + 10 * rng.random(), 2),
+            "windSpeed": round(15 * rng.random(), 2),
+            "humidity": round(100 * rng.random(), 2),
+            "precipitationType": rng.randint(0, 2),
+        }
+        if fields is not None:
+            values = {k: v for k, v in values.items() if k in fields}
+        for i in range(extra_fields):
+            values[f"extraField{i}"] = round(rng.random(), 4)
+
+        intervals.append(
+            {"time": hour.isoformat().replace("+00:00", "Z"), "values": values}
+        )
+        hour += timedelta(hours=1)
+
+    return {"timelines": {"hourly": intervals}}
+
+
+class FakeTomorrowHandler(BaseHTTPRequestHandler):
+    settings: FakeServerSettings
+    rng: random.Random
+    lock: threading.Lock
+
+    def do_GET(self) -> None:
+        url = urlparse(self.path)
+        params = {k: v[0] for k, v in parse_qs(url.query).items()}
+
+        with self.lock:
+            roll = self.rng.random()
+            jitter = self.rng.uniform(0, self.settings.latency_jitter_ms)
+
+        delay = (self.settings.latency_ms + jitter) / 1000
+        if delay:
+            time.sleep(delay)
+
+        if url.path != FORECAST_PATH:
+            self._send(404, {"message": "not found"})
+        elif roll < self.settings.rate_limit_rate:
+            self._send(429, {"message": "rate limit exceeded"})
+        elif roll < self.settings.rate_limit_rate + self.settings.error_rate:
+            self._send(503, {"message": "service unavailable"})
+        else:
+            self._send(
+                200,
+                build_timeline(
+                    params.get("location", "0,0"),
+                    _parse_time(params["startTime"]),
+                    _parse_time(params["endTime"]),
+                    self.settings.extra_fields,
+                    params["fields"].split(",") if "fields" in params else None,
+                ),
+            )
+
+    def _send(self, status: int, payload: Dict[str, Any]) -> None:
+        body = json.dumps(payload).encode()
+        compress = self.settings.compress and "gzip" in self.headers.get("Accept-Encoding", "")
+        if compress:
+            body = gzip.compress(body, compresslevel=5)
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        if compress:
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+class FakeTomorrowServer:
+    """Threaded fake forecast server; use as a context manager."""
+
+    def __init__(self, settings: FakeServerSettings = None, host: str = "127.0.0.1"):
+        self.settings = settings or FakeServerSettings()
+        handler = type(
+            "BoundFakeTomorrowHandler",
+            (FakeTomorrowHandler,),
+            {
+                "settings": self.settings,
+                "rng": random.Random(self.settings.seed),
+                "lock": threading.Lock(),
+            },
+        )
+        self.httpd = ThreadingHTTPServer((host, 0), handler)
+        self.httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self) -> "FakeTomorrowServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        self._thread.join()
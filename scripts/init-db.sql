@@ -9,9 +9,102 @@ CREATE TABLE IF NOT EXISTS weather_data (
     wind_speed NUMERIC,
     humidity NUMERIC,
     precipitation_type INTEGER,
+    -- Requested API fields without a dedicated column, keyed by API name
+    -- (see tomorrow/fields.py).
+    extra JSONB,
     CONSTRAINT uq_weather_unique
         UNIQUE (latitude, longitude, time_stamp, is_forecast)
 );
 
-CREATE INDEX IF NOT EXISTS idx_weather_location_time
-ON weather_data (latitude, longitude, time_stamp DESC);
+-- Insert-mostly table: vacuum after inserts so index-only scans stay index-only.
+ALTER TABLE weather_data SET (
+    autovacuum_vacuum_insert_scale_factor = 0.05,
+    autovacuum_analyze_scale_factor = 0.05
+);
+
+-- Latest observation per location (index-only scan of observed rows).
+-- Keep in sync with tomorrow/schema.py.
+CREATE INDEX IF NOT EXISTS idx_weather_observed_latest
+ON weather_data (latitude, longitude, time_stamp DESC)
+INCLUDE (temperature, wind_speed, humidity, precipitation_type)
+WHERE NOT is_forecast;
+
+-- Hourly series / windowed aggregates for one location (index-only range scan).
+CREATE INDEX IF NOT EXISTS idx_weather_location_series
+ON weather_data (latitude, longitude, time_stamp)
+INCLUDE (is_forecast, temperature, wind_speed, humidity, precipitation_type);
+
+-- Rows ingested since the last Parquet export (tomorrow/export.py). BRIN:
+-- ingestion_timestamp follows insertion order. Keep in sync with tomorrow/schema.py.
+CREATE INDEX IF NOT EXISTS idx_weather_ingestion_brin
+ON weather_data USING brin (ingestion_timestamp);
+
+-- Daily per-location aggregates, refreshed by the ETL for the days each load
+-- touches. Keep in sync with tomorrow/schema.py.
+CREATE TABLE IF NOT EXISTS weather_daily_rollup (
+    latitude NUMERIC(10,6) NOT NULL,
+    longitude NUMERIC(10,6) NOT NULL,
+    day DATE NOT NULL,
+    is_forecast BOOLEAN NOT NULL,
+    hours INTEGER NOT NULL,
+    temperature_min NUMERIC,
+    temperature_max NUMERIC,
+    temperature_mean NUMERIC,
+    wind_speed_min NUMERIC,
+    wind_speed_max NUMERIC,
+    wind_speed_mean NUMERIC,
+    humidity_min NUMERIC,
+    humidity_max NUMERIC,
+    humidity_mean NUMERIC,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (latitude, longitude, day, is_forecast)
+);
+
+-- Every location that has been loaded, with a GiST point index so
+-- "weather at an arbitrary point" maps to the nearest ingested location.
+CREATE TABLE IF NOT EXISTS weather_locations (
+    latitude NUMERIC(10,6) NOT NULL,
+    longitude NUMERIC(10,6) NOT NULL,
+    first_loaded_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (latitude, longitude)
+);
+
+CREATE INDEX IF NOT EXISTS idx_weather_locations_point
+ON weather_locations USING gist (point(longitude::float8, latitude::float8));
+
+-- Per-run and per-location ETL audit (rows sent vs inserted, bytes fetched,
+-- stage timings). Keep in sync with tomorrow/audit.py.
+CREATE TABLE IF NOT EXISTS etl_runs (
+    run_id BIGSERIAL PRIMARY KEY,
+    trace_id TEXT,
+    started_at TIMESTAMPTZ NOT NULL,
+    finished_at TIMESTAMPTZ NOT NULL,
+    status TEXT NOT NULL,
+    locations INTEGER NOT NULL,
+    failed_locations INTEGER NOT NULL,
+    rows_sent BIGINT NOT NULL,
+    rows_inserted BIGINT NOT NULL,
+    bytes_fetched BIGINT NOT NULL,
+    fetch_ms DOUBLE PRECISION NOT NULL,
+    parse_ms DOUBLE PRECISION NOT NULL,
+    load_ms DOUBLE PRECISION NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS etl_location_runs (
+    run_id BIGINT NOT NULL REFERENCES etl_runs (run_id) ON DELETE CASCADE,
+    latitude NUMERIC(10,6) NOT NULL,
+    longitude NUMERIC(10,6) NOT NULL,
+    started_at TIMESTAMPTZ NOT NULL,
+    status TEXT NOT NULL,
+    error TEXT,
+    rows_sent INTEGER NOT NULL,
+    rows_inserted INTEGER NOT NULL,
+    bytes_fetched BIGINT NOT NULL,
+    fetch_ms DOUBLE PRECISION,
+    parse_ms DOUBLE PRECISION,
+    load_ms DOUBLE PRECISION,
+    total_ms DOUBLE PRECISION NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_etl_location_runs_location
+ON etl_location_runs (latitude, longitude, started_at);
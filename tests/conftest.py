@@ -1,3 +1,4 @@
+import json
 import os
 import sys
 from unittest.mock import MagicMock
@@ -136,7 +137,10 @@ def mock_get_request(status_code, json_data=None):
     """Create a mock HTTP response with proper HTTPError behavior."""
     mock_resp = MagicMock()
     mock_resp.status_code = status_code
-    mock_resp.json.return_value = json_data or {}
+    body = json.dumps(json_data or {}).encode()
+    mock_resp.iter_content.return_value = [body]
+    mock_resp.raw.tell.return_value = len(body)
+    mock_resp.headers = {}
 
     if status_code >= 400:
         error = requests.exceptions.HTTPError(f"Mock HTTP {status_code}")
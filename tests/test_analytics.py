@@ -0,0 +1,53 @@
+import sys
+from unittest.mock import patch
+
+import pytest
+
+from tomorrow.analytics import AnalyticsStore, sync_analytics
+from tomorrow.etl import run_weather_etl
+
+
+def test_sync_analytics_runs_incremental_export(app_config):
+    config = dict(app_config, export={"path": "/data/export", "lag_seconds": 0})
+
+    with patch("tomorrow.analytics.export_weather_data") as mock_export:
+        mock_export.return_value = {"rows": 7}
+        assert sync_analytics(config) == 7
+
+    args, kwargs = mock_export.call_args
+    assert args == (app_config["db"], "/data/export")
+    assert kwargs["lag_seconds"] == 0
+
+
+def test_sync_failure_is_only_logged(app_config):
+    """An export error never escapes the scheduler's analytics job."""
+
+    with patch("tomorrow.analytics.export_weather_data") as mock_export:
+        mock_export.side_effect = RuntimeError("disk full")
+
+        assert sync_analytics(app_config) == 0
+
+    mock_export.assert_called_once()
+
+
+def test_etl_run_does_not_export(app_config):
+    """The export is a separate scheduled job, not a tail of every ETL run."""
+
+    config = dict(app_config, analytics={"enabled": True})
+
+    with patch("tomorrow.etl.TomorrowAPIClient") as mock_api_cls, \
+         patch("tomorrow.etl.WeatherDB"), \
+         patch("tomorrow.analytics.export_weather_data") as mock_export:
+        mock_api_cls.return_value.fetch_weather_data.return_value = [
+            {"time_stamp": "2025-12-15T14:00:00Z", "is_forecast": False}
+        ]
+
+        assert run_weather_etl(config) == 2
+
+    mock_export.assert_not_called()
+
+
+def test_store_requires_duckdb(tmp_path):
+    with patch.dict(sys.modules, {"duckdb": None}):
+        with pytest.raises(RuntimeError, match="duckdb"):
+            AnalyticsStore(str(tmp_path))
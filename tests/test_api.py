@@ -1,9 +1,13 @@
+import io
+import json
+
 import pytest
 import requests
 from unittest.mock import patch, MagicMock
 from datetime import datetime, timezone
 
-from tomorrow.api import TomorrowAPIClient
+from tomorrow.api import TomorrowAPIClient, accept_encoding, parse_weather_response
+from tomorrow.circuit import CircuitBreaker, CircuitOpenError
 
 
 MOCK_NOW = datetime(2025, 12, 15, 15, 0, tzinfo=timezone.utc)
@@ -13,7 +17,10 @@ def mock_get_request(status_code, json_data=None):
     """Create a mock HTTP response with proper HTTPError behavior."""
     mock_resp = MagicMock()
     mock_resp.status_code = status_code
-    mock_resp.json.return_value = json_data or {}
+    body = json.dumps(json_data or {}).encode()
+    mock_resp.iter_content.return_value = [body]
+    mock_resp.raw.tell.return_value = len(body)
+    mock_resp.headers = {}
 
     if status_code >= 400:
         error = requests.exceptions.HTTPError(f"Mock HTTP {status_code}")
@@ -122,6 +129,39 @@ class TestTomorrowAPIClient:
         assert mock_get.call_count == 1
 
 
+    def test_real_error_response_is_retried(self, mock_get, app_config):
+        """requests.Response is falsy for 5xx; the status must still be read."""
+
+        error_response = requests.Response()
+        error_response.status_code = 503
+        error_response.raw = io.BytesIO()
+        ok = mock_get_request(200, {"timelines": {"hourly": []}})
+        mock_get.side_effect = [error_response, ok]
+
+        client = TomorrowAPIClient(app_config["api"])
+
+        with patch("time.sleep"):
+            assert client.fetch_weather_data(25.9, -97.4) == []
+
+        assert mock_get.call_count == 2
+
+
+    def test_open_circuit_fails_fast(self, mock_get, app_config):
+        """5xx responses trip the shared breaker; later calls skip the network."""
+
+        mock_get.return_value = mock_get_request(503)
+        breaker = CircuitBreaker(failure_rate=0.5, min_requests=2, open_seconds=60)
+        client = TomorrowAPIClient(app_config["api"], breaker=breaker)
+
+        with patch("time.sleep"), pytest.raises(CircuitOpenError):
+            client.fetch_weather_data(25.9, -97.4)
+        assert mock_get.call_count == 2
+
+        with pytest.raises(CircuitOpenError):
+            client.fetch_weather_data(25.8, -97.5)
+        assert mock_get.call_count == 2
+
+
     def test_retry_exhaustion_raises(self, mock_get, app_config):
         """All retries exhausted → exception is raised."""
 
@@ -137,3 +177,49 @@ class TestTomorrowAPIClient:
             client.fetch_weather_data(25.9, -97.4)
 
         assert mock_get.call_count == app_config["api"]["max_retries"]
+
+
+def test_cadences_pick_fields_and_window(app_config):
+    api_config = {
+        **app_config["api"],
+        "cadences": [
+            {"fields": ["temperature", "windSpeed"], "every_hours": 1, "horizon_hours": 48},
+            {"fields": ["humidity", "temperature"], "every_hours": 6, "horizon_hours": 120},
+        ],
+    }
+    client = TomorrowAPIClient(api_config)
+
+    # MOCK_NOW is 15:00 UTC: only the hourly cadence is due.
+    assert client.request_window(MOCK_NOW) == ("temperature,windSpeed", 24, 48)
+    six_am = MOCK_NOW.replace(hour=6)
+    assert client.request_window(six_am) == ("temperature,windSpeed,humidity", 24, 120)
+
+    plain = TomorrowAPIClient(app_config["api"])
+    assert plain.request_window(MOCK_NOW) == (
+        "temperature,windSpeed,humidity,precipitationType", 24, 120,
+    )
+    assert plain.session.headers["Accept-Encoding"] == accept_encoding()
+    assert "gzip" in accept_encoding()
+
+
+def test_parse_keeps_extra_requested_fields():
+    """Fields without a dedicated column are kept for the extra JSONB column."""
+
+    raw = {
+        "timelines": {
+            "hourly": [
+                {
+                    "time": "2025-12-15T16:00:00Z",
+                    "values": {"temperature": 16.0, "dewPoint": 9.1, "uvIndex": 2},
+                }
+            ]
+        }
+    }
+
+    (record,) = parse_weather_response(raw, MOCK_NOW, "25.9,-97.4")
+
+    assert record["temperature"] == 16.0
+    assert record["wind_speed"] is None
+    assert record["extra"] == {"dewPoint": 9.1, "uvIndex": 2}
+    assert record["is_forecast"] is True
+
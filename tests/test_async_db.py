@@ -0,0 +1,176 @@
+import json
+import sys
+import threading
+from datetime import datetime, timezone
+from decimal import Decimal
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from tomorrow.async_db import AsyncLoader, STAGE_TABLE
+from tomorrow.watermark import ALL_WATERMARKS_SQL, WATERMARK_ASYNC_SQL, LoadWatermarks
+
+
+ROWS = [
+    {
+        "latitude": 25.9,
+        "longitude": -97.4,
+        "time_stamp": datetime(2025, 12, 15, 10, tzinfo=timezone.utc),
+        "is_forecast": False,
+        "temperature": 10.5,
+        "wind_speed": 3.1,
+        "humidity": 50,
+        "precipitation_type": 0,
+        "extra": {"dewPoint": 4.2},
+    },
+    {
+        "latitude": 25.9,
+        "longitude": -97.4,
+        "time_stamp": datetime(2025, 12, 15, 11, tzinfo=timezone.utc),
+        "is_forecast": True,
+        "temperature": 11.0,
+        "wind_speed": 3.5,
+        "humidity": 52,
+        "precipitation_type": 0,
+        "extra": None,
+    },
+]
+
+COLUMNS = [
+    "id", "latitude", "longitude", "time_stamp", "is_forecast", "temperature",
+    "wind_speed", "humidity", "precipitation_type", "extra",
+]
+
+
+@pytest.fixture
+def mock_conn():
+    conn = MagicMock()
+    conn.fetch = AsyncMock(return_value=[{"column_name": c} for c in COLUMNS])
+    conn.fetchval = AsyncMock(return_value=True)
+    conn.execute = AsyncMock(
+        side_effect=lambda sql, *args: "INSERT 0 1" if sql.startswith("INSERT") else "SELECT 0"
+    )
+    conn.copy_records_to_table = AsyncMock()
+    conn.executemany = AsyncMock()
+
+    pool = MagicMock()
+    pool.acquire.return_value.__aenter__.return_value = conn
+    pool.close = AsyncMock()
+
+    with patch("tomorrow.async_db._create_pool", AsyncMock(return_value=pool)):
+        yield conn
+
+
+def test_bulk_insert_copies_into_stage(app_config, mock_conn):
+    """Rows go through binary COPY into the staging table, then ON CONFLICT DO NOTHING."""
+
+    loader = AsyncLoader(app_config["db"], pool_size=2)
+    inserted = loader.bulk_insert_weather_data(ROWS)
+    loader.close()
+
+    assert inserted == 1
+
+    copy = mock_conn.copy_records_to_table.call_args
+    assert copy.args[0] == STAGE_TABLE
+    assert copy.kwargs["columns"][:4] == ["latitude", "longitude", "time_stamp", "is_forecast"]
+    first = dict(zip(copy.kwargs["columns"], copy.kwargs["records"][0]))
+    assert first["latitude"] == Decimal("25.9")
+    assert first["temperature"] == Decimal("10.5")
+    assert json.loads(first["extra"]) == {"dewPoint": 4.2}
+    assert dict(zip(copy.kwargs["columns"], copy.kwargs["records"][1]))["extra"] is None
+
+    insert_sql = mock_conn.execute.call_args_list[-1].args[0]
+    assert "WHERE NOT merge_row" in insert_sql
+    assert "ON CONFLICT (latitude, longitude, time_stamp, is_forecast) DO NOTHING" in insert_sql
+    # One rollup refresh and one registry upsert for the single location.
+    assert mock_conn.executemany.call_count == 2
+
+
+def test_rows_with_merge_fields_merge_without_counting_as_inserted(app_config, mock_conn):
+    columns = mock_conn.fetch.return_value
+    merge_sql = []
+
+    def fetch(sql, *args):
+        if "merge_row" not in sql:
+            return columns
+        merge_sql.append(sql)
+        # xmax = 0: the first row is new, the second merged into a stored hour.
+        return [(True,), (False,)]
+
+    mock_conn.fetch.side_effect = fetch
+
+    loader = AsyncLoader(app_config["db"], merge_fields=["humidity"])
+    assert loader.bulk_insert_weather_data(ROWS) == 1
+    loader.close()
+
+    copy = mock_conn.copy_records_to_table.call_args
+    assert copy.kwargs["columns"][-1] == "merge_row"
+    assert [record[-1] for record in copy.kwargs["records"]] == [True, True]
+    # No plain rows: the DO NOTHING insert is skipped entirely.
+    assert not any("DO NOTHING" in c.args[0] for c in mock_conn.execute.call_args_list)
+    assert "DO UPDATE SET" in merge_sql[0]
+    assert "humidity = COALESCE(weather_data.humidity, EXCLUDED.humidity)" in merge_sql[0]
+    assert "RETURNING xmax = 0" in merge_sql[0]
+    # A merge alone still refreshes the rollup and the registry.
+    assert mock_conn.executemany.call_count == 2
+
+
+def test_duplicate_batch_skips_rollup(app_config, mock_conn):
+    mock_conn.execute.side_effect = lambda sql, *args: "INSERT 0 0"
+
+    loader = AsyncLoader(app_config["db"])
+    assert loader.submit(ROWS).result() == 0
+    loader.close()
+
+    mock_conn.executemany.assert_not_called()
+
+
+def test_missing_asyncpg_raises(app_config):
+    with patch.dict(sys.modules, {"asyncpg": None}):
+        with pytest.raises(RuntimeError, match="asyncpg"):
+            AsyncLoader(app_config["db"])
+
+
+def test_watermarks_of_all_locations_load_in_one_query(app_config, mock_conn):
+    columns = mock_conn.fetch.return_value
+    stored = (25.9, -97.4, ROWS[0]["time_stamp"], None)
+    mock_conn.fetch.side_effect = lambda sql, *args: (
+        [stored] if sql == ALL_WATERMARKS_SQL else columns
+    )
+    mock_conn.fetchrow = AsyncMock(return_value=(None, None))
+
+    loader = AsyncLoader(app_config["db"], watermarks=LoadWatermarks())
+    loader.bulk_insert_weather_data(ROWS)
+    loader.bulk_insert_weather_data([{**ROWS[0], "latitude": 26.0}])
+    loader.close()
+
+    bulk_loads = [c for c in mock_conn.fetch.call_args_list if c.args[0] == ALL_WATERMARKS_SQL]
+    assert len(bulk_loads) == 1
+    # The stored observed hour is skipped; the unregistered location is probed once.
+    first_copy = mock_conn.copy_records_to_table.call_args_list[0]
+    assert len(first_copy.kwargs["records"]) == 1
+    mock_conn.fetchrow.assert_awaited_once_with(
+        WATERMARK_ASYNC_SQL, Decimal("26.0"), Decimal("-97.4")
+    )
+
+
+def test_cache_invalidation_runs_off_the_event_loop(app_config, mock_conn):
+    cache = MagicMock()
+    threads = []
+    cache.invalidate_location.side_effect = (
+        lambda lat, lon: threads.append(threading.current_thread().name)
+    )
+
+    loader = AsyncLoader(app_config["db"], cache=cache)
+    loader.bulk_insert_weather_data(ROWS)
+    loader.close()
+
+    assert len(threads) == 1
+    assert threads[0] != "etl-async-db"
+
+
+def test_column_probe_is_limited_to_the_current_schema(app_config, mock_conn):
+    AsyncLoader(app_config["db"]).close()
+
+    probe = mock_conn.fetch.call_args_list[0].args[0]
+    assert "table_schema = current_schema()" in probe
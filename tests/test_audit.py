@@ -0,0 +1,94 @@
+from unittest.mock import MagicMock, patch
+
+from tomorrow.audit import RunAudit
+from tomorrow.tracing import Tracer
+
+
+def _run_spans(tracer=None):
+    """run -> two locations (one loaded, one failed), with fixed timings."""
+    tracer = tracer or Tracer()
+    run = tracer.start_span("run", start_ns=0)
+
+    ok = tracer.start_span("location", run, start_ns=0, location="25.9,-97.4")
+    fetch = tracer.start_span("fetch", ok, start_ns=0, **{"http.response_bytes": 2048})
+    tracer.end_span(fetch, end_ns=40_000_000)
+    parse = tracer.start_span("parse", ok, start_ns=40_000_000)
+    tracer.end_span(parse, end_ns=45_000_000)
+    load = tracer.start_span("load", ok, start_ns=45_000_000, rows=120, rows_inserted=24)
+    tracer.end_span(load, end_ns=60_000_000)
+    tracer.end_span(ok, end_ns=60_000_000)
+
+    failed = tracer.start_span("location", run, start_ns=60_000_000, location="25.8,-97.5")
+    failed.record_error(RuntimeError("HTTP 503"))
+    tracer.end_span(failed, end_ns=70_000_000)
+
+    tracer.end_span(run, end_ns=70_000_000)
+    return tracer.spans()
+
+
+@patch("tomorrow.audit.inspect")
+@patch("tomorrow.audit.create_engine")
+def test_run_audit_writes_locations_in_chunks(mock_create_engine, mock_inspect, app_config):
+    """Location rows are written as locations finish; finish() fills in the run totals."""
+
+    mock_inspect.return_value.has_table.return_value = True
+    conn = MagicMock()
+    conn.execute.return_value.scalar_one.return_value = 7
+    mock_create_engine.return_value.begin.return_value.__enter__.return_value = conn
+    audit = RunAudit(app_config["db"], chunk_size=1)
+
+    _run_spans(Tracer(on_end=audit.on_end))
+    # Both locations were written before the run was finished.
+    sqls = [str(c.args[0]) for c in conn.execute.call_args_list]
+    assert "INSERT INTO etl_runs" in sqls[0]
+    assert conn.execute.call_args_list[0].args[1]["status"] == "running"
+    assert sum("INSERT INTO etl_location_runs" in sql for sql in sqls) == 2
+
+    assert audit.finish() == 7
+
+    finish = conn.execute.call_args_list[-1]
+    assert "UPDATE etl_runs" in str(finish.args[0])
+    assert finish.args[1]["status"] == "partial"
+    assert finish.args[1]["failed_locations"] == 1
+    assert (finish.args[1]["rows_sent"], finish.args[1]["bytes_fetched"]) == (120, 2048)
+    assert (finish.args[1]["fetch_ms"], finish.args[1]["parse_ms"]) == (40.0, 5.0)
+    assert not audit._stages and not audit._pending
+
+
+@patch("tomorrow.audit.inspect")
+@patch("tomorrow.audit.create_engine")
+def test_run_audit_location_rows(mock_create_engine, mock_inspect, app_config):
+    """Rows, bytes and stage timings are rolled up per location."""
+
+    mock_inspect.return_value.has_table.return_value = True
+    conn = MagicMock()
+    conn.execute.return_value.scalar_one.return_value = 7
+    mock_create_engine.return_value.begin.return_value.__enter__.return_value = conn
+    audit = RunAudit(app_config["db"])
+
+    _run_spans(Tracer(on_end=audit.on_end))
+    audit.finish()
+
+    location_sql = conn.execute.call_args_list[1]
+    assert "INSERT INTO etl_location_runs" in str(location_sql.args[0])
+    ok, failed = location_sql.args[1]
+    assert (ok["run_id"], ok["latitude"], ok["longitude"]) == (7, 25.9, -97.4)
+    assert ok["total_ms"] == 60.0
+    assert (ok["rows_sent"], ok["rows_inserted"], ok["load_ms"]) == (120, 24, 15.0)
+    assert failed["status"] == "failed"
+    assert failed["error"] == "RuntimeError('HTTP 503')"
+    assert failed["fetch_ms"] is None
+
+
+@patch("tomorrow.audit.inspect")
+@patch("tomorrow.audit.create_engine")
+def test_run_audit_without_tables_never_fails_the_run(
+    mock_create_engine, mock_inspect, app_config
+):
+    mock_inspect.return_value.has_table.return_value = False
+    audit = RunAudit(app_config["db"], chunk_size=1)
+
+    _run_spans(Tracer(on_end=audit.on_end))
+
+    assert audit.finish() is None
+    mock_create_engine.return_value.begin.assert_not_called()
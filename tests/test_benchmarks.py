@@ -0,0 +1,104 @@
+import threading
+from unittest.mock import MagicMock
+
+import pytest
+import requests
+
+from benchmarks.bench_concurrency import Reader, summarize
+from benchmarks.bench_etl import compare, percentile, synthetic_locations
+from benchmarks.fake_server import FakeServerSettings, FakeTomorrowServer
+from tomorrow.api import TomorrowAPIClient
+from tomorrow.tracing import Tracer
+
+
+def test_fake_server_round_trip(app_config):
+    """The real API client parses the fake server's -24h..+5d timeline."""
+
+    with FakeTomorrowServer(FakeServerSettings(extra_fields=3)) as server:
+        client = TomorrowAPIClient({**app_config["api"], "base_url": server.base_url})
+        records = client.fetch_weather_data(25.9, -97.4)
+        client.close()
+
+    # 24h back + 5 days forward, hourly, inclusive of the first hour
+    assert 144 <= len(records) <= 146
+    assert any(r["is_forecast"] for r in records)
+    assert any(not r["is_forecast"] for r in records)
+    assert all(r["temperature"] is not None for r in records)
+
+
+def test_gzip_response_is_streamed_and_measured(app_config):
+    """Compressed bodies are decoded while streaming; spans get wire and decoded sizes."""
+
+    tracer = Tracer()
+    with FakeTomorrowServer(FakeServerSettings(extra_fields=5)) as server:
+        client = TomorrowAPIClient(
+            {**app_config["api"], "base_url": server.base_url}, tracer=tracer
+        )
+        with tracer.span("run"):
+            records = client.fetch_weather_data(25.9, -97.4)
+        client.close()
+
+    fetch = next(s for s in tracer.spans() if s.name == "fetch")
+    assert len(records) >= 144
+    assert fetch.attributes["http.content_encoding"] == "gzip"
+    assert fetch.attributes["http.response_bytes"] < fetch.attributes["http.decoded_bytes"] / 2
+
+
+def test_fake_server_rate_limit(app_config):
+    """429s from the fake server hit the client's hard-stop path."""
+
+    with FakeTomorrowServer(FakeServerSettings(rate_limit_rate=1.0)) as server:
+        client = TomorrowAPIClient({**app_config["api"], "base_url": server.base_url})
+        with pytest.raises(requests.exceptions.HTTPError):
+            client.fetch_weather_data(25.9, -97.4)
+        client.close()
+
+
+def test_regression_comparison(tmp_path):
+    baseline = tmp_path / "baseline.json"
+    baseline.write_text(
+        '[{"locations": 10, "p50_ms": 10, "p99_ms": 20, '
+        '"peak_rss_mb": 100, "records_per_s": 1000}]'
+    )
+
+    ok = {"locations": 10, "p50_ms": 11, "p99_ms": 21, "peak_rss_mb": 100, "records_per_s": 950}
+    slow = {**ok, "p99_ms": 40, "records_per_s": 500}
+
+    assert compare([ok], str(baseline), tolerance=0.2) == []
+    assert len(compare([slow], str(baseline), tolerance=0.2)) == 2
+    assert len({(l["lat"], l["lon"]) for l in synthetic_locations(1000)}) == 1000
+    assert percentile([1, 2, 3, 4], 50) in (2, 3)
+
+
+def test_reader_records_latency_per_query():
+    query = MagicMock()
+    query.latest_values.side_effect = RuntimeError("connection reset")
+    reader = Reader(query, [{"lat": 25.0, "lon": -98.0}], 1.0, threading.Event())
+
+    reader.read_once()
+    reader.series_ratio = 0.0
+    reader.read_once()
+
+    query.time_series.assert_called_once_with(25.0, -98.0)
+    assert len(reader.latencies["time_series"]) == 1
+    assert reader.latencies["latest_values"] == []
+    assert reader.errors == 1
+
+
+def test_concurrency_summary():
+    result = summarize(
+        {"latest_values": [5.0, 7.0], "time_series": [1.0, 2.0, 3.0]},
+        [(0, 3), (2, 4), (1, 2), (0, 1)],
+        sample_interval=0.5,
+        rows_written=1000,
+        wall=2.0,
+    )
+
+    assert result["time_series"]["reads"] == 3
+    assert result["time_series"]["p50_ms"] == 2.0
+    assert result["latest_values"]["max_ms"] == 7.0
+    assert result["reads_per_s"] == 2.5
+    assert result["lock_wait_samples"] == 2
+    assert result["max_lock_waiters"] == 2
+    assert result["lock_wait_s_est"] == 1.5
+    assert result["write_rows_per_s"] == 500.0
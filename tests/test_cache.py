@@ -0,0 +1,81 @@
+import pandas as pd
+
+from tomorrow.cache import QueryCache, build_cache, location_key
+
+
+def _key(lat, lon, window="w"):
+    return ("time_series", location_key(lat, lon), window)
+
+
+def test_lru_eviction():
+    """Least recently used entries are evicted beyond max_entries."""
+
+    cache = QueryCache(max_entries=2)
+    cache.set(_key(25.9, -97.4, 1), "a")
+    cache.set(_key(25.9, -97.4, 2), "b")
+
+    cache.get(_key(25.9, -97.4, 1))  # touch -> most recent
+    cache.set(_key(25.9, -97.4, 3), "c")
+
+    assert cache.get(_key(25.9, -97.4, 1)) == "a"
+    assert cache.get(_key(25.9, -97.4, 2)) is None
+    assert cache.get(_key(25.9, -97.4, 3)) == "c"
+
+
+def test_invalidate_location_only_drops_that_location():
+    """A load for one location invalidates it and all-location results."""
+
+    cache = QueryCache()
+    latest_key = ("latest_values", location_key(None, None), None)
+
+    cache.set(_key(25.9, -97.4), "loaded")
+    cache.set(_key(25.8, -97.5), "other")
+    cache.set(latest_key, "latest")
+
+    cache.invalidate_location(25.9, -97.4)
+
+    assert cache.get(_key(25.9, -97.4)) is None
+    assert cache.get(_key(25.8, -97.5)) == "other"
+    assert cache.get(latest_key) is None
+
+
+def test_shared_cache_invalidated_across_instances(tmp_path):
+    """An ETL process invalidating the shared file is seen by readers."""
+
+    path = str(tmp_path / "cache.sqlite")
+    reader = QueryCache(path=path)
+    etl = QueryCache(path=path)
+
+    frame = pd.DataFrame({"temperature": [15.5, 16.0]})
+    reader.set(_key(25.9, -97.4), frame)
+
+    # A fresh process sees the shared entry
+    assert QueryCache(path=path).get(_key(25.9, -97.4)).equals(frame)
+
+    etl.invalidate_location(25.9, -97.4)
+
+    # The reader's in-memory copy is stale now as well
+    assert reader.get(_key(25.9, -97.4)) is None
+
+
+def test_build_cache_disabled():
+    assert build_cache(None) is None
+    assert build_cache({"enabled": False}) is None
+    assert isinstance(build_cache({"max_entries": 8}), QueryCache)
+
+
+def test_result_invalidated_while_computing_is_not_cached(tmp_path):
+    """A load landing between get and set must not be masked by the stale result."""
+
+    for cache in (QueryCache(), QueryCache(path=str(tmp_path / "cache.sqlite"))):
+        key = _key(25.9, -97.4)
+        assert cache.get(key) is None
+        generation = cache.generation(key)
+
+        cache.invalidate_location(25.9, -97.4)  # insert while the query runs
+        cache.set(key, "stale", generation)
+
+        assert cache.get(key) is None
+
+        cache.set(key, "fresh", cache.generation(key))
+        assert cache.get(key) == "fresh"
@@ -0,0 +1,67 @@
+import json
+from datetime import datetime, timezone
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from tomorrow.changes import ChangeSubscriber, change_channel, change_payloads
+
+
+def _row(lat, lon, hour):
+    return {
+        "latitude": lat,
+        "longitude": lon,
+        "time_stamp": datetime(2025, 12, 15, hour, tzinfo=timezone.utc),
+        "is_forecast": False,
+    }
+
+
+def test_one_compact_payload_per_location():
+    rows = [_row(25.9, -97.4, 10), _row(25.9, -97.4, 14), _row(25.8, -97.5, 12)]
+
+    payloads = change_payloads(rows, inserted=3, merged=1)
+
+    assert len(payloads) == 2
+    assert all(" " not in p for p in payloads)
+    first = json.loads(payloads[0])
+    assert first == {
+        "lat": 25.9,
+        "lon": -97.4,
+        "start": "2025-12-15T10:00:00+00:00",
+        "end": "2025-12-15T14:00:00+00:00",
+        "rows": 2,
+        "inserted": 3,
+        "merged": 1,
+    }
+
+
+def test_change_channel_config():
+    assert change_channel(None) is None
+    assert change_channel({"enabled": False}) is None
+    assert change_channel({}) is None
+    assert change_channel({"channel": "weather_feed"}) == "weather_feed"
+    with pytest.raises(RuntimeError):
+        change_channel({"channel": "bad; DROP TABLE weather_data"})
+
+
+def test_subscriber_yields_parsed_events(app_config):
+    payload = change_payloads([_row(25.9, -97.4, 10)], inserted=1)[0]
+    conn = MagicMock()
+    conn.notifies = []
+
+    def poll():
+        conn.notifies.append(MagicMock(payload=payload))
+
+    conn.poll.side_effect = poll
+
+    with patch("psycopg2.connect", return_value=conn), \
+         patch("tomorrow.changes.select.select", side_effect=[([conn], [], []), ([], [], [])]):
+        subscriber = ChangeSubscriber(app_config["db"])
+        events = list(subscriber.events(idle_timeout=5))
+
+    conn.cursor.return_value.__enter__.return_value.execute.assert_called_once_with(
+        "LISTEN weather_data_changes"
+    )
+    assert len(events) == 1
+    assert events[0]["start"] == datetime(2025, 12, 15, 10, tzinfo=timezone.utc)
+    assert events[0]["rows"] == 1
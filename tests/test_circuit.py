@@ -0,0 +1,52 @@
+from unittest.mock import patch
+
+import pytest
+
+from tomorrow.circuit import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError
+
+
+def _tripped():
+    breaker = CircuitBreaker(failure_rate=0.5, min_requests=4, window=10, open_seconds=30)
+    breaker.record_success()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == CLOSED  # below min_requests
+    breaker.record_failure()
+    return breaker
+
+
+@patch("tomorrow.circuit.time.monotonic")
+def test_opens_at_failure_rate_and_fails_fast(mock_monotonic):
+    mock_monotonic.return_value = 100.0
+    breaker = _tripped()
+
+    assert breaker.state == OPEN
+    mock_monotonic.return_value = 110.0
+    with patch("tomorrow.circuit.time.time", return_value=1000.0):
+        with pytest.raises(CircuitOpenError) as exc_info:
+            breaker.check("Tomorrow.io")
+
+    # Half-opens open_seconds (30) after tripping at t=100.
+    assert exc_info.value.retry_at == 1020.0
+
+
+@patch("tomorrow.circuit.time.monotonic")
+def test_half_open_probe_closes_or_reopens(mock_monotonic):
+    """After open_seconds a single probe decides whether to close again."""
+
+    mock_monotonic.return_value = 100.0
+    breaker = _tripped()
+
+    mock_monotonic.return_value = 131.0
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow() is True
+    assert breaker.allow() is False  # only one probe in flight
+
+    breaker.record_failure()
+    assert breaker.state == OPEN
+
+    mock_monotonic.return_value = 162.0
+    assert breaker.allow() is True
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    assert breaker.allow() is True
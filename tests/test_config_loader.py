@@ -2,7 +2,15 @@ import os
 import pytest
 from unittest.mock import patch, mock_open
 
-from tomorrow.config_loader import load_config
+from tomorrow.config_loader import clear_config_cache, load_config
+
+
+@pytest.fixture(autouse=True)
+def fresh_config_cache():
+    """Every test parses its own mocked YAML."""
+    clear_config_cache()
+    yield
+    clear_config_cache()
 
 
 VALID_YAML = """
@@ -144,3 +152,104 @@ def test_invalid_timestep_unit(mock_file):
     with pytest.raises(RuntimeError, match="Unsupported timestep unit"):
         load_config()
 
+
+
+ENV = {
+    "PGHOST": "localhost",
+    "PGPORT": "5432",
+    "PGUSER": "postgres",
+    "PGPASSWORD": "postgres",
+    "PGDATABASE": "tomorrow",
+    "TOMORROW_IO_API_KEY": "dummy-api-key",
+}
+
+
+@patch.dict(os.environ, ENV, clear=True)
+def test_config_is_typed_and_immutable(tmp_path):
+    path = tmp_path / "config.yaml"
+    path.write_text(VALID_YAML)
+
+    config = load_config(str(path))
+
+    assert config.api.timesteps_minutes == 60
+    assert config.api.fields == ("temperature", "windSpeed", "humidity", "precipitationType")
+    assert config.locations[0].lat == 25.9
+    assert config.locations[0]["lon"] == -97.4
+
+    with pytest.raises(AttributeError):
+        config.api.key = "other"
+
+
+@patch.dict(os.environ, ENV, clear=True)
+def test_config_cached_until_file_changes(tmp_path):
+    """Unchanged files are served from cache; edits are picked up."""
+
+    path = tmp_path / "config.yaml"
+    path.write_text(VALID_YAML)
+
+    first = load_config(str(path))
+    assert load_config(str(path)) is first
+
+    path.write_text(VALID_YAML + "  - lat: 25.8\n    lon: -97.5\n")
+    os.utime(path, ns=(first.source_mtime_ns + 10**9, first.source_mtime_ns + 10**9))
+
+    reloaded = load_config(str(path))
+    assert reloaded is not first
+    assert len(reloaded.locations) == 2
+
+
+@patch.dict(os.environ, ENV, clear=True)
+def test_invalid_location_entries_skipped(tmp_path):
+    path = tmp_path / "config.yaml"
+    path.write_text(VALID_YAML + "  - lat: 10.0\n")
+
+    config = load_config(str(path))
+
+    assert [(l.lat, l.lon) for l in config.locations] == [(25.9, -97.4)]
+
+
+@patch.dict(os.environ, ENV, clear=True)
+def test_repository_config_loads():
+    config = load_config()
+
+    assert len(config.locations) == 10
+    assert config.cache.max_entries == 256
+
+
+@patch.dict(os.environ, ENV, clear=True)
+def test_api_cadences(tmp_path):
+    cadences = """
+  cadences:
+    - fields: [temperature, windSpeed]
+      horizon_hours: 48
+    - fields: [humidity, dewPoint]
+      every_hours: 6
+"""
+    path = tmp_path / "config.yaml"
+    path.write_text(VALID_YAML.replace("locations:", cadences.lstrip("\n") + "locations:"))
+
+    config = load_config(str(path))
+
+    assert [c.every_hours for c in config.api.cadences] == [1, 6]
+    assert config.api.cadences[0].fields == ("temperature", "windSpeed")
+    assert config.api.cadences[1].horizon_hours == 120
+
+    path.write_text(
+        VALID_YAML.replace("locations:", "  cadences:\n    - fields: [humidity]\n"
+                           "      every_hours: 3\nlocations:")
+    )
+    os.utime(path, ns=(10**18, 10**18))
+    with pytest.raises(RuntimeError, match="every_hours: 1"):
+        load_config(str(path))
+
+
+@pytest.mark.parametrize("section", ["cache: true", "pipeline:\n  - 4", "api: 1"])
+@patch.dict(os.environ, ENV, clear=True)
+def test_non_mapping_section_is_rejected(tmp_path, section):
+    path = tmp_path / "config.yaml"
+    name = section.split(":")[0]
+    # A repeated top-level key replaces the earlier one (api: 1 overrides api).
+    path.write_text(VALID_YAML + section + "\n")
+
+    with pytest.raises(RuntimeError, match=f"Invalid {name} configuration"):
+        load_config(str(path))
@@ -1,7 +1,10 @@
 import pytest
 from sqlalchemy import text
 
+from tomorrow.changes import DEFAULT_CHANNEL, ChangeSubscriber
 from tomorrow.db import WeatherDB
+from tomorrow.query import WeatherQuery
+from tomorrow.watermark import LoadWatermarks
 
 
 class TestWeatherDB:
@@ -21,10 +24,10 @@ class TestWeatherDB:
         Test successful bulk insertion of unique records.
         """
 
-        attempted_count = db_client.bulk_insert_weather_data(sample_db_data)
+        inserted_count = db_client.bulk_insert_weather_data(sample_db_data)
 
-        # The function returns attempted rows, not inserted rows
-        assert attempted_count == len(sample_db_data)
+        # The function returns rows actually inserted
+        assert inserted_count == len(sample_db_data)
 
         # Verify actual rows in DB
         with db_engine.connect() as conn:
@@ -46,7 +49,7 @@ class TestWeatherDB:
         """
 
         db_client.bulk_insert_weather_data(sample_db_data)
-        db_client.bulk_insert_weather_data(sample_db_data)
+        assert db_client.bulk_insert_weather_data(sample_db_data) == 0
 
         with db_engine.connect() as conn:
             count = conn.execute(
@@ -119,7 +122,7 @@ class TestWeatherDB:
 
         attempted_count = db_client.bulk_insert_weather_data(mixed_rows)
 
-        # Only valid rows are counted as attempted
+        # Only valid rows are inserted
         assert attempted_count == len(sample_db_data)
 
         with db_engine.connect() as conn:
@@ -129,6 +132,99 @@ class TestWeatherDB:
 
         assert count == len(sample_db_data)
 
+    def test_slow_cadence_pass_merges_into_stored_hours(
+        self,
+        db_client: WeatherDB,
+        db_engine,
+        app_config,
+        sample_db_data,
+    ):
+        """
+        An hourly cadence pass stores the hours without humidity; a slower
+        cadence pass over the same hours fills humidity and extra fields in
+        (past the load watermark) without overwriting stored values. Merged
+        hours are not counted as inserted.
+        """
+
+        merge_fields = ["humidity", "uvIndex"]
+        db_client = WeatherDB(
+            app_config["db"],
+            watermarks=LoadWatermarks(merge_fields),
+            merge_fields=merge_fields,
+        )
+        db_client.engine = db_engine
+        hourly = [{**row, "humidity": None} for row in sample_db_data]
+        slow = [
+            {**row, "temperature": 99, "extra": {"uvIndex": 3}} for row in sample_db_data
+        ]
+
+        assert db_client.bulk_insert_weather_data(hourly) == len(sample_db_data)
+        assert db_client.bulk_insert_weather_data(slow) == 0
+        assert db_client.bulk_insert_weather_data(hourly) == 0
+
+        with db_engine.connect() as conn:
+            stored = conn.execute(
+                text(
+                    "SELECT temperature, humidity, extra FROM weather_data "
+                    "ORDER BY latitude DESC, time_stamp"
+                )
+            ).all()
+
+        assert [(float(t), float(h), e) for t, h, e in stored] == [
+            (float(row["temperature"]), float(row["humidity"]), {"uvIndex": 3})
+            for row in sample_db_data
+        ]
+
+    def test_commit_notifies_change_feed(
+        self,
+        db_client: WeatherDB,
+        app_config,
+        sample_db_data,
+    ):
+        """
+        A committed batch publishes one event per location; a duplicate
+        batch (nothing new) publishes none.
+        """
+
+        subscriber = ChangeSubscriber(app_config["db"])
+        db_client.notify_channel = DEFAULT_CHANNEL
+
+        db_client.bulk_insert_weather_data(sample_db_data)
+        events = list(subscriber.events(idle_timeout=1))
+        db_client.bulk_insert_weather_data(sample_db_data)
+        repeat = list(subscriber.events(idle_timeout=1))
+        subscriber.close()
+
+        assert {(e["lat"], e["lon"], e["rows"]) for e in events} == {
+            (25.9, -97.4, 2),
+            (25.8, -97.5, 1),
+        }
+        assert repeat == []
+
+    def test_nearest_location_ranks_by_great_circle_distance(self, db_engine, app_config):
+        """
+        At 60N a degree of longitude is half a degree of latitude: the KNN's
+        closest point in degrees is not the closest in km.
+        """
+
+        with db_engine.begin() as conn:
+            conn.execute(text("TRUNCATE TABLE weather_locations"))
+            conn.execute(
+                text(
+                    "INSERT INTO weather_locations (latitude, longitude) "
+                    "VALUES (60.8, 10.0), (60.0, 10.9)"
+                )
+            )
+
+        query = WeatherQuery(app_config["db"])
+        try:
+            lat, lon, distance_km = query.nearest_location(60.0, 10.0)
+        finally:
+            query.close()
+
+        assert (lat, lon) == (60.0, 10.9)
+        assert distance_km == pytest.approx(50.0, abs=1.0)
+
     def test_engine_close(
         self,
         db_client: WeatherDB,
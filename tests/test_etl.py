@@ -1,4 +1,5 @@
 import pytest
+import requests
 from unittest.mock import MagicMock, patch
 
 from tomorrow.etl import run_weather_etl
@@ -149,6 +150,98 @@ def test_etl_continues_on_location_failure(
     assert mock_db.bulk_insert_weather_data.call_count == 1
 
 
+@patch("tomorrow.etl.time.sleep")
+@patch("tomorrow.etl.WeatherDB")
+@patch("tomorrow.etl.TomorrowAPIClient")
+def test_etl_retries_failed_location_after_others(
+    mock_api_cls,
+    mock_db_cls,
+    mock_sleep,
+    base_config,
+):
+    """
+    A failed location is retried once the remaining locations are done.
+    """
+
+    base_config["retry"] = {"max_attempts": 3, "base_delay_seconds": 0}
+
+    mock_api = MagicMock()
+    mock_api.fetch_weather_data.side_effect = [
+        RuntimeError("API failure"),
+        [{"temperature": 12}],
+        [{"temperature": 10}, {"temperature": 11}],  # retry of location 1
+    ]
+    mock_api_cls.return_value = mock_api
+
+    mock_db = MagicMock()
+    mock_db_cls.return_value = mock_db
+
+    total = run_weather_etl(base_config)
+
+    assert total == 3
+    retried = mock_api.fetch_weather_data.call_args_list[2].args
+    assert retried == (25.9, -97.4)
+    assert mock_db.bulk_insert_weather_data.call_count == 2
+
+
+@patch("tomorrow.etl.time.sleep")
+@patch("tomorrow.etl.WeatherDB")
+@patch("tomorrow.etl.TomorrowAPIClient")
+def test_etl_retry_pass_shares_the_run_watermarks(
+    mock_api_cls,
+    mock_db_cls,
+    mock_sleep,
+    base_config,
+):
+    """
+    Watermarks are built once per run, not once per pass.
+    """
+
+    base_config["retry"] = {"max_attempts": 3, "base_delay_seconds": 0}
+    base_config["watermarks"] = {"enabled": True}
+
+    mock_api = MagicMock()
+    mock_api.fetch_weather_data.side_effect = [
+        RuntimeError("API failure"),
+        [{"temperature": 12}],
+        [{"temperature": 10}],
+    ]
+    mock_api_cls.return_value = mock_api
+
+    run_weather_etl(base_config)
+
+    passes = mock_db_cls.call_args_list
+    assert len(passes) == 2
+    assert passes[0].kwargs["watermarks"] is not None
+    assert passes[0].kwargs["watermarks"] is passes[1].kwargs["watermarks"]
+
+
+@patch("tomorrow.etl.time.sleep")
+@patch("tomorrow.etl.WeatherDB")
+@patch("tomorrow.etl.TomorrowAPIClient")
+def test_etl_does_not_retry_rate_limited_location(
+    mock_api_cls,
+    mock_db_cls,
+    mock_sleep,
+    base_config,
+):
+    """
+    A 429 is deferred to the next scheduled run, not retried in this one.
+    """
+
+    base_config["retry"] = {"max_attempts": 3, "base_delay_seconds": 0}
+
+    rate_limited = requests.exceptions.HTTPError(response=MagicMock(status_code=429))
+    mock_api = MagicMock()
+    mock_api.fetch_weather_data.side_effect = [rate_limited, [{"temperature": 12}]]
+    mock_api_cls.return_value = mock_api
+
+    total = run_weather_etl(base_config)
+
+    assert total == 1
+    assert mock_api.fetch_weather_data.call_count == 2
+
+
 def test_etl_invalid_locations_config(app_config):
     """
     locations must be a list.
@@ -0,0 +1,107 @@
+import os
+from datetime import date, datetime, timezone
+from unittest.mock import MagicMock, patch
+
+import pyarrow.parquet as pq
+
+from tomorrow.export import (
+    compact_partition,
+    export_weather_data,
+    read_watermark,
+    write_partitions,
+)
+
+
+def _row(i, day):
+    ts = datetime(day.year, day.month, day.day, i % 24, tzinfo=timezone.utc)
+    return (
+        day, i, ts, 25.9, -97.4, ts, False, 15.5, 3.0, 70.0, 0,
+        '{"dewPoint": 4.2}' if i == 0 else None,
+    )
+
+
+D1, D2 = date(2025, 12, 14), date(2025, 12, 15)
+# The second chunk starts mid-day: a day may span chunks.
+CHUNKS = [[_row(0, D1), _row(1, D1)], [_row(2, D1), _row(3, D2)]]
+
+
+def test_write_partitions_by_day(tmp_path):
+    written = write_partitions(iter(CHUNKS), str(tmp_path), "part-0")
+
+    assert written == {"2025-12-14": 3, "2025-12-15": 1}
+    table = pq.read_table(tmp_path / "date=2025-12-14" / "part-0.parquet")
+    assert table.column("id").to_pylist() == [0, 1, 2]
+    assert table.column("extra").to_pylist()[0] == '{"dewPoint": 4.2}'
+    assert "day" not in table.column_names
+    assert not any(name.endswith(".tmp") for _, _, names in os.walk(tmp_path) for name in names)
+
+
+def test_export_is_incremental(tmp_path, app_config):
+    """Each export reads rows after the stored watermark and advances it."""
+
+    until = datetime(2025, 12, 16, tzinfo=timezone.utc)
+    engine = MagicMock()
+    conn = engine.connect.return_value.__enter__.return_value
+    conn.execute.return_value.scalar_one.return_value = until
+    stream = conn.execution_options.return_value.execute
+    stream.return_value.partitions.return_value = iter(CHUNKS)
+
+    with patch("tomorrow.export.create_engine", return_value=engine), \
+         patch("tomorrow.export.inspect") as mock_inspect:
+        mock_inspect.return_value.get_columns.return_value = [{"name": "extra"}]
+
+        first = export_weather_data(app_config["db"], str(tmp_path), chunk_size=2)
+        stream.return_value.partitions.return_value = iter([])
+        conn.execute.return_value.scalar_one.return_value = until
+        second = export_weather_data(app_config["db"], str(tmp_path))
+
+    assert first["rows"] == 4
+    assert conn.execution_options.call_args.kwargs == {"yield_per": 2}
+    assert stream.call_args_list[0].args[1]["since"] == datetime(1970, 1, 1, tzinfo=timezone.utc)
+    assert read_watermark(str(tmp_path / "weather_data")) == until
+
+    # Nothing is newer than the watermark: no query, no new files.
+    assert second["rows"] == 0
+    assert stream.call_count == 1
+
+
+def test_compact_partition_keeps_newest_copy(tmp_path):
+    """Parts fold into the newest one; a re-exported (merged) row wins."""
+
+    merged = list(_row(1, D1))
+    merged[2] = datetime(2025, 12, 16, tzinfo=timezone.utc)  # ingestion_timestamp
+    merged[9] = 55.0  # humidity filled in by a later cadence
+    write_partitions(iter([[_row(0, D1), _row(1, D1)]]), str(tmp_path), "part-1")
+    write_partitions(iter([[_row(2, D1)]]), str(tmp_path), "part-2")
+    write_partitions(iter([[tuple(merged)]]), str(tmp_path), "part-3")
+    partition = tmp_path / "date=2025-12-14"
+
+    assert compact_partition(str(partition)) == 3
+
+    assert sorted(os.listdir(partition)) == ["part-3.parquet"]
+    table = pq.read_table(partition / "part-3.parquet")
+    assert table.column("id").to_pylist() == [0, 1, 2]
+    assert table.column("humidity").to_pylist() == [70.0, 55.0, 70.0]
+    assert compact_partition(str(partition)) == 0
+
+
+def test_export_compacts_days_with_many_parts(tmp_path, app_config):
+    until = datetime(2025, 12, 16, tzinfo=timezone.utc)
+    engine = MagicMock()
+    conn = engine.connect.return_value.__enter__.return_value
+    conn.execute.return_value.scalar_one.return_value = until
+    stream = conn.execution_options.return_value.execute
+    stream.return_value.partitions.return_value = iter(CHUNKS)
+    earlier = iter([[_row(5, D1)], [_row(6, D2)]])
+    write_partitions(earlier, str(tmp_path / "weather_data"), "part-0")
+
+    with patch("tomorrow.export.create_engine", return_value=engine), \
+         patch("tomorrow.export.inspect") as mock_inspect:
+        mock_inspect.return_value.get_columns.return_value = []
+        export_weather_data(app_config["db"], str(tmp_path), compact_parts=1)
+
+    for day, ids in (("2025-12-14", [0, 1, 2, 5]), ("2025-12-15", [3, 6])):
+        files = os.listdir(tmp_path / "weather_data" / f"date={day}")
+        assert len(files) == 1
+        table = pq.read_table(tmp_path / "weather_data" / f"date={day}" / files[0])
+        assert sorted(table.column("id").to_pylist()) == ids
@@ -0,0 +1,85 @@
+import pytest
+
+from tomorrow.fields import (
+    cadence_only_fields,
+    carries_fields,
+    column_name,
+    encode_values,
+    extra_fields,
+    field_expression,
+    merge_on_conflict,
+    promote_field_statement,
+)
+
+
+def test_encode_values_splits_core_and_extra():
+    """Core fields map to columns; everything else lands in ``extra``."""
+
+    values = {"temperature": 15.5, "windSpeed": 5.0, "dewPoint": 9.1, "uvIndex": 3}
+    row = encode_values(values)
+
+    assert row == {
+        "temperature": 15.5,
+        "wind_speed": 5.0,
+        "humidity": None,
+        "precipitation_type": None,
+        "extra": {"dewPoint": 9.1, "uvIndex": 3},
+    }
+    assert len(values) == 4  # input left untouched
+    assert encode_values({"humidity": 70})["extra"] is None
+
+
+def test_field_names_and_expressions():
+    assert column_name("windSpeed") == "wind_speed"
+    assert column_name("cloudCeiling") == "cloud_ceiling"
+    assert extra_fields(["temperature", "dewPoint"]) == ["dewPoint"]
+    assert field_expression("humidity") == "w.humidity::float8"
+    assert field_expression("dewPoint") == "(w.extra->>'dewPoint')::float8"
+
+
+def test_rejects_unsafe_field_names():
+    with pytest.raises(RuntimeError, match="Invalid API field name"):
+        field_expression("dewPoint')::float8; DROP TABLE weather_data; --")
+
+
+def test_promote_field_statement():
+    statement = promote_field_statement("dewPoint")
+
+    assert "ADD COLUMN IF NOT EXISTS dew_point double precision" in statement
+    assert "GENERATED ALWAYS AS ((extra->>'dewPoint')::float8) STORED" in statement
+    with pytest.raises(RuntimeError):
+        promote_field_statement("temperature")
+
+
+def test_cadence_only_fields():
+    cadences = [
+        {"fields": ["temperature", "windSpeed"]},
+        {"fields": ["windSpeed", "humidity", "uvIndex"], "every_hours": 3},
+        {"fields": ["uvIndex"], "every_hours": 6},
+    ]
+
+    assert cadence_only_fields(cadences) == ["humidity", "uvIndex"]
+    assert cadence_only_fields([]) == []
+
+
+def test_carries_fields_checks_columns_and_extra():
+    carries = carries_fields(["humidity", "uvIndex"])
+
+    assert carries({"humidity": 50, "extra": None})
+    assert carries({"humidity": None, "extra": {"uvIndex": 3}})
+    assert not carries({"humidity": None, "temperature": 10, "extra": {"dewPoint": 4.2}})
+    assert not carries_fields([])({"humidity": 50})
+
+
+def test_merge_on_conflict_fills_only_missing_values():
+    assignments, where = merge_on_conflict(["latitude", "temperature", "humidity", "extra"])
+
+    assert assignments == {
+        "temperature": "COALESCE(weather_data.temperature, EXCLUDED.temperature)",
+        "humidity": "COALESCE(weather_data.humidity, EXCLUDED.humidity)",
+        "extra": "COALESCE(EXCLUDED.extra || weather_data.extra, "
+        "weather_data.extra, EXCLUDED.extra)",
+        "ingestion_timestamp": "NOW()",
+    }
+    assert "latitude" not in where
+    assert where.count("IS DISTINCT FROM") == 3
@@ -0,0 +1,89 @@
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from tomorrow.interpolation import InterpolationService, WeatherCube, interpolate
+
+
+T0 = datetime(2025, 12, 15, 0, tzinfo=timezone.utc)
+
+
+def _linear_field(lat, lon, hours):
+    # Bilinear-in-space / linear-in-time interpolation is exact for this.
+    return 2.0 * lat - 3.0 * lon + 0.5 * hours
+
+
+@pytest.fixture
+def region_frame():
+    rows = []
+    for lat in (25.8, 25.9, 26.0):
+        for lon in (-97.5, -97.4, -97.3):
+            for h in range(4):
+                rows.append({
+                    "latitude": lat,
+                    "longitude": lon,
+                    "time_stamp": T0 + timedelta(hours=h),
+                    "temperature": _linear_field(lat, lon, h),
+                    "wind_speed": 5.0,
+                    "humidity": 60.0,
+                })
+    return pd.DataFrame(rows)
+
+
+def test_cube_shape_and_missing_cells(region_frame):
+    cube = WeatherCube.from_frame(region_frame.iloc[1:])  # drop one cell/hour
+
+    assert cube.values["temperature"].shape == (4, 3, 3)
+    assert np.isnan(cube.values["temperature"][0, 0, 0])
+
+
+def test_interpolate_batch_is_exact_for_linear_field(region_frame):
+    """Vectorized trilinear interpolation reproduces a linear field."""
+
+    cube = WeatherCube.from_frame(region_frame)
+    lats = np.array([25.85, 25.93, 26.0])
+    lons = np.array([-97.45, -97.31, -97.5])
+    hours = np.array([0.5, 2.25, 3.0])
+    times = [T0 + timedelta(hours=float(h)) for h in hours]
+
+    result = interpolate(cube, lats, lons, times)
+
+    np.testing.assert_allclose(result["temperature"], _linear_field(lats, lons, hours))
+    np.testing.assert_allclose(result["wind_speed"], 5.0)
+
+
+def test_interpolate_outside_cube_is_nan(region_frame):
+    cube = WeatherCube.from_frame(region_frame)
+
+    result = interpolate(cube, [27.0, 25.9], [-97.4, -97.4], [T0, T0 + timedelta(hours=10)])
+
+    assert result["temperature"].isna().all()
+
+
+def test_service_caches_cubes(region_frame):
+    """Repeated batches in the same window reuse the loaded cube."""
+
+    query = MagicMock()
+    query.cache = None
+    query.region_window.return_value = region_frame
+    service = InterpolationService(query)
+
+    for _ in range(3):
+        result = service.interpolate([25.85], [-97.45], [T0 + timedelta(hours=1)])
+
+    assert query.region_window.call_count == 1
+    assert result["temperature"].iloc[0] == pytest.approx(_linear_field(25.85, -97.45, 1))
+
+
+def test_interpolate_empty_cube_is_nan():
+    empty = pd.DataFrame(
+        {c: [] for c in ("latitude", "longitude", "temperature", "wind_speed", "humidity")}
+        | {"time_stamp": pd.to_datetime([], utc=True)}
+    )
+
+    result = interpolate(WeatherCube.from_frame(empty), [25.9], [-97.4], [T0])
+
+    assert result["temperature"].isna().all()
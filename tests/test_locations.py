@@ -0,0 +1,122 @@
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+from tomorrow.locations import (
+    file_locations,
+    grid_locations,
+    iter_locations,
+    known_location_count,
+    table_locations,
+)
+from tomorrow.spatial import LocationIndex
+
+
+def test_grid_locations_inclusive_bounds():
+    """Grids include both edges and round to stored precision."""
+
+    grid = list(grid_locations(
+        {"min_lat": 25.86, "max_lat": 25.94, "min_lon": -97.54, "max_lon": -97.38, "step": 0.02}
+    ))
+
+    assert len(grid) == 5 * 9
+    assert grid[0] == {"lat": 25.86, "lon": -97.54}
+    assert grid[-1] == {"lat": 25.94, "lon": -97.38}
+
+
+def test_grid_locations_invalid_bounds():
+    with pytest.raises(RuntimeError, match="Invalid location_grid"):
+        list(grid_locations({"min_lat": 26, "max_lat": 25, "min_lon": 0, "max_lon": 1, "step": 0.1}))
+
+
+def test_file_locations_streams_csv(tmp_path):
+    path = tmp_path / "locations.csv"
+    path.write_text("Latitude,Longitude,name\n25.9,-97.4,a\n25.8,-97.5,b\n")
+
+    assert list(file_locations(str(path))) == [
+        {"lat": 25.9, "lon": -97.4},
+        {"lat": 25.8, "lon": -97.5},
+    ]
+
+
+def test_iter_locations_chains_sources(tmp_path):
+    path = tmp_path / "locations.csv"
+    path.write_text("lat,lon\n30.0,-90.0\n")
+
+    config = {
+        "locations": [{"lat": 25.9, "lon": -97.4}],
+        "location_grid": {"min_lat": 26, "max_lat": 26, "min_lon": -97, "max_lon": -96.9, "step": 0.1},
+        "location_file": str(path),
+    }
+
+    assert list(iter_locations(config)) == [
+        {"lat": 25.9, "lon": -97.4},
+        {"lat": 26.0, "lon": -97.0},
+        {"lat": 26.0, "lon": -96.9},
+        {"lat": 30.0, "lon": -90.0},
+    ]
+    assert known_location_count(config) is None
+    assert known_location_count({"locations": [{}, {}]}) == 2
+
+
+def test_table_locations_pages_by_key(app_config):
+    pages = [[(25.8, -97.5), (25.9, -97.4)], [(26.0, -97.0)]]
+
+    with patch("sqlalchemy.create_engine") as create_engine, \
+         patch("sqlalchemy.inspect") as inspect:
+        inspect.return_value.get_columns.return_value = [
+            {"name": "latitude"}, {"name": "longitude"}, {"name": "first_loaded_at"},
+        ]
+        conn = create_engine.return_value.connect.return_value.__enter__.return_value
+        conn.execute.return_value.all.side_effect = pages
+
+        points = list(table_locations(app_config["db"], "weather_locations", batch_size=2))
+
+    assert points == [
+        {"lat": 25.8, "lon": -97.5},
+        {"lat": 25.9, "lon": -97.4},
+        {"lat": 26.0, "lon": -97.0},
+    ]
+    # The second page starts after the last key of the first.
+    assert conn.execute.call_args.args[1] == {"lat": 25.9, "lon": -97.4, "limit": 2}
+    assert known_location_count({"locations": [{}], "location_table": "t"}) is None
+
+    with pytest.raises(RuntimeError, match="Invalid location_table"):
+        list(table_locations(app_config["db"], "weather_locations; DROP TABLE x"))
+
+
+def test_iter_locations_rejects_non_list():
+    with pytest.raises(RuntimeError, match="must be a list"):
+        list(iter_locations({"locations": "not-a-list"}))
+
+
+def test_location_index_matches_brute_force():
+    """Grid-bucket search returns the same point as a full scan."""
+
+    grid = list(grid_locations(
+        {"min_lat": 25.0, "max_lat": 26.0, "min_lon": -98.0, "max_lon": -97.0, "step": 0.05}
+    ))
+    index = LocationIndex.from_locations(grid)
+    lats = np.array([g["lat"] for g in grid])
+    lons = np.array([g["lon"] for g in grid])
+
+    rng = np.random.default_rng(0)
+    # Includes points well outside the indexed box.
+    for lat, lon in rng.uniform([23.0, -100.0], [28.0, -95.0], size=(200, 2)):
+        scale = np.cos(np.radians(lat))
+        brute = np.argmin(np.hypot(lats - lat, (lons - lon) * scale))
+
+        nearest_lat, nearest_lon, distance_km = index.nearest(lat, lon)
+
+        assert np.hypot(nearest_lat - lat, (nearest_lon - lon) * scale) == pytest.approx(
+            np.hypot(lats[brute] - lat, (lons[brute] - lon) * scale)
+        )
+        assert distance_km >= 0
+
+
+def test_location_index_exact_hit():
+    index = LocationIndex.from_locations([{"lat": 25.9, "lon": -97.4}, {"lat": 25.8, "lon": -97.5}])
+
+    assert index.nearest(25.9, -97.4) == (25.9, -97.4, 0.0)
+    assert len(index) == 2
@@ -0,0 +1,157 @@
+import threading
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from tomorrow.etl import run_weather_etl
+from tomorrow.memory import MemoryGuard, build_memory_guard, current_rss_bytes
+
+MB = 1024 * 1024
+NOW = datetime(2025, 12, 15, 15, 0, tzinfo=timezone.utc)
+
+# 48 hourly intervals: roughly 40 KB of parsed records per location.
+PAYLOAD = {
+    "timelines": {
+        "hourly": [
+            {
+                "time": f"2025-12-{14 + h // 24:02d}T{h % 24:02d}:00:00Z",
+                "values": {"temperature": 15.5, "windSpeed": 3.1, "humidity": 80.0},
+            }
+            for h in range(48)
+        ]
+    }
+}
+
+
+class _FakeAPI:
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def fetch_raw(self, lat, lon):
+        return PAYLOAD, NOW
+
+    def close(self):
+        pass
+
+
+class _SlowDB:
+    """Loads slower than the fetchers produce, so work piles up upstream."""
+
+    def __init__(self, *args, **kwargs):
+        self.rows = 0
+
+    def bulk_insert_weather_data(self, rows):
+        time.sleep(0.001)
+        self.rows += len(rows)
+        return len(rows)
+
+    def close(self):
+        pass
+
+
+class _NullAuditEngine:
+    """Audit database that counts location rows and keeps nothing."""
+
+    def __init__(self):
+        self.location_rows = 0
+
+    def begin(self):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, statement, params=None):
+        if isinstance(params, list):
+            self.location_rows += len(params)
+        return self
+
+    def scalar_one(self):
+        return 1
+
+    def dispose(self):
+        pass
+
+
+def test_guard_blocks_above_cap_until_work_finishes():
+    rss = [50 * MB]
+    guard = MemoryGuard(100, poll_seconds=0.01, rss=lambda: rss[0])
+    guard.admit()
+
+    rss[0] = 200 * MB
+    admitted = threading.Event()
+    waiter = threading.Thread(target=lambda: (guard.admit(), admitted.set()))
+    waiter.start()
+
+    assert not admitted.wait(0.1)
+    guard.release()  # nothing left in flight: one location may proceed
+    assert admitted.wait(1)
+    waiter.join()
+    assert guard.inflight == 1
+    assert guard.throttled == 1
+
+
+def test_build_memory_guard():
+    assert build_memory_guard(None) is None
+    assert build_memory_guard(512).limit == 512 * MB
+    assert current_rss_bytes() > 0
+    with pytest.raises(ValueError):
+        MemoryGuard(0)
+
+
+def test_pipeline_memory_ceiling(app_config, tmp_path):
+    """
+    1,000 locations streamed through the pipeline, with tracing and the run
+    audit on as shipped and loaders slower than fetchers over unbounded
+    queues: traced memory stays under the cap plus one location's records.
+    """
+    trace_path = tmp_path / "traces.jsonl"
+    config = {
+        "api": app_config["api"],
+        "db": app_config["db"],
+        "rate_limit_sleep_seconds": 0,
+        "location_grid": {
+            "min_lat": 25.0, "max_lat": 25.19, "min_lon": -98.0, "max_lon": -97.51, "step": 0.01,
+        },
+        "tracing": {"path": str(trace_path)},
+        "audit": {"enabled": True},
+        "pipeline": {
+            "fetch_workers": 2,
+            "parse_workers": 0,
+            "load_workers": 1,
+            "queue_size": 100_000,
+        },
+    }
+    audit_engine = _NullAuditEngine()
+
+    with patch("tomorrow.pipeline.TomorrowAPIClient", _FakeAPI), \
+         patch("tomorrow.pipeline.WeatherDB", _SlowDB), \
+         patch("tomorrow.audit.create_engine", return_value=audit_engine), \
+         patch("tomorrow.audit.inspect", return_value=MagicMock()):
+        tracemalloc.start()
+        try:
+            baseline = tracemalloc.get_traced_memory()[0]
+            guard = MemoryGuard(
+                (baseline + 4 * MB) / MB,
+                poll_seconds=0.005,
+                rss=lambda: tracemalloc.get_traced_memory()[0],
+            )
+            with patch("tomorrow.pipeline.build_memory_guard", return_value=guard):
+                tracemalloc.reset_peak()
+                total = run_weather_etl(config)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    assert total == 1000 * 48
+    assert guard.throttled > 0
+    assert peak - baseline < 6 * MB
+    # Spans were flushed during the run; every location was audited.
+    assert len(trace_path.read_text().splitlines()) > 1
+    assert audit_engine.location_rows == 1000
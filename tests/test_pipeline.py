@@ -0,0 +1,254 @@
+import threading
+import time
+from concurrent.futures import Future
+from datetime import datetime, timezone
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from tomorrow.circuit import CircuitOpenError
+from tomorrow.etl import run_weather_etl
+from tomorrow.pipeline import ETLPipeline, RequestSpacing
+from tomorrow.retry import RetryQueue
+
+
+NOW = datetime(2025, 12, 15, 15, 0, tzinfo=timezone.utc)
+
+PAYLOAD = {
+    "timelines": {
+        "hourly": [
+            {"time": "2025-12-15T14:00:00Z", "values": {"temperature": 15.5}},
+            {"time": "2025-12-15T16:00:00Z", "values": {"temperature": 16.0}},
+        ]
+    }
+}
+
+
+@pytest.fixture
+def pipeline_config(app_config):
+    return {
+        "api": app_config["api"],
+        "db": app_config["db"],
+        "locations": [{"lat": 25.9, "lon": -97.4}, {"lat": 25.8, "lon": -97.5}],
+        "rate_limit_sleep_seconds": 0,
+        "pipeline": {"fetch_workers": 2, "parse_workers": 0, "load_workers": 1},
+    }
+
+
+@pytest.fixture
+def mock_clients():
+    with patch("tomorrow.pipeline.TomorrowAPIClient") as mock_api_cls, \
+         patch("tomorrow.pipeline.WeatherDB") as mock_db_cls:
+        mock_api_cls.return_value.fetch_raw.return_value = (PAYLOAD, NOW)
+        yield mock_api_cls, mock_db_cls.return_value
+
+
+def test_run_weather_etl_uses_pipeline(pipeline_config, mock_clients):
+    """A pipeline section routes the run through fetch/parse/load stages."""
+
+    mock_api_cls, mock_db = mock_clients
+
+    total = run_weather_etl(pipeline_config)
+
+    assert total == 4
+    assert mock_api_cls.call_count == 2  # one client per fetch thread
+    assert mock_db.bulk_insert_weather_data.call_count == 2
+
+    loaded = [c.args[0] for c in mock_db.bulk_insert_weather_data.call_args_list]
+    assert {(r["latitude"], r["longitude"]) for rows in loaded for r in rows} == {
+        (25.9, -97.4), (25.8, -97.5),
+    }
+    assert [r["is_forecast"] for r in loaded[0]] == [False, True]
+    mock_db.close.assert_called_once()
+
+
+def test_failed_location_does_not_stop_pipeline(pipeline_config, mock_clients):
+    mock_api_cls, mock_db = mock_clients
+    mock_api_cls.return_value.fetch_raw.side_effect = [RuntimeError("API failure"), (PAYLOAD, NOW)]
+    pipeline_config["pipeline"]["fetch_workers"] = 1
+
+    total = ETLPipeline(pipeline_config).run(pipeline_config["locations"])
+
+    assert total == 2
+    assert mock_db.bulk_insert_weather_data.call_count == 1
+
+
+def test_breaker_skip_is_deferred_not_dead_lettered(pipeline_config, mock_clients):
+    """Fail-fast skips wait for the breaker to half-open and keep their attempts."""
+
+    mock_api_cls, mock_db = mock_clients
+    half_open = time.time() + 120
+    mock_api_cls.return_value.fetch_raw.side_effect = CircuitOpenError("open", half_open)
+    retry_queue = RetryQueue(max_attempts=1, base_delay_seconds=0)
+
+    ETLPipeline(pipeline_config, retry_queue=retry_queue).run(pipeline_config["locations"])
+
+    assert retry_queue.next_attempt_at() == half_open
+    assert len(retry_queue.due(now=half_open)) == 2
+    assert retry_queue.chronic(min_failures=1) == []
+    mock_db.bulk_insert_weather_data.assert_not_called()
+
+
+def test_parse_runs_in_process_pool(pipeline_config, mock_clients):
+    """Parsing in worker processes yields the same records."""
+
+    _, mock_db = mock_clients
+    pipeline_config["pipeline"]["parse_workers"] = 1
+
+    total = ETLPipeline(pipeline_config).run(pipeline_config["locations"])
+
+    assert total == 4
+    rows = mock_db.bulk_insert_weather_data.call_args_list[0].args[0]
+    assert rows[0]["temperature"] == 15.5
+
+
+def test_bounded_queues_apply_backpressure(pipeline_config, mock_clients):
+    """A stalled loader stops the pipeline from draining the location stream."""
+
+    _, mock_db = mock_clients
+    release = threading.Event()
+    mock_db.bulk_insert_weather_data.side_effect = lambda rows: release.wait(5)
+    pipeline_config["pipeline"].update(fetch_workers=1, queue_size=1)
+
+    consumed = []
+
+    def locations():
+        for i in range(100):
+            consumed.append(i)
+            yield {"lat": 25.0 + i / 100, "lon": -97.0}
+
+    runner = threading.Thread(target=ETLPipeline(pipeline_config).run, args=(locations(),))
+    runner.start()
+    time.sleep(0.3)
+    stalled_at = len(consumed)
+    release.set()
+    runner.join(10)
+
+    assert stalled_at < 10
+    assert len(consumed) == 100
+    assert mock_db.bulk_insert_weather_data.call_count == 100
+
+
+def test_async_db_loads_overlap(pipeline_config, mock_clients):
+    """With async_db, loaders hand batches off without waiting for each insert."""
+
+    _, mock_db = mock_clients
+    pipeline_config["pipeline"]["async_db"] = True
+    pending = []
+
+    def submit(rows):
+        future = Future()
+        pending.append((future, len(rows)))
+        return future
+
+    def close():
+        # Like AsyncLoader.close: finish in-flight inserts.
+        assert len(pending) == 2
+        for future, rows in pending:
+            future.set_result(rows)
+
+    with patch("tomorrow.pipeline.AsyncLoader") as mock_loader_cls:
+        loader = mock_loader_cls.return_value
+        loader.submit.side_effect = submit
+        loader.close.side_effect = close
+
+        total = ETLPipeline(pipeline_config).run(pipeline_config["locations"])
+
+    assert total == 4
+    assert mock_loader_cls.call_args.kwargs["pool_size"] == 2
+    mock_db.bulk_insert_weather_data.assert_not_called()
+
+
+def test_async_inserts_finish_off_the_event_loop(pipeline_config, mock_clients):
+    """Span export and retry bookkeeping never run on the asyncpg loop thread."""
+
+    pipeline_config["pipeline"]["async_db"] = True
+    pending = []
+    finished_on = []
+
+    def close():
+        loop_thread = threading.Thread(
+            target=lambda: [future.set_result(1) for future in pending], name="etl-async-db"
+        )
+        loop_thread.start()
+        loop_thread.join()
+
+    retry_queue = MagicMock()
+    retry_queue.record_success.side_effect = (
+        lambda lat, lon: finished_on.append(threading.current_thread().name)
+    )
+
+    with patch("tomorrow.pipeline.AsyncLoader") as mock_loader_cls:
+        loader = mock_loader_cls.return_value
+        loader.submit.side_effect = lambda rows: pending.append(Future()) or pending[-1]
+        loader.close.side_effect = close
+
+        total = ETLPipeline(pipeline_config, retry_queue=retry_queue).run(
+            pipeline_config["locations"]
+        )
+
+    assert total == 4
+    assert len(finished_on) == 2
+    assert all(name.startswith("etl-complete") for name in finished_on)
+
+
+def test_request_spacing_is_shared_by_fetch_threads():
+    """Four fetchers together still make at most one request per interval."""
+
+    spacing = RequestSpacing(0.05)
+    started = []
+
+    def fetch():
+        for _ in range(2):
+            spacing.wait()
+            started.append(time.monotonic())
+
+    threads = [threading.Thread(target=fetch) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    started.sort()
+    gaps = [b - a for a, b in zip(started, started[1:])]
+    assert len(started) == 8
+    assert min(gaps) >= 0.045
+
+
+def test_failed_async_submit_frees_its_inflight_slot(pipeline_config, mock_clients):
+    """A submit that raises gives its slot back, so later locations still load."""
+
+    pipeline_config["pipeline"].update({"async_db": True, "queue_size": 1, "fetch_workers": 1})
+    pipeline_config["locations"].append({"lat": 25.7, "lon": -97.6})
+    submitted = []
+
+    def submit(rows):
+        if not submitted:
+            submitted.append(None)
+            raise RuntimeError("pool closed")
+        future = Future()
+        future.set_result(len(rows))
+        submitted.append(future)
+        return future
+
+    with patch("tomorrow.pipeline.AsyncLoader") as mock_loader_cls:
+        mock_loader_cls.return_value.submit.side_effect = submit
+
+        total = ETLPipeline(pipeline_config).run(pipeline_config["locations"])
+
+    assert total == 4
+    assert len(submitted) == 3
+
+
+def test_location_is_recorded_once(pipeline_config):
+    pipeline = ETLPipeline(pipeline_config)
+    pipeline.memory = MagicMock()
+    pipeline.retry_queue = MagicMock()
+    span = pipeline.tracer.start_span("location")
+
+    pipeline._record(25.9, -97.4, span)
+    pipeline._record(25.9, -97.4, span, RuntimeError("late failure"))
+
+    pipeline.memory.release.assert_called_once()
+    pipeline.retry_queue.record_success.assert_called_once_with(25.9, -97.4)
+    pipeline.retry_queue.record_error.assert_not_called()
@@ -0,0 +1,197 @@
+import pytest
+from datetime import datetime, timezone
+from unittest.mock import MagicMock, patch
+
+from tomorrow.cache import QueryCache
+from tomorrow.query import (
+    PREPARED_STATEMENTS,
+    TIME_SERIES_DTYPE,
+    WeatherQuery,
+    _prepare_statements,
+    rows_to_frame,
+)
+
+
+START = datetime(2025, 12, 14, 15, 0, tzinfo=timezone.utc)
+END = datetime(2025, 12, 20, 15, 0, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def mock_cursor():
+    return MagicMock()
+
+
+@pytest.fixture
+def query(app_config, mock_cursor):
+    with patch("tomorrow.query.create_engine") as mock_engine_factory, \
+         patch("tomorrow.query.event"):
+        raw_conn = MagicMock()
+        raw_conn.cursor.return_value = mock_cursor
+        mock_engine_factory.return_value.raw_connection.return_value = raw_conn
+
+        yield WeatherQuery(app_config["db"])
+
+
+def test_prepare_statements_registers_all(mock_cursor):
+    """Every read statement is prepared once per new connection."""
+
+    dbapi_conn = MagicMock()
+    dbapi_conn.cursor.return_value = mock_cursor
+
+    _prepare_statements(dbapi_conn, None)
+
+    prepared = [c.args[0] for c in mock_cursor.execute.call_args_list]
+    assert len(prepared) == len(PREPARED_STATEMENTS)
+    assert all(sql.startswith("PREPARE tomorrow_") for sql in prepared)
+    dbapi_conn.commit.assert_called_once()
+
+
+def test_time_series_executes_prepared_statement(query, mock_cursor):
+    """time_series runs EXECUTE with bound parameters and returns columns."""
+
+    mock_cursor.fetchall.return_value = [
+        (1765810800000000, False, 15.5, 5.0, 70.0, 0.0),
+        (1765818000000000, True, 16.0, None, 68.0, 1.0),
+    ]
+
+    frame = query.time_series(25.9, -97.4, START, END)
+
+    mock_cursor.execute.assert_called_once_with(
+        "EXECUTE tomorrow_time_series(%s, %s, %s, %s)",
+        (25.9, -97.4, START, END),
+    )
+    assert list(frame.columns) == list(TIME_SERIES_DTYPE.names)
+    assert frame["time_stamp"].iloc[0] == datetime(2025, 12, 15, 15, 0, tzinfo=timezone.utc)
+    assert frame["is_forecast"].tolist() == [False, True]
+    assert frame["wind_speed"].isna().tolist() == [False, True]
+
+
+def test_rows_to_frame_empty_result():
+    """Empty result sets still produce typed, empty columns."""
+
+    frame = rows_to_frame([], TIME_SERIES_DTYPE)
+
+    assert frame.empty
+    assert str(frame["time_stamp"].dtype) == "datetime64[us, UTC]"
+
+
+def test_window_aggregates_rejects_unknown_bucket(query):
+    with pytest.raises(ValueError, match="Unsupported aggregate bucket"):
+        query.window_aggregates(25.9, -97.4, START, END, bucket="fortnight")
+
+
+def test_cached_query_skips_database(app_config, mock_cursor):
+    """Repeated reads are served from the cache until invalidated."""
+
+    with patch("tomorrow.query.create_engine") as mock_engine_factory, \
+         patch("tomorrow.query.event"):
+        raw_conn = MagicMock()
+        raw_conn.cursor.return_value = mock_cursor
+        mock_engine_factory.return_value.raw_connection.return_value = raw_conn
+
+        cache = QueryCache()
+        query = WeatherQuery(app_config["db"], cache=cache)
+
+    mock_cursor.fetchall.return_value = [(1765810800000000, False, 15.5, 5.0, 70.0, 0.0)]
+
+    query.time_series(25.9, -97.4, START, END)
+    query.time_series(25.9, -97.4, START, END)
+    assert mock_cursor.execute.call_count == 1
+
+    cache.invalidate_location(25.9, -97.4)
+    query.time_series(25.9, -97.4, START, END)
+    assert mock_cursor.execute.call_count == 2
+
+
+def test_weather_at_point_uses_nearest_location(query, mock_cursor):
+    """Arbitrary points map to the nearest ingested location's series."""
+
+    mock_cursor.fetchall.side_effect = [
+        [(25.9, -97.4, 1.4)],
+        [(1765810800000000, False, 15.5, 5.0, 70.0, 0.0)],
+    ]
+
+    frame = query.weather_at_point(25.91, -97.41, START, END)
+
+    knn_sql, knn_params = mock_cursor.execute.call_args_list[0].args
+    # KNN candidates from the GiST index, re-ranked by haversine distance.
+    assert "<->" in knn_sql and "LIMIT 8" in knn_sql and "ORDER BY distance_km" in knn_sql
+    assert knn_params == (-97.41, 25.91, 25.91, 25.91, -97.41)
+    assert mock_cursor.execute.call_args_list[1].args[1] == (25.9, -97.4, START, END)
+    assert len(frame) == 1
+
+
+def test_field_series_reads_extra_fields(query, mock_cursor):
+    """Extra API fields are read from the JSONB column by name."""
+
+    mock_cursor.fetchall.return_value = [(1765810800000000, False, 15.5, 9.1)]
+
+    frame = query.field_series(25.9, -97.4, ["temperature", "dewPoint"], START, END)
+
+    sql, params = mock_cursor.execute.call_args.args
+    assert "(w.extra->>'dewPoint')::float8" in sql
+    assert params == (25.9, -97.4, START, END)
+    assert list(frame.columns) == ["time_stamp", "is_forecast", "temperature", "dew_point"]
+    assert frame["dew_point"].iloc[0] == 9.1
+
+
+def test_history_streams_through_named_cursor(query, mock_cursor):
+    """iter_history yields one frame per fixed-size chunk of a server-side cursor."""
+
+    row = (25.9, -97.4, 1765810800000000, False, 15.5, None, 70.0, 0.0)
+    mock_cursor.fetchmany.side_effect = [[row, row], [row], []]
+
+    chunks = query.iter_history(START, END, bbox=(25.0, 26.0, -98.0, -97.0), chunk_size=2)
+    first = next(chunks)
+    # Later chunks are not fetched until asked for.
+    assert mock_cursor.fetchmany.call_count == 1
+    frames = [first, *chunks]
+
+    raw_conn = query.engine.raw_connection.return_value
+    assert raw_conn.cursor.call_args.kwargs["name"].startswith("tomorrow_stream_")
+    sql, params = mock_cursor.execute.call_args.args
+    assert "w.latitude BETWEEN %s AND %s" in sql
+    assert params == (START, END, 25.0, 26.0, -98.0, -97.0)
+    assert all(c.args == (2,) for c in mock_cursor.fetchmany.call_args_list)
+
+    assert [len(frame) for frame in frames] == [2, 1]
+    assert first["temperature"].dtype == "float64"
+    assert first["wind_speed"].isna().all()
+    assert str(first["time_stamp"].dt.tz) == "UTC"
+    mock_cursor.close.assert_called_once()
+    raw_conn.close.assert_called_once()
+
+
+def test_window_aggregates_prefer_observed_rows():
+    """Forecast and observed rows for the same hour are counted once."""
+
+    _, sql = PREPARED_STATEMENTS["tomorrow_window_aggregates"]
+    assert "DISTINCT ON (time_stamp)" in sql
+    assert "ORDER BY time_stamp, is_forecast" in sql
+
+
+def test_query_server_bad_request_is_valid_json():
+    import json
+    import threading
+    import urllib.error
+    import urllib.request
+    from http.server import ThreadingHTTPServer
+
+    from tomorrow.query_server import QueryRequestHandler
+
+    handler = type("Handler", (QueryRequestHandler,), {"query": MagicMock()})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}/timeseries?lat=a%22%5Cb&lon=1"
+        with pytest.raises(urllib.error.HTTPError) as err:
+            urllib.request.urlopen(url, timeout=5)
+        body = json.loads(err.value.read())
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert err.value.code == 400
+    assert body["error"].startswith("bad request:")
+    assert '"' in body["error"] and "\\" in body["error"]
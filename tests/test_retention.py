@@ -0,0 +1,64 @@
+from datetime import datetime, timezone
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from tomorrow.retention import DELETE_BATCH_SQL, RetentionJob, retention_cutoffs
+from tomorrow.rollup import FILL_MISSING_BEFORE_SQL
+
+
+NOW = datetime(2025, 12, 15, 15, 30, tzinfo=timezone.utc)
+
+
+def test_cutoffs_are_day_aligned():
+    history, forecast = retention_cutoffs(90, 2, NOW)
+
+    assert history == datetime(2025, 9, 16, tzinfo=timezone.utc)
+    assert forecast == datetime(2025, 12, 13, tzinfo=timezone.utc)
+
+    with pytest.raises(RuntimeError):
+        retention_cutoffs(90, 1, NOW)
+
+
+@pytest.fixture
+def engine():
+    engine = MagicMock()
+    with patch("tomorrow.retention.create_engine", return_value=engine), \
+         patch("tomorrow.retention.inspect") as mock_inspect:
+        mock_inspect.return_value.has_table.return_value = True
+        engine.connect.return_value.__enter__.return_value.execute.return_value = [
+            (25.9, -97.4)
+        ]
+        yield engine, mock_inspect
+
+
+def test_rolls_up_then_deletes_in_batches(app_config, engine):
+    engine, _ = engine
+    conn = engine.begin.return_value.__enter__.return_value
+    # fill-missing, then forecasts and history: a full batch, then a partial one
+    conn.execute.side_effect = [
+        MagicMock(rowcount=n) for n in (3, 2, 1, 2, 0)
+    ]
+
+    stats = RetentionJob(app_config["db"], batch_size=2).run(NOW)
+
+    assert stats == {"rolled_up_days": 3, "history_deleted": 2, "forecasts_deleted": 3}
+    calls = conn.execute.call_args_list
+    assert calls[0].args[0] is FILL_MISSING_BEFORE_SQL
+    assert all(c.args[0] is DELETE_BATCH_SQL for c in calls[1:])
+    assert calls[1].args[1]["is_forecast"] is True
+    assert calls[3].args[1]["cutoff"] == datetime(2025, 9, 16, tzinfo=timezone.utc)
+
+
+def test_history_kept_without_rollup_table(app_config, engine):
+    """Hourly history is only deleted once it can be kept as daily aggregates."""
+
+    engine, mock_inspect = engine
+    mock_inspect.return_value.has_table.return_value = False
+    conn = engine.begin.return_value.__enter__.return_value
+    conn.execute.return_value = MagicMock(rowcount=0)
+
+    stats = RetentionJob(app_config["db"]).run(NOW)
+
+    assert stats["history_deleted"] == 0
+    assert all(c.args[1]["is_forecast"] for c in conn.execute.call_args_list)
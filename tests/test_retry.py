@@ -0,0 +1,86 @@
+import random
+import time
+from unittest.mock import MagicMock
+
+import requests
+
+from tomorrow.retry import RATE_LIMIT_DEFER_SECONDS, RetryQueue, backoff_delay
+
+
+def test_backoff_delay_is_jittered_and_capped():
+    rng = random.Random(7)
+
+    delays = [backoff_delay(attempt, 5, 60, rng) for attempt in range(10)]
+
+    assert all(0 <= d <= min(60, 5 * 2 ** i) for i, d in enumerate(delays))
+    assert len(set(delays)) == len(delays)
+
+
+def test_failures_are_retried_then_dead_lettered():
+    """Failures back off until max_attempts, then wait for the next run."""
+
+    queue = RetryQueue(max_attempts=3, base_delay_seconds=0)
+
+    assert queue.record_failure(25.9, -97.4, "timeout") is not None
+    assert queue.due() == [{"lat": 25.9, "lon": -97.4}]
+    assert queue.record_failure(25.9, -97.4, "timeout") is not None
+    assert queue.record_failure(25.9, -97.4, "timeout") is None  # dead-lettered
+
+    assert queue.due() == []
+    assert queue.next_attempt_at() is None
+
+    queue.start_run()
+    assert queue.record_failure(25.9, -97.4, "timeout") is not None
+
+
+def test_chronic_report_and_success_reset(tmp_path):
+    """Failure history persists across instances until a success clears it."""
+
+    path = str(tmp_path / "retry.sqlite")
+    queue = RetryQueue(path=path, max_attempts=2, base_delay_seconds=0)
+    for _ in range(3):
+        queue.record_failure(25.9, -97.4, "HTTP 503")
+    queue.record_failure(25.8, -97.5, "HTTP 503")
+    queue.close()
+
+    queue = RetryQueue(path=path)
+    (row,) = queue.chronic(min_failures=3)
+    assert (row["latitude"], row["longitude"]) == (25.9, -97.4)
+    assert row["consecutive_failures"] == 3
+    assert row["last_error"] == "HTTP 503"
+
+    queue.record_success(25.9, -97.4)
+    assert queue.chronic(min_failures=1)[0]["latitude"] == 25.8
+
+
+def test_breaker_skips_are_deferred_without_using_attempts():
+    """An open breaker defers a location to its half-open time, attempts untouched."""
+
+    queue = RetryQueue(max_attempts=2, base_delay_seconds=0)
+    half_open = time.time() + 120
+
+    for _ in range(5):
+        assert queue.defer(25.9, -97.4, half_open, "CircuitOpenError()") > 100
+
+    assert queue.due() == []
+    assert queue.next_attempt_at() == half_open
+    assert queue.chronic(min_failures=1) == []
+    assert queue.due(now=half_open) == [{"lat": 25.9, "lon": -97.4}]
+
+    # Both real attempts are still available.
+    assert queue.record_failure(25.9, -97.4, "timeout") is not None
+    assert queue.record_failure(25.9, -97.4, "timeout") is None
+
+
+def test_rate_limited_location_waits_for_the_next_run():
+    """A 429 is deferred past the run without using an attempt."""
+
+    queue = RetryQueue(max_attempts=1, base_delay_seconds=0)
+    rate_limited = requests.exceptions.HTTPError(response=MagicMock(status_code=429))
+
+    delay = queue.record_error(25.9, -97.4, rate_limited)
+
+    assert delay >= RATE_LIMIT_DEFER_SECONDS - 1
+    assert queue.due() == []
+    assert queue.due(now=time.time() + RATE_LIMIT_DEFER_SECONDS) == [{"lat": 25.9, "lon": -97.4}]
+    assert queue.chronic(min_failures=1) == []
@@ -0,0 +1,50 @@
+from datetime import datetime, timezone
+from unittest.mock import MagicMock
+
+from tomorrow.rollup import REFRESH_LOCATION_SQL, refresh_daily_rollup, touched_ranges
+
+
+def _ts(day, hour):
+    return datetime(2025, 12, day, hour, tzinfo=timezone.utc)
+
+
+def test_touched_ranges_per_location(sample_db_data):
+    """Each location's refresh window spans only the rows it received."""
+
+    ranges = touched_ranges(sample_db_data)
+
+    assert ranges == {
+        (25.9, -97.4): ("2025-12-15T10:00:00Z", "2025-12-15T11:00:00Z"),
+        (25.8, -97.5): ("2025-12-15T10:00:00Z", "2025-12-15T10:00:00Z"),
+    }
+
+
+def test_refresh_daily_rollup_one_statement_per_location():
+    """Rollups are refreshed on the caller's connection, once per location."""
+
+    rows = [
+        {"latitude": 25.9, "longitude": -97.4, "time_stamp": _ts(14, 23)},
+        {"latitude": 25.9, "longitude": -97.4, "time_stamp": _ts(16, 1)},
+        {"latitude": 25.8, "longitude": -97.5, "time_stamp": _ts(15, 5)},
+    ]
+    conn = MagicMock()
+
+    refresh_daily_rollup(conn, rows)
+
+    assert conn.execute.call_count == 2
+    statement, params = conn.execute.call_args_list[0].args
+    assert statement is REFRESH_LOCATION_SQL
+    assert params == {
+        "lat": 25.9,
+        "lon": -97.4,
+        "start": _ts(14, 23),
+        "end": _ts(16, 1),
+    }
+
+
+def test_refresh_daily_rollup_noop_without_rows():
+    conn = MagicMock()
+
+    refresh_daily_rollup(conn, [])
+
+    conn.execute.assert_not_called()
@@ -57,3 +57,41 @@ def test_scheduler_unexpected_crash_logged():
         scheduler_module.main()
 
         mock_critical.assert_called_once()
+
+def test_retention_job_scheduled_when_configured():
+    """A retention section adds a daily cron job next to the hourly scrape."""
+
+    config = {"retention": {"history_days": 90, "hour": 4}}
+
+    with patch.object(scheduler_module, "load_config", return_value=config), \
+         patch.object(scheduler_module, "run_weather_etl"), \
+         patch.object(scheduler_module, "BlockingScheduler") as mock_scheduler_cls:
+
+        mock_scheduler = mock_scheduler_cls.return_value
+        scheduler_module.main()
+
+        jobs = {c.kwargs["id"]: c.kwargs for c in mock_scheduler.add_job.call_args_list}
+        assert jobs["daily_retention"]["trigger"] == "cron"
+        assert jobs["daily_retention"]["hour"] == 4
+
+
+def test_analytics_export_follows_each_etl_run():
+    """analytics.enabled exports in a job of its own after the bootstrap and every scrape."""
+
+    config = {"analytics": {"enabled": True}}
+
+    with patch.object(scheduler_module, "load_config", return_value=config), \
+         patch.object(scheduler_module, "run_weather_etl"), \
+         patch.object(scheduler_module, "BlockingScheduler") as mock_scheduler_cls:
+
+        mock_scheduler = mock_scheduler_cls.return_value
+        scheduler_module.main()
+
+        jobs = {c.kwargs["id"]: c.kwargs for c in mock_scheduler.add_job.call_args_list}
+        assert "trigger" not in jobs["analytics_export"]  # runs once, now
+        assert jobs["analytics_export"]["replace_existing"] is True
+
+        jobs["hourly_weather_scrape"]["func"]()
+
+        ids = [c.kwargs["id"] for c in mock_scheduler.add_job.call_args_list]
+        assert ids.count("analytics_export") == 2
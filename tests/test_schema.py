@@ -0,0 +1,82 @@
+import os
+from unittest.mock import MagicMock, patch
+
+from tomorrow.schema import INDEXES, SUPERSEDED_INDEXES, ensure_schema, index_statements
+
+
+INIT_SQL = os.path.join(os.path.dirname(__file__), "..", "scripts", "init-db.sql")
+
+
+def _executed_sql(mock_conn):
+    return [" ".join(str(c.args[0]).split()) for c in mock_conn.execute.call_args_list]
+
+
+@patch("tomorrow.schema.create_engine")
+def test_ensure_schema_creates_indexes_concurrently(mock_create_engine, app_config):
+    """Managed indexes are built CONCURRENTLY in autocommit mode."""
+
+    mock_conn = MagicMock()
+    mock_conn.execute.return_value.scalars.return_value.all.return_value = []
+    mock_create_engine.return_value.connect.return_value.__enter__.return_value = mock_conn
+
+    ensure_schema(app_config["db"])
+
+    assert mock_create_engine.call_args.kwargs["isolation_level"] == "AUTOCOMMIT"
+
+    executed = _executed_sql(mock_conn)
+    for name, _ in INDEXES:
+        assert any(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name}" in s for s in executed)
+    for name in SUPERSEDED_INDEXES:
+        assert f"DROP INDEX CONCURRENTLY IF EXISTS {name}" in executed
+
+    mock_create_engine.return_value.dispose.assert_called_once()
+
+
+@patch("tomorrow.schema.create_engine")
+def test_ensure_schema_rebuilds_invalid_index(mock_create_engine, app_config):
+    """An INVALID leftover from an interrupted build is dropped first."""
+
+    mock_conn = MagicMock()
+    mock_conn.execute.return_value.scalars.return_value.all.return_value = [
+        "idx_weather_observed_latest"
+    ]
+    mock_create_engine.return_value.connect.return_value.__enter__.return_value = mock_conn
+
+    ensure_schema(app_config["db"], drop_superseded=False)
+
+    executed = _executed_sql(mock_conn)
+    drop = executed.index("DROP INDEX CONCURRENTLY IF EXISTS idx_weather_observed_latest")
+    create = next(
+        i for i, s in enumerate(executed)
+        if "IF NOT EXISTS idx_weather_observed_latest" in s
+    )
+    assert drop < create
+    assert not any("idx_weather_location_time" in s for s in executed)
+
+
+@patch("tomorrow.schema.create_engine")
+def test_ensure_schema_adds_extra_column_and_promotes_fields(mock_create_engine, app_config):
+    """The JSONB extra column is added; requested fields become generated columns."""
+
+    mock_conn = MagicMock()
+    mock_conn.execute.return_value.scalars.return_value.all.return_value = []
+    mock_create_engine.return_value.connect.return_value.__enter__.return_value = mock_conn
+
+    ensure_schema(app_config["db"], promote_fields=["dewPoint"])
+
+    executed = _executed_sql(mock_conn)
+    assert "ALTER TABLE weather_data ADD COLUMN IF NOT EXISTS extra JSONB" in executed
+    assert any("ADD COLUMN IF NOT EXISTS dew_point" in s for s in executed)
+
+
+def test_init_sql_matches_managed_indexes():
+    """Fresh databases get the same index layout as migrated ones."""
+
+    with open(INIT_SQL) as f:
+        init_sql = f.read()
+
+    for name, _ in INDEXES:
+        assert name in init_sql
+    for name in SUPERSEDED_INDEXES:
+        assert name not in init_sql
+    assert len(index_statements()) == len(INDEXES)
@@ -0,0 +1,66 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from tomorrow.__main__ import parse_args
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+HEAVY_MODULES = ("requests", "sqlalchemy", "psycopg2", "apscheduler", "numpy", "pandas")
+
+# Cold-start budget for `import tomorrow.__main__`, as the cumulative import
+# time reported by -X importtime (about 70ms today; the eager import chain
+# used to take ~0.5s).
+COLD_START_BUDGET_US = 300_000
+
+
+def _run_python(code, *flags):
+    return subprocess.run(
+        [sys.executable, *flags, "-c", code],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+def _import_times(module):
+    """Cumulative import time in microseconds per module imported by ``module``."""
+    result = _run_python(f"import {module}", "-X", "importtime")
+
+    # importtime lines: "import time: self [us] | cumulative | imported package"
+    cumulative = {}
+    for line in result.stderr.splitlines():
+        parts = [p.strip() for p in line.split("|")]
+        if len(parts) == 3 and parts[1].isdigit():
+            cumulative[parts[2]] = int(parts[1])
+    return cumulative
+
+
+@pytest.mark.parametrize(
+    "module",
+    ["tomorrow.__main__", "tomorrow.etl", "tomorrow.scheduler", "tomorrow.config_loader"],
+)
+def test_import_defers_heavy_dependencies(module):
+    """Entry-point import trees stay free of requests/SQLAlchemy/APScheduler/NumPy."""
+
+    imported = {name.split(".")[0] for name in _import_times(module)}
+
+    assert "tomorrow" in imported
+    assert imported.isdisjoint(HEAVY_MODULES)
+
+
+def test_cold_start_within_budget():
+    """Importing the CLI stays within the cold-start budget."""
+
+    cumulative = _import_times("tomorrow.__main__")
+
+    assert cumulative["tomorrow.__main__"] < COLD_START_BUDGET_US
+
+
+def test_parse_args_dry_run_and_check_config():
+    assert parse_args(["etl", "--dry-run"]).dry_run is True
+    assert parse_args([]).dry_run is False
+    assert parse_args(["check-config"]).command == "check-config"
@@ -0,0 +1,102 @@
+import json
+from unittest.mock import patch
+
+import pytest
+
+from tomorrow.etl import run_weather_etl
+from tomorrow.tracing import NoopTracer, Tracer, load_runs, summarize
+
+
+def test_spans_nest_and_export_otlp_json(tmp_path):
+    """Nested spans share a trace and are written as one OTLP/JSON line."""
+
+    path = tmp_path / "traces.jsonl"
+    tracer = Tracer(path=str(path))
+
+    with tracer.span("run") as run:
+        with tracer.span("location", location="25.9,-97.4") as location:
+            with tracer.span("fetch"):
+                pass
+        with pytest.raises(RuntimeError):
+            with tracer.span("location", location="25.8,-97.5"):
+                raise RuntimeError("boom")
+
+    assert tracer.flush() == 4
+
+    (line,) = path.read_text().splitlines()
+    spans = json.loads(line)["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    by_id = {s["spanId"]: s for s in spans}
+
+    fetch = next(s for s in spans if s["name"] == "fetch")
+    assert by_id[fetch["parentSpanId"]]["spanId"] == location.span_id
+    assert {s["traceId"] for s in spans} == {run.trace_id}
+    assert [s["status"]["code"] for s in spans if s["name"] == "location"] == [1, 2]
+
+
+def test_summarize_reports_slowest_locations(tmp_path):
+    path = tmp_path / "traces.jsonl"
+    tracer = Tracer(path=str(path))
+
+    for duration_ms in (5, 50):
+        run = tracer.start_span("run")
+        for location, factor in (("25.9,-97.4", 1), ("25.8,-97.5", 3)):
+            span = tracer.start_span("location", run, start_ns=0, location=location)
+            tracer.end_span(span, end_ns=int(duration_ms * factor * 1e6))
+        tracer.end_span(run)
+        tracer.flush()
+
+    summary = summarize(load_runs(str(path)), top=1)
+
+    assert summary["runs"] == 2
+    assert summary["stages"]["location"]["count"] == 4
+    assert summary["stages"]["location"]["max_ms"] == 150.0
+    assert summary["slowest_locations"] == [
+        {"location": "25.8,-97.5", "runs": 2, "max_ms": 150.0, "mean_ms": 82.5}
+    ]
+
+
+def test_full_buffer_is_flushed_mid_run(tmp_path):
+    """A run larger than the span buffer spans several lines, read back as one run."""
+
+    path = tmp_path / "traces.jsonl"
+    tracer = Tracer(path=str(path), max_buffered=3)
+    ended = []
+    tracer.on_end = ended.append
+
+    with tracer.span("run"):
+        for i in range(4):
+            with tracer.span("location", location=f"25.{i},-97.4"):
+                pass
+    tracer.flush()
+
+    assert len(path.read_text().splitlines()) == 2
+    assert len(tracer.spans()) == 0
+    assert len(ended) == 5
+    (spans,) = load_runs(str(path))
+    assert sorted(s["name"] for s in spans) == ["location"] * 4 + ["run"]
+
+
+def test_noop_tracer_exports_nothing(tmp_path):
+    tracer = NoopTracer()
+    with tracer.span("run"):
+        pass
+    assert tracer.flush() == 0
+
+
+@patch("tomorrow.etl.time.sleep")
+@patch("tomorrow.etl.WeatherDB")
+@patch("tomorrow.etl.TomorrowAPIClient")
+def test_etl_run_writes_location_and_load_spans(
+    mock_api_cls, mock_db_cls, mock_sleep, app_config, tmp_path
+):
+    path = tmp_path / "traces.jsonl"
+    config = dict(app_config, tracing={"path": str(path)})
+    mock_api_cls.return_value.fetch_weather_data.return_value = [{"temperature": 10}]
+
+    run_weather_etl(config)
+
+    (spans,) = load_runs(str(path))
+    assert sorted(s["name"] for s in spans) == ["load", "load", "location", "location", "run"]
+    assert {s["attributes"].get("location") for s in spans if s["name"] == "location"} == {
+        "25.9,-97.4", "25.8,-97.5",
+    }
@@ -0,0 +1,78 @@
+from datetime import datetime, timezone
+
+from tomorrow.watermark import LoadWatermarks, build_watermarks
+
+
+def _row(hour, is_forecast=False, lat=25.9, lon=-97.4):
+    return {
+        "latitude": lat,
+        "longitude": lon,
+        "time_stamp": datetime(2025, 12, 15, hour, tzinfo=timezone.utc),
+        "is_forecast": is_forecast,
+    }
+
+
+def test_filter_drops_rows_at_or_below_watermark():
+    marks = LoadWatermarks()
+    marks.set((25.9, -97.4), _row(12)["time_stamp"], _row(20)["time_stamp"])
+    rows = [_row(11), _row(12), _row(13), _row(20, True), _row(21, True), _row(5, lat=25.8)]
+
+    kept = marks.filter(rows)
+
+    assert kept == [_row(13), _row(21, True), _row(5, lat=25.8)]
+
+
+def test_unknown_and_advance():
+    marks = LoadWatermarks()
+    rows = [_row(10), _row(14), _row(18, True)]
+    assert marks.unknown(rows) == [(25.9, -97.4)]
+
+    marks.advance(rows)
+
+    assert marks.unknown(rows) == []
+    assert marks.filter(rows + [_row(15), _row(19, True)]) == [_row(15), _row(19, True)]
+
+
+def test_empty_location_keeps_everything():
+    marks = LoadWatermarks()
+    marks.set((25.9, -97.4), None, None)
+    rows = [_row(1), _row(2, True)]
+
+    assert marks.filter(rows) == rows
+
+
+def test_build_watermarks():
+    assert build_watermarks(None) is None
+    assert build_watermarks({"enabled": False}) is None
+    assert isinstance(build_watermarks({"enabled": True}), LoadWatermarks)
+
+
+def test_rows_with_cadence_only_fields_pass_the_watermark():
+    """A slow cadence's rows reach hours an hourly pass already stored."""
+
+    marks = LoadWatermarks(["humidity", "uvIndex"])
+    marks.set((25.9, -97.4), _row(20)["time_stamp"], _row(23, True)["time_stamp"])
+    hourly = {**_row(21, True), "humidity": None, "extra": None}
+    humid = {**_row(21, True), "humidity": 60}
+    uv = {**_row(19), "humidity": None, "extra": {"uvIndex": 3}}
+
+    assert marks.filter([hourly, humid, uv]) == [humid, uv]
+
+
+def test_build_watermarks_merges_cadence_only_fields():
+    cadences = [
+        {"fields": ["temperature", "humidity"], "every_hours": 1},
+        {"fields": ["humidity", "uvIndex"], "every_hours": 3},
+    ]
+    marks = build_watermarks({"enabled": True}, cadences)
+    row = {**_row(1), "humidity": None, "extra": {"uvIndex": 2}}
+    marks.set((25.9, -97.4), _row(5)["time_stamp"], None)
+
+    assert marks.filter([row, {**_row(2), "humidity": 40}]) == [row]
+
+
+def test_bulk_load_is_claimed_once():
+    marks = LoadWatermarks()
+
+    assert marks.claim_bulk_load() is True
+    assert marks.claim_bulk_load() is False
@@ -1,12 +1,16 @@
 # File: tomorrow/__main__.py
 
+import argparse
 import logging
 import os
 import sys
+from typing import List, Optional
 
-from tomorrow.etl import run_weather_etl
 from tomorrow.config_loader import load_config
 
+# ETL/schema modules (and with them requests/SQLAlchemy) are imported inside
+# the command that needs them so short-lived commands start quickly.
+
 
 def configure_logging() -> None:
     """Configure application-wide logging."""
@@ -18,21 +22,222 @@ def configure_logging() -> None:
     )
 
 
-def main() -> None:
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m tomorrow")
+    subparsers = parser.add_subparsers(dest="command")
+
+    etl = subparsers.add_parser("etl", help="Run the weather ETL once (default)")
+    etl.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Validate config and list the locations that would be scraped",
+    )
+
+    subparsers.add_parser(
+        "check-config", help="Validate config/config.yaml and the environment"
+    )
+
+    schema = subparsers.add_parser(
+        "schema", help="Create/upgrade weather_data indexes"
+    )
+    schema.add_argument(
+        "--keep-superseded",
+        action="store_true",
+        help="Do not drop indexes replaced by the current layout",
+    )
+    schema.add_argument(
+        "--backfill-rollups",
+        action="store_true",
+        help="Rebuild weather_daily_rollup from all existing rows",
+    )
+    schema.add_argument(
+        "--promote-field",
+        action="append",
+        default=[],
+        metavar="FIELD",
+        help="Add a generated column for an extra API field (rewrites weather_data)",
+    )
+
+    failures = subparsers.add_parser(
+        "failures", help="Report chronically failing locations from the retry queue"
+    )
+    failures.add_argument(
+        "--min-failures",
+        type=int,
+        help="Consecutive failures to report (default: retry.chronic_after)",
+    )
+
+    traces = subparsers.add_parser(
+        "traces", help="Summarize the slowest stages and locations of recent runs"
+    )
+    traces.add_argument("--runs", type=int, default=24, help="Recent runs to include")
+    traces.add_argument("--top", type=int, default=10, help="Slowest locations to list")
+
+    subparsers.add_parser(
+        "retention", help="Downsample old history and purge stale forecasts now"
+    )
+
+    changes = subparsers.add_parser(
+        "changes", help="Print change feed events as loads commit new rows"
+    )
+    changes.add_argument(
+        "--idle-timeout",
+        type=float,
+        help="Exit after this many seconds without an event (default: run forever)",
+    )
+
+    export = subparsers.add_parser(
+        "export", help="Export new weather_data rows to partitioned Parquet files"
+    )
+    export.add_argument("--output", help="Export directory (default: export.path)")
+    export.add_argument(
+        "--full",
+        action="store_true",
+        help="Discard the existing export and write every row again",
+    )
+
+    args = parser.parse_args(argv)
+    args.command = args.command or "etl"
+    args.dry_run = getattr(args, "dry_run", False)
+    return args
+
+
+def dry_run(config) -> int:
+    """Log every configured location without touching the API or database."""
+    from tomorrow.locations import iter_locations
+
+    logger = logging.getLogger(__name__)
+    count = 0
+    for location in iter_locations(config):
+        logger.info("Would scrape %s,%s", location["lat"], location["lon"])
+        count += 1
+    logger.info("Dry run: %d locations configured", count)
+    return count
+
+
+def report_failures(config, min_failures: Optional[int] = None) -> int:
+    """Print locations that keep failing; returns how many were listed."""
+    from tomorrow.retry import build_retry_queue
+
+    retry_config = config.get("retry")
+    if not retry_config or not retry_config.get("path"):
+        raise RuntimeError("retry.path is not configured; no failure history to report")
+
+    queue = build_retry_queue(retry_config)
+    try:
+        rows = queue.chronic(min_failures or retry_config.get("chronic_after", 3))
+    finally:
+        queue.close()
+
+    for row in rows:
+        print(
+            f"{row['latitude']},{row['longitude']}\t"
+            f"consecutive={row['consecutive_failures']}\t"
+            f"total={row['total_failures']}\t"
+            f"last_error={row['last_error']}"
+        )
+    return len(rows)
+
+
+def report_traces(config, runs: int = 24, top: int = 10) -> None:
+    """Print per-stage latencies and the slowest locations from the trace file."""
+    from tomorrow.tracing import load_runs, summarize
+
+    tracing_config = config.get("tracing")
+    if not tracing_config or not tracing_config.get("path"):
+        raise RuntimeError("tracing.path is not configured; no traces to report")
+
+    summary = summarize(load_runs(tracing_config["path"], runs), top)
+
+    print(f"Runs: {summary['runs']}")
+    print("stage\tcount\terrors\tp50_ms\tp95_ms\tmax_ms")
+    for name, stats in summary["stages"].items():
+        print(
+            f"{name}\t{stats['count']}\t{stats['errors']}\t"
+            f"{stats['p50_ms']}\t{stats['p95_ms']}\t{stats['max_ms']}"
+        )
+    print("\nslowest locations\truns\tmax_ms\tmean_ms")
+    for row in summary["slowest_locations"]:
+        print(f"{row['location']}\t{row['runs']}\t{row['max_ms']}\t{row['mean_ms']}")
+
+
+def watch_changes(config, idle_timeout: Optional[float] = None) -> int:
+    """Print change feed events as JSON lines; returns how many were printed."""
+    import json
+
+    from tomorrow.changes import ChangeSubscriber, change_channel
+
+    channel = change_channel(config.get("change_feed"))
+    if channel is None:
+        raise RuntimeError("change_feed is not configured; no events are published")
+
+    subscriber = ChangeSubscriber(config["db"], channel)
+    count = 0
+    try:
+        for event in subscriber.events(idle_timeout):
+            print(json.dumps(event, default=str), flush=True)
+            count += 1
+    finally:
+        subscriber.close()
+    return count
+
+
+def main(argv: Optional[List[str]] = None) -> None:
     """Application entry point."""
+    args = parse_args(argv)
+
     configure_logging()
     logger = logging.getLogger(__name__)
 
-    logger.info("Weather ETL process starting")
+    logger.info("Weather %s process starting", args.command.upper())
 
     try:
         config = load_config()
-        run_weather_etl(config)
+        if args.command == "check-config":
+            logger.info("Configuration OK (%d explicit locations)", len(config["locations"]))
+        elif args.command == "traces":
+            report_traces(config, args.runs, args.top)
+        elif args.command == "failures":
+            report_failures(config, args.min_failures)
+        elif args.command == "retention":
+            from tomorrow.retention import run_retention
+
+            if run_retention(config) is None:
+                raise RuntimeError("retention is not configured in config.yaml")
+        elif args.command == "changes":
+            watch_changes(config, args.idle_timeout)
+        elif args.command == "export":
+            from tomorrow import export
+
+            export_config = config.get("export") or {}
+            export.export_weather_data(
+                config["db"],
+                args.output or export_config.get("path", export.DEFAULT_EXPORT_PATH),
+                chunk_size=export_config.get("chunk_size", export.DEFAULT_CHUNK_SIZE),
+                lag_seconds=export_config.get("lag_seconds", export.DEFAULT_LAG_SECONDS),
+                full=args.full,
+                compact_parts=export_config.get("compact_parts", export.DEFAULT_COMPACT_PARTS),
+            )
+        elif args.command == "schema":
+            from tomorrow.schema import ensure_schema
+
+            ensure_schema(
+                config["db"],
+                drop_superseded=not args.keep_superseded,
+                backfill_rollups=args.backfill_rollups,
+                promote_fields=args.promote_field,
+            )
+        elif args.dry_run:
+            dry_run(config)
+        else:
+            from tomorrow.etl import run_weather_etl
+
+            run_weather_etl(config)
     except Exception:
-        logger.exception("Weather ETL process failed")
+        logger.exception("Weather %s process failed", args.command.upper())
         sys.exit(1)
 
-    logger.info("Weather ETL process finished successfully")
+    logger.info("Weather %s process finished successfully", args.command.upper())
 
 
 if __name__ == "__main__":
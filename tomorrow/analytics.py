@@ -0,0 +1,129 @@
+import glob
+import logging
+import os
+from datetime import datetime
+from typing import Dict, Any, Optional, Sequence
+
+import pandas as pd
+
+from .export import (
+    DATASET,
+    DEFAULT_CHUNK_SIZE,
+    DEFAULT_COMPACT_PARTS,
+    DEFAULT_EXPORT_PATH,
+    DEFAULT_LAG_SECONDS,
+    export_weather_data,
+)
+
+logger = logging.getLogger(__name__)
+
+DAILY_SUMMARY_SQL = """
+SELECT
+    latitude,
+    longitude,
+    CAST(time_stamp AT TIME ZONE 'UTC' AS DATE) AS day,
+    COUNT(*) AS hours,
+    MIN(temperature) AS temperature_min,
+    MAX(temperature) AS temperature_max,
+    AVG(temperature) AS temperature_mean,
+    MAX(wind_speed) AS wind_speed_max,
+    AVG(wind_speed) AS wind_speed_mean,
+    AVG(humidity) AS humidity_mean
+FROM weather_data
+WHERE is_forecast = ?
+  AND time_stamp >= ? AND time_stamp < ?
+  -- Hive partition column (UTC day): prunes whole files before scanning.
+  AND date BETWEEN ? AND ?
+GROUP BY 1, 2, 3
+ORDER BY 1, 2, 3
+"""
+
+
+class AnalyticsStore:
+    """
+    DuckDB mirror of weather_data over the Parquet export.
+
+    ``weather_data`` is a view over the exported files, so every query sees
+    the latest export without copying data, and heavy scans run vectorized
+    in the notebook process instead of on the ingestion database. Rows that
+    were exported again after a merge appear once, in their newest version.
+    """
+
+    def __init__(
+        self,
+        export_dir: str = DEFAULT_EXPORT_PATH,
+        path: Optional[str] = None,
+        threads: Optional[int] = None,
+    ):
+        try:
+            import duckdb
+        except ImportError as exc:
+            raise RuntimeError("The analytics store requires duckdb (pip install duckdb)") from exc
+
+        self.export_dir = export_dir
+        pattern = os.path.join(export_dir, DATASET, "*", "*.parquet")
+        if not glob.glob(pattern):
+            raise RuntimeError(
+                f"No exported data under {export_dir}; run `python -m tomorrow export`"
+            )
+
+        self.con = duckdb.connect(path or ":memory:")
+        if threads:
+            self.con.execute(f"SET threads = {int(threads)}")
+        self.con.execute(
+            "CREATE OR REPLACE VIEW weather_data AS "
+            f"SELECT * FROM read_parquet('{pattern.replace(chr(39), chr(39) * 2)}', "
+            "hive_partitioning = true) "
+            "QUALIFY row_number() OVER (PARTITION BY id ORDER BY ingestion_timestamp DESC) = 1"
+        )
+        logger.info("Analytics: DuckDB view over %s", pattern)
+
+    def query(self, sql: str, params: Optional[Sequence[Any]] = None) -> pd.DataFrame:
+        """Run any DuckDB SQL against the ``weather_data`` view."""
+        return self.con.execute(sql, list(params or [])).df()
+
+    def daily_summary(
+        self,
+        start: datetime,
+        end: datetime,
+        forecast: bool = False,
+    ) -> pd.DataFrame:
+        """Per-location daily aggregates for every location in [start, end)."""
+        return self.query(DAILY_SUMMARY_SQL, [forecast, start, end, start.date(), end.date()])
+
+    def close(self) -> None:
+        self.con.close()
+
+
+def build_analytics(config: Dict[str, Any]) -> Optional[AnalyticsStore]:
+    """Open the AnalyticsStore for the optional ``analytics`` config section."""
+    analytics_config = config.get("analytics")
+    if not analytics_config or not analytics_config.get("enabled", True):
+        return None
+
+    return AnalyticsStore(
+        export_dir=(config.get("export") or {}).get("path", DEFAULT_EXPORT_PATH),
+        path=analytics_config.get("path"),
+        threads=analytics_config.get("threads"),
+    )
+
+
+def sync_analytics(config: Dict[str, Any]) -> int:
+    """
+    Bring the Parquet export behind the store up to date (the scheduler's
+    analytics job). Returns the number of rows exported; failures are
+    logged, not raised, so they never stop the scheduler.
+    """
+    export_config = config.get("export") or {}
+    try:
+        result = export_weather_data(
+            config["db"],
+            export_config.get("path", DEFAULT_EXPORT_PATH),
+            chunk_size=export_config.get("chunk_size", DEFAULT_CHUNK_SIZE),
+            lag_seconds=export_config.get("lag_seconds", DEFAULT_LAG_SECONDS),
+            compact_parts=export_config.get("compact_parts", DEFAULT_COMPACT_PARTS),
+        )
+    except Exception:
+        logger.exception("Analytics: export refresh failed")
+        return 0
+    return result["rows"]
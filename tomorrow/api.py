@@ -1,11 +1,46 @@
+import json
 import requests
 import time
 import logging
 from datetime import datetime, timedelta, timezone
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterable, Optional, Tuple
+
+from .circuit import CircuitBreaker
+from .fields import encode_values
+from .retry import backoff_delay
+from .tracing import NoopTracer, Tracer, current_span
 
 logger = logging.getLogger(__name__)
 
+# Upper bound for one in-request retry wait; longer outages are handled by
+# the ETL retry queue instead of blocking this location.
+MAX_BACKOFF_SECONDS = 30
+
+# Default request window: 24h of history through 5 days ahead.
+DEFAULT_HISTORY_HOURS = 24
+DEFAULT_HORIZON_HOURS = 120
+
+# Compressed bodies are decoded chunk by chunk as they arrive.
+BODY_CHUNK_BYTES = 64 * 1024
+
+# Content codings in order of preference; only those urllib3 can decode
+# in this environment are offered (br needs brotli, zstd needs zstandard).
+_ENCODING_PREFERENCE = ("br", "zstd", "gzip", "deflate")
+
+
+def accept_encoding() -> str:
+    """Accept-Encoding value listing every supported coding, best first."""
+    from urllib3.util.request import ACCEPT_ENCODING
+
+    available = {coding.strip() for coding in ACCEPT_ENCODING.split(",")}
+    return ", ".join(c for c in _ENCODING_PREFERENCE if c in available)
+
+
+def due_cadences(cadences: Iterable[Any], now: datetime) -> List[Any]:
+    """Cadences whose ``every_hours`` divides the current UTC hour count."""
+    hour = int(now.timestamp() // 3600)
+    return [c for c in cadences if hour % max(1, int(c.get("every_hours", 1))) == 0]
+
 
 class TomorrowAPIClient:
     """
@@ -13,12 +48,19 @@ class TomorrowAPIClient:
 
     """
 
-    def __init__(self, api_config: Dict[str, Any]):
+    def __init__(
+        self,
+        api_config: Dict[str, Any],
+        breaker: Optional[CircuitBreaker] = None,
+        tracer: Optional[Tracer] = None,
+    ):
         self.base_url = api_config["base_url"]
         self.endpoint = api_config["forecast_endpoint"]
         self.key = api_config["key"]
 
         self.fields = ",".join(api_config["fields"])
+        # Optional per-cadence field sets and windows; see request_window.
+        self.cadences = tuple(api_config.get("cadences") or ())
         self.timesteps = api_config["timesteps"]
         self.units = api_config["units"]
 
@@ -26,7 +68,13 @@ class TomorrowAPIClient:
         self.timeout = api_config["timeout_seconds"]
         self.retry_backoff = api_config.get("retry_backoff_seconds", 2)
 
+        # Shared by every client in an ETL run, so one degraded upstream
+        # fails the remaining locations fast instead of timing each out.
+        self.breaker = breaker
+        self.tracer = tracer or NoopTracer()
+
         self.session = requests.Session()
+        self.session.headers["Accept-Encoding"] = accept_encoding()
 
         logger.info("Tomorrow.io Forecast API client initialized")
 
@@ -36,13 +84,46 @@ class TomorrowAPIClient:
         params["apikey"] = self.key
 
         for attempt in range(self.max_retries):
+            if self.breaker is not None:
+                self.breaker.check(f"Tomorrow.io ({location})")
+
             try:
-                response = self.session.get(url, params=params, timeout=self.timeout)
-                response.raise_for_status()
-                return response.json()
+                response = self.session.get(
+                    url, params=params, timeout=self.timeout, stream=True
+                )
+                try:
+                    response.raise_for_status()
+                    # Decompressed chunk by chunk as the body streams in, then
+                    # parsed straight from bytes (no intermediate str).
+                    body = b"".join(response.iter_content(BODY_CHUNK_BYTES))
+                    wire_bytes = response.raw.tell()
+                finally:
+                    response.close()
+                self._record_outcome(True)
+
+                span = current_span()
+                if span is not None:
+                    # elapsed covers DNS/connect/TLS up to the response headers;
+                    # the rest of the fetch span is body download.
+                    span.set_attribute("http.attempts", attempt + 1)
+                    span.set_attribute(
+                        "http.time_to_headers_ms",
+                        float(response.elapsed.total_seconds()) * 1000,
+                    )
+                    # Bytes on the wire (compressed) vs after decoding.
+                    span.set_attribute("http.response_bytes", wire_bytes)
+                    span.set_attribute("http.decoded_bytes", len(body))
+                    span.set_attribute(
+                        "http.content_encoding",
+                        response.headers.get("Content-Encoding", "identity"),
+                    )
+                return json.loads(body)
 
             except requests.exceptions.HTTPError as exc:
-                status = exc.response.status_code if exc.response else None
+                # A Response is falsy for 4xx/5xx, so test against None.
+                status = exc.response.status_code if exc.response is not None else None
+                # Other 4xx mean the upstream is up but rejected this request.
+                self._record_outcome(status is not None and status < 500 and status != 429)
 
                 # HARD STOP on rate limit
                 if status == 429:
@@ -56,9 +137,9 @@ class TomorrowAPIClient:
 
                 # Retry only transient server errors
                 if status in {500, 502, 503, 504} and attempt < self.max_retries - 1:
-                    wait = self.retry_backoff ** attempt
+                    wait = backoff_delay(attempt, self.retry_backoff, MAX_BACKOFF_SECONDS)
                     logger.warning(
-                        "Transient API error %s for %s. Retrying in %ss",
+                        "Transient API error %s for %s. Retrying in %.1fs",
                         status, location, wait,
                     )
                     time.sleep(wait)
@@ -69,56 +150,107 @@ class TomorrowAPIClient:
                     raise
 
             except requests.exceptions.RequestException as exc:
+                self._record_outcome(False)
                 if attempt < self.max_retries - 1:
-                    time.sleep(1)
+                    wait = backoff_delay(attempt, self.retry_backoff, MAX_BACKOFF_SECONDS)
+                    logger.warning(
+                        "Network error for %s (%s). Retrying in %.1fs", location, exc, wait
+                    )
+                    time.sleep(wait)
                 else:
                     raise
 
         raise RuntimeError(f"API failed after retries for {location}")
 
-    def fetch_weather_data(self, lat: float, lon: float) -> List[Dict[str, Any]]:
+    def _record_outcome(self, ok: bool) -> None:
+        if self.breaker is None:
+            return
+        if ok:
+            self.breaker.record_success()
+        else:
+            self.breaker.record_failure()
+
+    def request_window(self, now: datetime) -> Tuple[str, int, int]:
         """
-        Fetch hourly weather data from 24h ago to 5 days in the future
-        using /v4/weather/forecast.
+        Fields, history hours and horizon hours to request at ``now``.
+
+        Without cadences every call asks for all ``fields`` from 24h ago
+        to 5 days ahead. With cadences, one request carries the union of
+        the fields of every cadence due this hour, over the widest of
+        their windows, so slow-changing fields are fetched less often.
+        """
+        if not self.cadences:
+            return self.fields, DEFAULT_HISTORY_HOURS, DEFAULT_HORIZON_HOURS
+
+        due = due_cadences(self.cadences, now)
+        fields = dict.fromkeys(f for cadence in due for f in cadence["fields"])
+        return (
+            ",".join(fields),
+            max(int(c.get("history_hours", DEFAULT_HISTORY_HOURS)) for c in due),
+            max(int(c.get("horizon_hours", DEFAULT_HORIZON_HOURS)) for c in due),
+        )
+
+    def fetch_raw(self, lat: float, lon: float) -> Tuple[Dict[str, Any], datetime]:
+        """
+        Fetch the raw hourly forecast payload (by default from 24h ago to 5
+        days in the future). Returns the JSON body and the request time used
+        to classify intervals as forecast vs observed.
         """
         location = f"{lat},{lon}"
         now = datetime.now(timezone.utc)
+        fields, history_hours, horizon_hours = self.request_window(now)
 
         params = {
             "location": location,
             "timesteps": self.timesteps,
             "units": self.units,
-            "fields": self.fields,
-            "startTime": (now - timedelta(hours=24)).isoformat().replace("+00:00", "Z"),
-            "endTime": (now + timedelta(days=5)).isoformat().replace("+00:00", "Z"),
+            "fields": fields,
+            "startTime": (now - timedelta(hours=history_hours)).isoformat().replace("+00:00", "Z"),
+            "endTime": (now + timedelta(hours=horizon_hours)).isoformat().replace("+00:00", "Z"),
         }
 
         logger.info("Fetching forecast for %s", location)
-        raw = self._call_api(params, location)
-
-        intervals = raw.get("timelines", {}).get("hourly", [])
-        if not intervals:
-            logger.warning("No hourly data returned for %s", location)
-            return []
-
-        records: List[Dict[str, Any]] = []
-        for interval in intervals:
-            values = interval.get("values", {})
-            records.append(
-                {
-                    "time_stamp": datetime.fromisoformat(
-                        interval["time"].replace("Z", "+00:00")
-                    ),
-                    "is_forecast": interval["time"] > now.isoformat(),
-                    "temperature": values.get("temperature"),
-                    "wind_speed": values.get("windSpeed"),
-                    "humidity": values.get("humidity"),
-                    "precipitation_type": values.get("precipitationType"),
-                }
-            )
-
-        logger.info("Parsed %d hourly records for %s", len(records), location)
+        with self.tracer.span("fetch", location=location):
+            return self._call_api(params, location), now
+
+    def fetch_weather_data(self, lat: float, lon: float) -> List[Dict[str, Any]]:
+        """
+        Fetch hourly weather data from 24h ago to 5 days in the future
+        using /v4/weather/forecast.
+        """
+        raw, now = self.fetch_raw(lat, lon)
+        with self.tracer.span("parse", location=f"{lat},{lon}") as span:
+            records = parse_weather_response(raw, now, f"{lat},{lon}")
+            span.set_attribute("records", len(records))
         return records
 
     def close(self):
         self.session.close()
+
+
+def parse_weather_response(
+    raw: Dict[str, Any], now: datetime, location: str = ""
+) -> List[Dict[str, Any]]:
+    """
+    Turn a forecast payload into weather_data records.
+
+    A module-level function (no client state) so the ETL pipeline can run
+    it in a process pool.
+    """
+    intervals = raw.get("timelines", {}).get("hourly", [])
+    if not intervals:
+        logger.warning("No hourly data returned for %s", location)
+        return []
+
+    now_iso = now.isoformat()
+    records: List[Dict[str, Any]] = []
+    for interval in intervals:
+        # encode_values maps core fields to columns and keeps every other
+        # requested field for the JSONB ``extra`` column.
+        record = encode_values(interval.get("values", {}))
+        record["time_stamp"] = datetime.fromisoformat(interval["time"].replace("Z", "+00:00"))
+        record["is_forecast"] = interval["time"] > now_iso
+        records.append(record)
+
+    logger.info("Parsed %d hourly records for %s", len(records), location)
+    return records
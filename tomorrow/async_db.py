@@ -0,0 +1,317 @@
+import asyncio
+import json
+import logging
+import threading
+from concurrent.futures import Future
+from decimal import Decimal
+from typing import List, Dict, Any, Iterable, Optional, Set, Tuple
+
+from .cache import QueryCache
+from .changes import change_payloads
+from .fields import CORE_FIELDS, EXTRA_COLUMN, carries_fields, merge_on_conflict
+from .rollup import REFRESH_LOCATION_ASYNC_SQL, ROLLUP_TABLE, touched_ranges
+from .watermark import ALL_WATERMARKS_SQL, WATERMARK_ASYNC_SQL, LoadWatermarks
+
+logger = logging.getLogger(__name__)
+
+KEY_COLUMNS = ("latitude", "longitude", "time_stamp", "is_forecast")
+_REQUIRED = frozenset(KEY_COLUMNS)
+NUMERIC_COLUMNS = frozenset({"latitude", "longitude", "temperature", "wind_speed", "humidity"})
+
+# Per-connection staging table for binary COPY. COPY cannot skip
+# duplicates, so rows land here first and are moved into weather_data with
+# INSERT ... ON CONFLICT in the same transaction: DO UPDATE (merge) for rows
+# flagged by MERGE_COLUMN, DO NOTHING for the rest.
+STAGE_TABLE = "weather_data_stage"
+MERGE_COLUMN = "merge_row"
+
+
+async def _create_pool(db_config: Dict[str, str], size: int) -> Any:
+    try:
+        import asyncpg
+    except ImportError as exc:
+        raise RuntimeError("pipeline.async_db requires asyncpg (pip install asyncpg)") from exc
+
+    return await asyncpg.create_pool(
+        host=db_config["host"],
+        port=int(db_config["port"]),
+        user=db_config["user"],
+        password=db_config["password"],
+        database=db_config["database"],
+        min_size=1,
+        max_size=size,
+    )
+
+
+def _numeric(value: Any) -> Any:
+    # asyncpg's binary numeric codec wants Decimal; str() keeps the
+    # shortest repr rather than the float's binary expansion.
+    return Decimal(str(value)) if isinstance(value, float) else value
+
+
+class AsyncWeatherDB:
+    """
+    asyncpg counterpart of WeatherDB.bulk_insert_weather_data.
+
+    Rows are sent with binary COPY into a temporary staging table and then
+    inserted with the same ON CONFLICT semantics (merge only for rows with
+    a ``merge_fields`` value), daily rollup refresh and location registry
+    upkeep as the synchronous writer. The
+    pool holds up to ``pool_size`` connections, one per concurrent load.
+    """
+
+    def __init__(
+        self,
+        db_config: Dict[str, str],
+        pool_size: int = 4,
+        cache: Optional[QueryCache] = None,
+        notify_channel: Optional[str] = None,
+        watermarks: Optional[LoadWatermarks] = None,
+        merge_fields: Iterable[str] = (),
+    ):
+        self.db_config = db_config
+        self.pool_size = max(1, pool_size)
+        self.cache = cache
+        self.notify_channel = notify_channel
+        self.watermarks = watermarks
+        self._merges = carries_fields(merge_fields)
+        self.pool: Any = None
+        self.columns: Tuple[str, ...] = ()
+        self.insert_sql = ""
+        self.merge_sql = ""
+        self.maintain_rollups = False
+        self.maintain_location_registry = False
+
+    async def open(self) -> None:
+        self.pool = await _create_pool(self.db_config, self.pool_size)
+
+        async with self.pool.acquire() as conn:
+            existing = {
+                r["column_name"]
+                for r in await conn.fetch(
+                    "SELECT column_name FROM information_schema.columns "
+                    "WHERE table_schema = current_schema() AND table_name = 'weather_data'"
+                )
+            }
+            self.maintain_rollups = await conn.fetchval(
+                "SELECT to_regclass($1) IS NOT NULL", ROLLUP_TABLE
+            )
+            self.maintain_location_registry = await conn.fetchval(
+                "SELECT to_regclass('weather_locations') IS NOT NULL"
+            )
+
+        wanted = KEY_COLUMNS + tuple(CORE_FIELDS.values()) + (EXTRA_COLUMN,)
+        self.columns = tuple(c for c in wanted if c in existing)
+        merge_set, merge_where = merge_on_conflict(self.columns)
+        column_list = ", ".join(self.columns)
+        move = f"INSERT INTO weather_data ({column_list}) SELECT {column_list} FROM {STAGE_TABLE}"
+        self.insert_sql = (
+            f"{move} WHERE NOT {MERGE_COLUMN} "
+            f"ON CONFLICT ({', '.join(KEY_COLUMNS)}) DO NOTHING"
+        )
+        # xmax is 0 for a freshly inserted row version.
+        self.merge_sql = (
+            f"{move} WHERE {MERGE_COLUMN} "
+            f"ON CONFLICT ({', '.join(KEY_COLUMNS)}) DO UPDATE SET "
+            + ", ".join(f"{c} = {expr}" for c, expr in merge_set.items())
+            + f" WHERE {merge_where} RETURNING xmax = 0"
+        )
+        if EXTRA_COLUMN not in self.columns:
+            logger.warning("DB: weather_data.%s missing, extra API fields dropped", EXTRA_COLUMN)
+        if not self.maintain_rollups:
+            logger.warning("DB: %s missing, daily rollups disabled", ROLLUP_TABLE)
+
+        logger.info("DB: async pool ready (max %d connections)", self.pool_size)
+
+    def _records(self, rows: List[Dict[str, Any]]) -> List[Tuple[Any, ...]]:
+        records = []
+        for row in rows:
+            record = []
+            for column in self.columns:
+                value = row.get(column)
+                if column in NUMERIC_COLUMNS:
+                    value = _numeric(value)
+                elif column == EXTRA_COLUMN and value is not None:
+                    value = json.dumps(value)
+                record.append(value)
+            record.append(self._merges(row))
+            records.append(tuple(record))
+        return records
+
+    async def bulk_insert_weather_data(self, rows: List[Dict[str, Any]]) -> int:
+        """
+        Insert valid rows; returns how many were new. Already stored rows
+        are skipped, or merged into when they carry a ``merge_fields`` value.
+        """
+        rows = [r for r in rows if _REQUIRED.issubset(r)]
+        if not rows:
+            logger.warning("DB: No valid rows to insert")
+            return 0
+
+        column_list = ", ".join(self.columns)
+
+        try:
+            async with self.pool.acquire() as conn:
+                if self.watermarks is not None:
+                    unknown = self.watermarks.unknown(rows)
+                    if (
+                        unknown
+                        and self.maintain_location_registry
+                        and self.watermarks.claim_bulk_load()
+                    ):
+                        for lat, lon, observed, forecast in await conn.fetch(ALL_WATERMARKS_SQL):
+                            self.watermarks.set((lat, lon), observed, forecast)
+                        unknown = self.watermarks.unknown(rows)
+                    for lat, lon in unknown:
+                        observed, forecast = await conn.fetchrow(
+                            WATERMARK_ASYNC_SQL, _numeric(lat), _numeric(lon)
+                        )
+                        self.watermarks.set((lat, lon), observed, forecast)
+                    rows = self.watermarks.filter(rows)
+                    if not rows:
+                        return 0
+
+                async with conn.transaction():
+                    await conn.execute(
+                        f"CREATE TEMP TABLE IF NOT EXISTS {STAGE_TABLE} ON COMMIT DELETE ROWS "
+                        f"AS SELECT {column_list}, false AS {MERGE_COLUMN} "
+                        f"FROM weather_data WITH NO DATA"
+                    )
+                    records = self._records(rows)
+                    await conn.copy_records_to_table(
+                        STAGE_TABLE,
+                        records=records,
+                        columns=[*self.columns, MERGE_COLUMN],
+                    )
+                    merging = sum(1 for record in records if record[-1])
+                    inserted = merged = 0
+                    if merging < len(records):
+                        status = await conn.execute(self.insert_sql)
+                        # Command tag "INSERT 0 <rows>".
+                        inserted = int(status.split()[-1])
+                    if merging:
+                        for (new,) in await conn.fetch(self.merge_sql):
+                            if new:
+                                inserted += 1
+                            else:
+                                merged += 1
+
+                    if inserted or merged:
+                        ranges = touched_ranges(rows)
+                        if self.maintain_rollups:
+                            await conn.executemany(
+                                REFRESH_LOCATION_ASYNC_SQL,
+                                [
+                                    (_numeric(lat), _numeric(lon), start, end)
+                                    for (lat, lon), (start, end) in ranges.items()
+                                ],
+                            )
+                        if self.maintain_location_registry:
+                            await conn.executemany(
+                                "INSERT INTO weather_locations (latitude, longitude) "
+                                "VALUES ($1, $2) ON CONFLICT DO NOTHING",
+                                [(_numeric(lat), _numeric(lon)) for lat, lon in ranges],
+                            )
+                        if self.notify_channel:
+                            await conn.execute(
+                                "SELECT pg_notify($1, payload) FROM unnest($2::text[]) AS payload",
+                                self.notify_channel,
+                                change_payloads(rows, inserted, merged),
+                            )
+        except Exception:
+            logger.exception("DB: Async bulk insert failed")
+            raise
+
+        if self.watermarks is not None:
+            self.watermarks.advance(rows)
+
+        if (inserted or merged) and self.cache is not None:
+            # The shared cache writes to SQLite: keep that blocking I/O off the loop.
+            await asyncio.get_running_loop().run_in_executor(
+                None, self._invalidate_cache, {(r["latitude"], r["longitude"]) for r in rows}
+            )
+
+        logger.info(
+            "DB: Inserted %d and merged %d of %d rows (duplicates skipped)",
+            inserted,
+            merged,
+            len(rows),
+        )
+        return inserted
+
+    def _invalidate_cache(self, locations: Set[Tuple[float, float]]) -> None:
+        try:
+            for lat, lon in locations:
+                self.cache.invalidate_location(lat, lon)
+        except Exception:
+            logger.exception("DB: Query cache invalidation failed")
+
+    async def close(self) -> None:
+        if self.pool is not None:
+            await self.pool.close()
+
+
+class AsyncLoader:
+    """
+    Runs an AsyncWeatherDB on its own event loop thread, so synchronous
+    pipeline stages can hand off batches without waiting for the write.
+    """
+
+    def __init__(
+        self,
+        db_config: Dict[str, str],
+        pool_size: int = 4,
+        cache: Optional[QueryCache] = None,
+        notify_channel: Optional[str] = None,
+        watermarks: Optional[LoadWatermarks] = None,
+        merge_fields: Iterable[str] = (),
+    ):
+        self.db = AsyncWeatherDB(
+            db_config,
+            pool_size=pool_size,
+            cache=cache,
+            notify_channel=notify_channel,
+            watermarks=watermarks,
+            merge_fields=merge_fields,
+        )
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._loop.run_forever, name="etl-async-db", daemon=True
+        )
+        self._thread.start()
+
+        try:
+            self._call(self.db.open()).result()
+        except Exception:
+            self._stop()
+            raise
+
+    def _call(self, coro: Any) -> Future:
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+    def submit(self, rows: List[Dict[str, Any]]) -> Future:
+        """Start inserting ``rows``; the Future resolves to the inserted count."""
+        return self._call(self.db.bulk_insert_weather_data(rows))
+
+    def bulk_insert_weather_data(self, rows: List[Dict[str, Any]]) -> int:
+        return self.submit(rows).result()
+
+    def _stop(self) -> None:
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+    def close(self) -> None:
+        """Wait for in-flight inserts, then close the pool and the loop."""
+        async def drain() -> None:
+            pending = [
+                t for t in asyncio.all_tasks() if t is not asyncio.current_task()
+            ]
+            await asyncio.gather(*pending, return_exceptions=True)
+            await self.db.close()
+            await self._loop.shutdown_default_executor()
+
+        try:
+            self._call(drain()).result()
+        finally:
+            self._stop()
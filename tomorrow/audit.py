@@ -0,0 +1,265 @@
+import logging
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import List, Dict, Any, Optional
+
+from sqlalchemy import create_engine, inspect, text
+
+from .db import build_db_url
+from .tracing import STATUS_ERROR, Span
+
+logger = logging.getLogger(__name__)
+
+# Keep in sync with scripts/init-db.sql (tomorrow/schema.py creates them on
+# existing databases).
+AUDIT_TABLES: List[str] = [
+    """
+    CREATE TABLE IF NOT EXISTS etl_runs (
+        run_id BIGSERIAL PRIMARY KEY,
+        trace_id TEXT,
+        started_at TIMESTAMPTZ NOT NULL,
+        finished_at TIMESTAMPTZ NOT NULL,
+        status TEXT NOT NULL,
+        locations INTEGER NOT NULL,
+        failed_locations INTEGER NOT NULL,
+        rows_sent BIGINT NOT NULL,
+        rows_inserted BIGINT NOT NULL,
+        bytes_fetched BIGINT NOT NULL,
+        fetch_ms DOUBLE PRECISION NOT NULL,
+        parse_ms DOUBLE PRECISION NOT NULL,
+        load_ms DOUBLE PRECISION NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS etl_location_runs (
+        run_id BIGINT NOT NULL REFERENCES etl_runs (run_id) ON DELETE CASCADE,
+        latitude NUMERIC(10,6) NOT NULL,
+        longitude NUMERIC(10,6) NOT NULL,
+        started_at TIMESTAMPTZ NOT NULL,
+        status TEXT NOT NULL,
+        error TEXT,
+        rows_sent INTEGER NOT NULL,
+        rows_inserted INTEGER NOT NULL,
+        bytes_fetched BIGINT NOT NULL,
+        fetch_ms DOUBLE PRECISION,
+        parse_ms DOUBLE PRECISION,
+        load_ms DOUBLE PRECISION,
+        total_ms DOUBLE PRECISION NOT NULL
+    )
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS idx_etl_location_runs_location
+    ON etl_location_runs (latitude, longitude, started_at)
+    """,
+]
+
+INSERT_RUN_SQL = """
+INSERT INTO etl_runs (
+    trace_id, started_at, finished_at, status, locations, failed_locations,
+    rows_sent, rows_inserted, bytes_fetched, fetch_ms, parse_ms, load_ms
+)
+VALUES (
+    :trace_id, :started_at, :finished_at, :status, :locations, :failed_locations,
+    :rows_sent, :rows_inserted, :bytes_fetched, :fetch_ms, :parse_ms, :load_ms
+)
+RETURNING run_id
+"""
+
+# Totals of a run whose locations were written while it ran. The location
+# count is distinct coordinates: retry passes add rows for the same point.
+FINISH_RUN_SQL = """
+UPDATE etl_runs SET
+    trace_id = :trace_id,
+    started_at = :started_at,
+    finished_at = :finished_at,
+    status = :status,
+    locations = (
+        SELECT COUNT(*) FROM (
+            SELECT DISTINCT latitude, longitude FROM etl_location_runs WHERE run_id = :run_id
+        ) AS l
+    ),
+    failed_locations = :failed_locations,
+    rows_sent = :rows_sent,
+    rows_inserted = :rows_inserted,
+    bytes_fetched = :bytes_fetched,
+    fetch_ms = :fetch_ms,
+    parse_ms = :parse_ms,
+    load_ms = :load_ms
+WHERE run_id = :run_id
+"""
+
+INSERT_LOCATION_RUN_SQL = """
+INSERT INTO etl_location_runs (
+    run_id, latitude, longitude, started_at, status, error, rows_sent,
+    rows_inserted, bytes_fetched, fetch_ms, parse_ms, load_ms, total_ms
+)
+VALUES (
+    :run_id, :latitude, :longitude, :started_at, :status, :error, :rows_sent,
+    :rows_inserted, :bytes_fetched, :fetch_ms, :parse_ms, :load_ms, :total_ms
+)
+"""
+
+
+def _timestamp(ns: int) -> datetime:
+    return datetime.fromtimestamp(ns / 1e9, tz=timezone.utc)
+
+
+_STAGES = ("fetch", "parse", "load")
+_TOTALS = ("rows_sent", "rows_inserted", "bytes_fetched", "fetch_ms", "parse_ms", "load_ms")
+
+
+def _location_row(span: Span, stages: Dict[str, Span]) -> Dict[str, Any]:
+    """etl_location_runs row for a finished location span and its stage spans."""
+    fetch, parse, load = stages.get("fetch"), stages.get("parse"), stages.get("load")
+    lat, lon = (float(v) for v in span.attributes["location"].split(","))
+    return {
+        "latitude": lat,
+        "longitude": lon,
+        "started_at": _timestamp(span.start_ns),
+        "status": "failed" if span.status == STATUS_ERROR else "ok",
+        "error": span.error,
+        "rows_sent": int(load.attributes.get("rows", 0)) if load else 0,
+        "rows_inserted": int(load.attributes.get("rows_inserted", 0)) if load else 0,
+        "bytes_fetched": int(fetch.attributes.get("http.response_bytes", 0)) if fetch else 0,
+        "fetch_ms": fetch.duration_ms if fetch else None,
+        "parse_ms": parse.duration_ms if parse else None,
+        "load_ms": load.duration_ms if load else None,
+        "total_ms": span.duration_ms,
+    }
+
+
+def _run_status(run: Span, failed: int) -> str:
+    return "failed" if run.status == STATUS_ERROR else ("partial" if failed else "ok")
+
+
+class RunAudit:
+    """
+    Records a run in etl_runs / etl_location_runs from its spans as they
+    finish (the tracer's ``on_end``), instead of from the whole span list
+    at the end of the run.
+
+    Stage spans are held only until their location span finishes; the
+    location's row is then queued and written every ``chunk_size``
+    locations, and only run totals are kept. The etl_runs row is inserted
+    with status ``running`` before the first chunk and completed by
+    ``finish``. Audit failures are logged and stop the audit, never the run.
+    """
+
+    def __init__(self, db_config: Dict[str, Any], chunk_size: int = 1000):
+        self.db_config = db_config
+        self.chunk_size = chunk_size
+        self.run_id: Optional[int] = None
+        self._engine: Any = None
+        self._disabled = False
+        self._lock = threading.Lock()
+        self._started_ns = time.time_ns()
+        self._trace_id: Optional[str] = None
+        self._run: Optional[Span] = None
+        self._stages: Dict[str, Dict[str, Span]] = defaultdict(dict)
+        self._pending: List[Dict[str, Any]] = []
+        self._failed = 0
+        self._totals: Dict[str, float] = dict.fromkeys(_TOTALS, 0)
+
+    def on_end(self, span: Span) -> None:
+        if self._disabled:
+            return
+        with self._lock:
+            self._trace_id = self._trace_id or span.trace_id
+            if span.name == "run" and span.parent_id is None:
+                self._run = span
+                return
+            if span.name in _STAGES and span.parent_id:
+                self._stages[span.parent_id][span.name] = span
+                return
+            if span.name != "location":
+                return
+
+            stages = self._stages.pop(span.span_id, {})
+            if "location" not in span.attributes:
+                return
+            row = _location_row(span, stages)
+            self._failed += row["status"] == "failed"
+            for key in _TOTALS:
+                self._totals[key] += row[key] or 0
+            self._pending.append(row)
+            if len(self._pending) >= self.chunk_size:
+                self._write(self._write_locations)
+
+    def finish(self) -> Optional[int]:
+        """Write the remaining locations and the run totals; returns the run_id."""
+        if self._disabled:
+            return None
+        with self._lock:
+            if not self._write(self._finish):
+                return None
+            self._stages.clear()
+
+        logger.info(
+            "Audit: run %s recorded (%d/%d rows inserted, %d bytes)",
+            self.run_id, self._totals["rows_inserted"], self._totals["rows_sent"],
+            self._totals["bytes_fetched"],
+        )
+        return self.run_id
+
+    def close(self) -> None:
+        if self._engine is not None:
+            self._engine.dispose()
+
+    def _write(self, work: Any) -> bool:
+        try:
+            if self._engine is None:
+                self._engine = create_engine(
+                    build_db_url(self.db_config), pool_size=1, max_overflow=0, future=True
+                )
+                if not inspect(self._engine).has_table("etl_runs"):
+                    logger.warning("Audit: etl_runs missing, run `python -m tomorrow schema`")
+                    self._disabled = True
+                    return False
+            with self._engine.begin() as conn:
+                work(conn)
+            return True
+        except Exception:
+            logger.exception("Audit: failed to record run")
+            self._disabled = True
+            return False
+
+    def _write_locations(self, conn: Any) -> None:
+        if self.run_id is None:
+            started = _timestamp(self._started_ns)
+            self.run_id = conn.execute(
+                text(INSERT_RUN_SQL),
+                {
+                    "trace_id": self._trace_id,
+                    "started_at": started,
+                    "finished_at": started,
+                    "status": "running",
+                    "locations": 0,
+                    "failed_locations": 0,
+                    **dict.fromkeys(_TOTALS, 0),
+                },
+            ).scalar_one()
+        if self._pending:
+            conn.execute(
+                text(INSERT_LOCATION_RUN_SQL),
+                [dict(row, run_id=self.run_id) for row in self._pending],
+            )
+            self._pending = []
+
+    def _finish(self, conn: Any) -> None:
+        self._write_locations(conn)
+        run, now = self._run, time.time_ns()
+        conn.execute(
+            text(FINISH_RUN_SQL),
+            {
+                "run_id": self.run_id,
+                "trace_id": run.trace_id if run else self._trace_id,
+                "started_at": _timestamp(run.start_ns if run else self._started_ns),
+                "finished_at": _timestamp((run.end_ns or now) if run else now),
+                "status": _run_status(run, self._failed) if run else "failed",
+                "failed_locations": self._failed,
+                **self._totals,
+            },
+        )
+
@@ -0,0 +1,224 @@
+import logging
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Hashable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+ALL_LOCATIONS = "*"
+
+
+def location_key(lat: Optional[float], lon: Optional[float]) -> str:
+    """Normalise a coordinate pair to the precision stored in weather_data."""
+    if lat is None or lon is None:
+        return ALL_LOCATIONS
+    return f"{float(lat):.6f},{float(lon):.6f}"
+
+
+class QueryCache:
+    """
+    LRU cache for read-query results, invalidated per location by ETL loads.
+
+    Entries are keyed by (query name, location, window). Each location has a
+    generation counter that ``invalidate_location`` bumps; an entry is only
+    served while the generation it was stored under is still current, and
+    all-location entries also depend on the global ``*`` generation.
+
+    With ``path`` set, generations and pickled results live in a SQLite file
+    so the ETL process can invalidate entries cached by the notebook or the
+    query service.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 256,
+        path: Optional[str] = None,
+        max_disk_entries: int = 4096,
+    ):
+        self.max_entries = max_entries
+        self.max_disk_entries = max_disk_entries
+        self.path = path
+
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, Tuple[int, Any]]" = OrderedDict()
+        self._generations: Dict[str, int] = {}
+        self._conn: Optional[sqlite3.Connection] = None
+
+        if path:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self._conn = sqlite3.connect(path, timeout=5, check_same_thread=False)
+            self._conn.executescript(
+                """
+                PRAGMA journal_mode=WAL;
+                CREATE TABLE IF NOT EXISTS cache_generations (
+                    location TEXT PRIMARY KEY,
+                    generation INTEGER NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS cache_entries (
+                    cache_key TEXT PRIMARY KEY,
+                    location TEXT NOT NULL,
+                    generation INTEGER NOT NULL,
+                    value BLOB NOT NULL,
+                    last_used REAL NOT NULL
+                );
+                """
+            )
+            logger.info("Cache: Shared query cache at %s", path)
+
+    # --- generations ---
+
+    def _generation(self, location: str) -> int:
+        if self._conn is None:
+            return self._generations.get(location, 0)
+
+        row = self._conn.execute(
+            "SELECT generation FROM cache_generations WHERE location = ?",
+            (location,),
+        ).fetchone()
+        return row[0] if row else 0
+
+    # --- public API ---
+
+    def generation(self, key: Tuple[str, str, Hashable]) -> int:
+        """
+        Current generation of ``key``'s location. Read it before running the
+        query and pass it to ``set`` so a load that lands meanwhile is not
+        masked by the now-stale result.
+        """
+        with self._lock:
+            return self._generation(key[1])
+
+    def get(self, key: Tuple[str, str, Hashable]) -> Optional[Any]:
+        """Return the cached value for ``key`` or None if absent/stale."""
+        location = key[1]
+
+        with self._lock:
+            generation = self._generation(location)
+
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] == generation:
+                    self._entries.move_to_end(key)
+                    return entry[1]
+                del self._entries[key]
+
+            if self._conn is None:
+                return None
+
+            row = self._conn.execute(
+                "SELECT generation, value FROM cache_entries WHERE cache_key = ?",
+                (repr(key),),
+            ).fetchone()
+            if row is None or row[0] != generation:
+                return None
+
+            self._conn.execute(
+                "UPDATE cache_entries SET last_used = ? WHERE cache_key = ?",
+                (time.time(), repr(key)),
+            )
+            self._conn.commit()
+
+            value = pickle.loads(row[1])
+            self._store_memory(key, generation, value)
+            return value
+
+    def set(
+        self, key: Tuple[str, str, Hashable], value: Any, generation: Optional[int] = None
+    ) -> None:
+        """
+        Store ``value`` under ``generation`` (the snapshot taken before it was
+        computed; defaults to the current one). Values computed before an
+        invalidation are dropped.
+        """
+        location = key[1]
+
+        with self._lock:
+            current = self._generation(location)
+            if generation is None:
+                generation = current
+            elif generation != current:
+                logger.debug("Cache: Dropping %s, invalidated while computing", key[0])
+                return
+            self._store_memory(key, generation, value)
+
+            if self._conn is None:
+                return
+
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache_entries "
+                "(cache_key, location, generation, value, last_used) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (
+                    repr(key),
+                    location,
+                    generation,
+                    pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL),
+                    time.time(),
+                ),
+            )
+            self._conn.execute(
+                "DELETE FROM cache_entries WHERE cache_key NOT IN ("
+                "SELECT cache_key FROM cache_entries "
+                "ORDER BY last_used DESC LIMIT ?)",
+                (self.max_disk_entries,),
+            )
+            self._conn.commit()
+
+    def _store_memory(self, key: Hashable, generation: int, value: Any) -> None:
+        self._entries[key] = (generation, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate_location(self, lat: float, lon: float) -> None:
+        """Mark results for one location (and all-location results) stale."""
+        locations = (location_key(lat, lon), ALL_LOCATIONS)
+
+        with self._lock:
+            if self._conn is None:
+                for location in locations:
+                    self._generations[location] = self._generations.get(location, 0) + 1
+                return
+
+            for location in locations:
+                self._conn.execute(
+                    "INSERT INTO cache_generations (location, generation) "
+                    "VALUES (?, 1) ON CONFLICT(location) "
+                    "DO UPDATE SET generation = generation + 1",
+                    (location,),
+                )
+            self._conn.execute(
+                "DELETE FROM cache_entries WHERE location IN (?, ?)", locations
+            )
+            self._conn.commit()
+
+        logger.debug("Cache: Invalidated results for %s", locations[0])
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._generations.clear()
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM cache_entries")
+                self._conn.commit()
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+def build_cache(cache_config: Optional[Dict[str, Any]]) -> Optional[QueryCache]:
+    """Create a QueryCache from the optional ``cache`` config section."""
+    if not cache_config or not cache_config.get("enabled", True):
+        return None
+
+    return QueryCache(
+        max_entries=cache_config.get("max_entries", 256),
+        path=cache_config.get("path"),
+        max_disk_entries=cache_config.get("max_disk_entries", 4096),
+    )
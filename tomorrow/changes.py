@@ -0,0 +1,131 @@
+import json
+import logging
+import re
+import select
+from datetime import datetime
+from typing import List, Dict, Any, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHANNEL = "weather_data_changes"
+
+_CHANNEL_RE = re.compile(r"^[a-z_][a-z0-9_]*$")
+
+# One pg_notify per payload; delivered to listeners only when the insert
+# transaction commits.
+NOTIFY_SQL = (
+    "SELECT pg_notify(:channel, payload) "
+    "FROM unnest(CAST(:payloads AS text[])) AS payload"
+)
+
+
+def change_channel(change_feed_config: Optional[Dict[str, Any]]) -> Optional[str]:
+    """NOTIFY channel from the optional ``change_feed`` section (None: disabled)."""
+    if not change_feed_config or not change_feed_config.get("enabled", True):
+        return None
+    channel = change_feed_config.get("channel", DEFAULT_CHANNEL)
+    if not _CHANNEL_RE.match(channel):
+        raise RuntimeError(f"Invalid change_feed channel: {channel!r}")
+    return channel
+
+
+def change_payloads(rows: List[Dict[str, Any]], inserted: int, merged: int = 0) -> List[str]:
+    """
+    One compact JSON NOTIFY payload per location in a committed batch:
+    location, time range and row counts (``inserted``, and ``merged`` into
+    already stored rows, are the whole batch's).
+    """
+    return [
+        json.dumps(
+            {
+                "lat": float(lat),
+                "lon": float(lon),
+                "start": _iso(start),
+                "end": _iso(end),
+                "rows": count,
+                "inserted": inserted,
+                "merged": merged,
+            },
+            separators=(",", ":"),
+        )
+        for (lat, lon), (start, end, count) in _ranges_with_counts(rows).items()
+    ]
+
+
+def _iso(value: Any) -> str:
+    return value.isoformat() if isinstance(value, datetime) else str(value)
+
+
+def _ranges_with_counts(rows: List[Dict[str, Any]]) -> Dict[Any, List[Any]]:
+    """[earliest time_stamp, latest time_stamp, rows] per location."""
+    ranges: Dict[Any, List[Any]] = {}
+    for row in rows:
+        key = (row["latitude"], row["longitude"])
+        stamp = row["time_stamp"]
+        entry = ranges.get(key)
+        if entry is None:
+            ranges[key] = [stamp, stamp, 1]
+        else:
+            entry[0] = min(entry[0], stamp)
+            entry[1] = max(entry[1], stamp)
+            entry[2] += 1
+    return ranges
+
+
+def parse_change(payload: str) -> Dict[str, Any]:
+    """Decode a NOTIFY payload; ``start``/``end`` become datetimes."""
+    event = json.loads(payload)
+    event["start"] = datetime.fromisoformat(event["start"])
+    event["end"] = datetime.fromisoformat(event["end"])
+    return event
+
+
+class ChangeSubscriber:
+    """
+    LISTENs on the change feed channel and yields one event per committed
+    location batch, so caches and dashboards refresh only when new rows
+    land instead of polling weather_data.
+
+    Notifications are only delivered while connected; consumers that
+    restart should do one full refresh before iterating.
+    """
+
+    def __init__(self, db_config: Dict[str, str], channel: str = DEFAULT_CHANNEL):
+        import psycopg2
+
+        if not _CHANNEL_RE.match(channel):
+            raise ValueError(f"Invalid channel name: {channel!r}")
+
+        self.channel = channel
+        self.conn = psycopg2.connect(
+            host=db_config["host"],
+            port=db_config["port"],
+            user=db_config["user"],
+            password=db_config["password"],
+            dbname=db_config["database"],
+        )
+        self.conn.autocommit = True
+        with self.conn.cursor() as cursor:
+            cursor.execute(f"LISTEN {channel}")
+        logger.info("Changes: listening on %s", channel)
+
+    def events(self, idle_timeout: Optional[float] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Yield change events as they arrive. Stops after ``idle_timeout``
+        seconds without a notification (never if None).
+        """
+        while True:
+            ready, _, _ = select.select([self.conn], [], [], idle_timeout)
+            if not ready:
+                return
+
+            self.conn.poll()
+            while self.conn.notifies:
+                notify = self.conn.notifies.pop(0)
+                try:
+                    yield parse_change(notify.payload)
+                except (ValueError, KeyError):
+                    logger.warning("Changes: ignoring malformed payload %r", notify.payload)
+
+    def close(self) -> None:
+        self.conn.close()
@@ -0,0 +1,134 @@
+import logging
+import threading
+import time
+from collections import deque
+from typing import Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(RuntimeError):
+    """
+    Raised instead of calling an upstream that the breaker considers down.
+    ``retry_at`` is the epoch time from which the breaker lets a call through.
+    """
+
+    def __init__(self, message: str, retry_at: Optional[float] = None):
+        super().__init__(message)
+        self.retry_at = time.time() if retry_at is None else retry_at
+
+
+class CircuitBreaker:
+    """
+    Error-rate circuit breaker shared by every API call in an ETL run.
+
+    Closed: calls go through; outcomes are kept in a sliding window of the
+    last ``window`` calls. Once at least ``min_requests`` are recorded and the
+    failure share reaches ``failure_rate``, the breaker opens.
+
+    Open: calls fail fast with CircuitOpenError for ``open_seconds``.
+
+    Half-open: one probe call is let through; success closes the breaker,
+    failure re-opens it for another ``open_seconds``.
+    """
+
+    def __init__(
+        self,
+        failure_rate: float = 0.5,
+        min_requests: int = 10,
+        window: int = 20,
+        open_seconds: float = 60,
+    ):
+        if not 0 < failure_rate <= 1:
+            raise ValueError("failure_rate must be in (0, 1]")
+
+        self.failure_rate = failure_rate
+        self.min_requests = min_requests
+        self.open_seconds = open_seconds
+
+        self._lock = threading.Lock()
+        self._outcomes: deque = deque(maxlen=window)
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == OPEN and time.monotonic() - self._opened_at >= self.open_seconds:
+                return HALF_OPEN
+            return self._state
+
+    def allow(self) -> bool:
+        """Whether a call may be made now (claims the probe when half-open)."""
+        with self._lock:
+            if self._state == CLOSED:
+                return True
+
+            if self._state == OPEN:
+                if time.monotonic() - self._opened_at < self.open_seconds:
+                    return False
+                self._state = HALF_OPEN
+                logger.info("Circuit breaker half-open: probing upstream")
+
+            if self._probe_in_flight:
+                return False
+            self._probe_in_flight = True
+            return True
+
+    def retry_at(self) -> float:
+        """Epoch seconds at which the breaker half-opens (now unless open)."""
+        with self._lock:
+            remaining = 0.0
+            if self._state == OPEN:
+                remaining = self.open_seconds - (time.monotonic() - self._opened_at)
+            return time.time() + max(0.0, remaining)
+
+    def check(self, name: str = "upstream") -> None:
+        if not self.allow():
+            raise CircuitOpenError(f"Circuit open for {name}; failing fast", self.retry_at())
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self._state == HALF_OPEN:
+                logger.info("Circuit breaker closed: upstream recovered")
+                self._state = CLOSED
+                self._outcomes.clear()
+                self._probe_in_flight = False
+            self._outcomes.append(True)
+
+    def record_failure(self) -> None:
+        with self._lock:
+            if self._state == HALF_OPEN:
+                self._open()
+                return
+
+            self._outcomes.append(False)
+            if self._state == CLOSED and len(self._outcomes) >= self.min_requests:
+                failures = self._outcomes.count(False)
+                if failures / len(self._outcomes) >= self.failure_rate:
+                    self._open()
+
+    def _open(self) -> None:
+        self._state = OPEN
+        self._opened_at = time.monotonic()
+        self._probe_in_flight = False
+        self._outcomes.clear()
+        logger.error("Circuit breaker open for %ss: upstream failing", self.open_seconds)
+
+
+def build_circuit_breaker(breaker_config: Optional[Dict[str, Any]]) -> Optional[CircuitBreaker]:
+    """Create a CircuitBreaker from the optional ``circuit_breaker`` config section."""
+    if not breaker_config or not breaker_config.get("enabled", True):
+        return None
+
+    return CircuitBreaker(
+        failure_rate=breaker_config.get("failure_rate", 0.5),
+        min_requests=breaker_config.get("min_requests", 10),
+        window=breaker_config.get("window", 20),
+        open_seconds=breaker_config.get("open_seconds", 60),
+    )
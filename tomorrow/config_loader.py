@@ -1,74 +1,432 @@
 import os
+import re
+import threading
 import yaml
 import logging
-from typing import Dict, Any
+from dataclasses import asdict, dataclass, field, fields
+from typing import Dict, Any, Optional, Tuple
+
+from .fields import validate_field_name
+from .locations import has_location_source
 
 logger = logging.getLogger(__name__)
 
+CONFIG_PATH = os.path.join(os.path.dirname(__file__), "..", "config", "config.yaml")
 
-def load_config() -> Dict[str, Any]:
-    """Load configuration from YAML and environment variables."""
+DB_ENV_VARS = {
+    "host": "PGHOST",
+    "port": "PGPORT",
+    "user": "PGUSER",
+    "password": "PGPASSWORD",
+    "database": "PGDATABASE",
+}
 
-    # --- Load YAML ---
+_TIMESTEP_RE = re.compile(r"^(\d+)([a-zA-Z])$")
+_TIMESTEP_MINUTES = {"m": 1, "h": 60}
+
+
+class ConfigSection:
+    """
+    Read-only mapping access for typed config objects, so components can
+    keep using ``config["api"]["key"]`` / ``config.get("cache")`` whether
+    they are handed a loaded config or a plain dict (e.g. in tests).
+    """
+
+    __slots__ = ()
+
+    def __getitem__(self, key: str) -> Any:
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def get(self, key: str, default: Any = None) -> Any:
+        value = getattr(self, key, None)
+        return default if value is None else value
+
+    def __contains__(self, key: object) -> bool:
+        return isinstance(key, str) and getattr(self, key, None) is not None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+@dataclass(frozen=True, slots=True)
+class Cadence(ConfigSection):
+    fields: Tuple[str, ...]
+    every_hours: int = 1
+    history_hours: int = 24
+    horizon_hours: int = 120
+
+
+@dataclass(frozen=True, slots=True)
+class ApiConfig(ConfigSection):
+    base_url: str
+    forecast_endpoint: str
+    key: str
+    fields: Tuple[str, ...]
+    timesteps: Tuple[str, ...]
+    timesteps_minutes: int
+    units: str
+    timeout_seconds: float
+    max_retries: int
+    retry_backoff_seconds: float = 2
+    # Per-cadence field sets and windows (tomorrow.api.TomorrowAPIClient.request_window).
+    cadences: Tuple[Cadence, ...] = ()
+
+
+@dataclass(frozen=True, slots=True)
+class DbConfig(ConfigSection):
+    host: str
+    port: str
+    user: str
+    password: str
+    database: str
+
+
+@dataclass(frozen=True, slots=True)
+class Location(ConfigSection):
+    lat: float
+    lon: float
+
+
+@dataclass(frozen=True, slots=True)
+class CacheConfig(ConfigSection):
+    path: Optional[str] = None
+    max_entries: int = 256
+    max_disk_entries: int = 4096
+    enabled: bool = True
+
+
+@dataclass(frozen=True, slots=True)
+class PipelineConfig(ConfigSection):
+    fetch_workers: int = 4
+    parse_workers: Optional[int] = None  # None: one per CPU, 0: parse inline
+    load_workers: int = 2
+    queue_size: int = 64
+    async_db: bool = False  # asyncpg writer, pool sized to fetch_workers
+    max_rss_mb: Optional[int] = None  # pause the location stream above this RSS
+    enabled: bool = True
+
+
+@dataclass(frozen=True, slots=True)
+class RetryConfig(ConfigSection):
+    path: Optional[str] = None
+    max_attempts: int = 3
+    base_delay_seconds: float = 5
+    max_delay_seconds: float = 300
+    max_wait_seconds: float = 600
+    chronic_after: int = 3
+    enabled: bool = True
+
+
+@dataclass(frozen=True, slots=True)
+class CircuitBreakerConfig(ConfigSection):
+    failure_rate: float = 0.5
+    min_requests: int = 10
+    window: int = 20
+    open_seconds: float = 60
+    enabled: bool = True
+
+
+@dataclass(frozen=True, slots=True)
+class TracingConfig(ConfigSection):
+    path: Optional[str] = None
+    endpoint: Optional[str] = None  # OTLP/HTTP JSON, e.g. http://collector:4318/v1/traces
+    enabled: bool = True
+
+
+@dataclass(frozen=True, slots=True)
+class AuditConfig(ConfigSection):
+    enabled: bool = True
+
+
+@dataclass(frozen=True, slots=True)
+class ChangeFeedConfig(ConfigSection):
+    channel: str = "weather_data_changes"
+    enabled: bool = True
+
+
+@dataclass(frozen=True, slots=True)
+class WatermarkConfig(ConfigSection):
+    enabled: bool = True
+
+
+@dataclass(frozen=True, slots=True)
+class RetentionConfig(ConfigSection):
+    history_days: int = 90
+    forecast_days: int = 2
+    batch_size: int = 5000
+    hour: int = 3  # scheduler time of day (container clock)
+    enabled: bool = True
+
+
+@dataclass(frozen=True, slots=True)
+class ExportConfig(ConfigSection):
+    path: str = "/tmp/blobs/export"
+    chunk_size: int = 50_000
+    lag_seconds: float = 300
+    compact_parts: int = 16  # merge a day's part files once there are more
+
+
+@dataclass(frozen=True, slots=True)
+class AnalyticsConfig(ConfigSection):
+    path: Optional[str] = None  # DuckDB file; in-memory when unset
+    threads: Optional[int] = None
+    enabled: bool = True
+
+
+@dataclass(frozen=True, slots=True)
+class AppConfig(ConfigSection):
+    api: ApiConfig
+    db: DbConfig
+    locations: Tuple[Location, ...] = ()
+    # Grids and files are kept as descriptions and streamed on demand by
+    # tomorrow.locations.iter_locations; they are never expanded here.
+    location_grid: Tuple[Dict[str, Any], ...] = ()
+    location_file: Tuple[str, ...] = ()
+    location_table: Tuple[str, ...] = ()
+    rate_limit_sleep_seconds: float = 2
+    cache: Optional[CacheConfig] = None
+    pipeline: Optional[PipelineConfig] = None
+    retry: Optional[RetryConfig] = None
+    circuit_breaker: Optional[CircuitBreakerConfig] = None
+    tracing: Optional[TracingConfig] = None
+    audit: Optional[AuditConfig] = None
+    change_feed: Optional[ChangeFeedConfig] = None
+    watermarks: Optional[WatermarkConfig] = None
+    retention: Optional[RetentionConfig] = None
+    export: Optional[ExportConfig] = None
+    analytics: Optional[AnalyticsConfig] = None
+    source_mtime_ns: int = field(default=0, compare=False)
+
+
+def parse_timestep_minutes(timestep: str) -> int:
+    """Convert a Tomorrow.io timestep such as ``"1h"`` or ``"30m"`` to minutes."""
+    match = _TIMESTEP_RE.match(str(timestep).strip())
+    if not match or match.group(2).lower() not in _TIMESTEP_MINUTES:
+        raise RuntimeError(f"Unsupported timestep unit: {timestep}")
+    return int(match.group(1)) * _TIMESTEP_MINUTES[match.group(2).lower()]
+
+
+def _as_tuple(value: Any) -> Tuple[Any, ...]:
+    if value is None:
+        return ()
+    if isinstance(value, (list, tuple)):
+        return tuple(value)
+    return (value,)
+
+
+def _build_section(cls: type, raw: Dict[str, Any], name: str) -> Any:
+    if not isinstance(raw, dict):
+        logger.critical("Config section %s must be a mapping, got %s", name, type(raw).__name__)
+        raise RuntimeError(f"Invalid {name} configuration")
+    known = {f.name for f in fields(cls)}
+    unknown = set(raw) - known
+    if unknown:
+        logger.warning("Ignoring unknown %s config keys: %s", name, sorted(unknown))
     try:
-        config_path = os.path.join(
-            os.path.dirname(__file__), "..", "config", "config.yaml"
+        return cls(**{k: v for k, v in raw.items() if k in known})
+    except TypeError as exc:
+        logger.critical("Invalid %s config section: %s", name, exc)
+        raise RuntimeError(f"Invalid {name} configuration") from exc
+
+
+def _build_cadences(raw: Any) -> Tuple[Cadence, ...]:
+    cadences = []
+    for entry in _as_tuple(raw):
+        if not isinstance(entry, dict):
+            raise RuntimeError("api.cadences entries must be mappings")
+        cadence = _build_section(
+            Cadence, {**entry, "fields": _as_tuple(entry.get("fields"))}, "api.cadences"
         )
-        with open(config_path, "r") as f:
-            config = yaml.safe_load(f) or {}
-    except FileNotFoundError:
-        logger.critical("config/config.yaml not found")
-        raise RuntimeError("Configuration file missing")
+        if not cadence.fields:
+            raise RuntimeError("api.cadences entries need at least one field")
+        for name in cadence.fields:
+            validate_field_name(name)
+        if cadence.every_hours < 1 or cadence.history_hours < 0 or cadence.horizon_hours < 0:
+            raise RuntimeError(f"Invalid api.cadences entry: {entry}")
+        cadences.append(cadence)
+
+    # Every hourly run must request something.
+    if cadences and not any(c.every_hours == 1 for c in cadences):
+        raise RuntimeError("api.cadences needs an entry with every_hours: 1")
+    return tuple(cadences)
+
+
+def _build_locations(raw: Any) -> Tuple[Location, ...]:
+    if raw is None:
+        return ()
+    if not isinstance(raw, list):
+        raise RuntimeError("config.locations must be a list")
+
+    locations = []
+    for entry in raw:
+        if not isinstance(entry, dict) or "lat" not in entry or "lon" not in entry:
+            logger.warning("Skipping invalid location entry: %s", entry)
+            continue
+        locations.append(Location(lat=float(entry["lat"]), lon=float(entry["lon"])))
+    return tuple(locations)
+
+
+def build_config(raw: Dict[str, Any], environ: Dict[str, str], mtime_ns: int = 0) -> AppConfig:
+    """Validate parsed YAML plus environment into an immutable AppConfig."""
 
     # --- Validate YAML structure ---
-    required_sections = ["api", "locations"]
-    missing = [s for s in required_sections if s not in config]
+    # Locations may come from an explicit list, grids or a location file.
+    required_sections = ["api"]
+    missing = [s for s in required_sections if s not in raw]
+    if not has_location_source(raw):
+        missing.append("locations")
     if missing:
         logger.critical(f"Missing required config sections: {missing}")
         raise RuntimeError("Invalid configuration file")
 
     # --- Load DB config from environment ---
-    db_config = {
-        "host": os.getenv("PGHOST"),
-        "port": os.getenv("PGPORT"),
-        "user": os.getenv("PGUSER"),
-        "password": os.getenv("PGPASSWORD"),
-        "database": os.getenv("PGDATABASE"),
-    }
-
-    missing_db = [k for k, v in db_config.items() if not v]
+    db_values = {key: environ.get(var) for key, var in DB_ENV_VARS.items()}
+    missing_db = [k for k, v in db_values.items() if not v]
     if missing_db:
         logger.critical(f"Missing DB environment variables: {missing_db}")
         raise RuntimeError("Database configuration incomplete")
 
-    config["db"] = db_config
-
     # --- Load API key ---
-    api_key = os.getenv("TOMORROW_IO_API_KEY")
+    api_key = environ.get("TOMORROW_IO_API_KEY")
     if not api_key:
         logger.critical("TOMORROW_IO_API_KEY not set")
         raise RuntimeError("Missing API key")
 
-    config["api"]["key"] = api_key
-
     # --- Validate and parse timestep ---
-    timesteps = config["api"].get("timesteps")
+    if not isinstance(raw["api"], dict):
+        raise RuntimeError("Invalid api configuration")
+    api_raw = dict(raw["api"])
+    timesteps = api_raw.get("timesteps")
     if not timesteps or not isinstance(timesteps, list):
         raise RuntimeError("api.timesteps must be a non-empty list")
 
-    timestep_str = timesteps[0]
-    value = int(timestep_str[:-1])
-    unit = timestep_str[-1].lower()
+    minutes = parse_timestep_minutes(timesteps[0])
+    logger.debug("API timestep resolved to %s minutes", minutes)
 
-    if unit == "h":
-        minutes = value * 60
-    elif unit == "m":
-        minutes = value
-    else:
-        raise RuntimeError(f"Unsupported timestep unit: {timestep_str}")
+    cadences = _build_cadences(api_raw.get("cadences"))
+    # With cadences, ``fields`` defaults to every field any cadence requests.
+    api_fields = _as_tuple(api_raw.get("fields")) or tuple(
+        dict.fromkeys(f for cadence in cadences for f in cadence.fields)
+    )
+    for name in api_fields:
+        validate_field_name(name)
 
-    config["api"]["timesteps_minutes"] = minutes
+    api_raw.update(
+        key=api_key,
+        fields=api_fields,
+        cadences=cadences,
+        timesteps=tuple(timesteps),
+        timesteps_minutes=minutes,
+    )
 
-    logger.debug("API timestep resolved to %s minutes", minutes)
+    cache_raw = raw.get("cache")
+    pipeline_raw = raw.get("pipeline")
+    retry_raw = raw.get("retry")
+    breaker_raw = raw.get("circuit_breaker")
+    tracing_raw = raw.get("tracing")
+    audit_raw = raw.get("audit")
+    change_feed_raw = raw.get("change_feed")
+    watermarks_raw = raw.get("watermarks")
+    retention_raw = raw.get("retention")
+    export_raw = raw.get("export")
+    analytics_raw = raw.get("analytics")
+
+    return AppConfig(
+        api=_build_section(ApiConfig, api_raw, "api"),
+        db=DbConfig(**db_values),
+        locations=_build_locations(raw.get("locations")),
+        location_grid=_as_tuple(raw.get("location_grid")),
+        location_file=_as_tuple(raw.get("location_file")),
+        location_table=_as_tuple(raw.get("location_table")),
+        rate_limit_sleep_seconds=raw.get("rate_limit_sleep_seconds", 2),
+        cache=_build_section(CacheConfig, cache_raw, "cache") if cache_raw else None,
+        pipeline=(
+            _build_section(PipelineConfig, pipeline_raw, "pipeline") if pipeline_raw else None
+        ),
+        retry=_build_section(RetryConfig, retry_raw, "retry") if retry_raw else None,
+        circuit_breaker=(
+            _build_section(CircuitBreakerConfig, breaker_raw, "circuit_breaker")
+            if breaker_raw
+            else None
+        ),
+        tracing=_build_section(TracingConfig, tracing_raw, "tracing") if tracing_raw else None,
+        audit=_build_section(AuditConfig, audit_raw, "audit") if audit_raw else None,
+        change_feed=(
+            _build_section(ChangeFeedConfig, change_feed_raw, "change_feed")
+            if change_feed_raw
+            else None
+        ),
+        watermarks=(
+            _build_section(WatermarkConfig, watermarks_raw, "watermarks") if watermarks_raw else None
+        ),
+        retention=(
+            _build_section(RetentionConfig, retention_raw, "retention") if retention_raw else None
+        ),
+        export=_build_section(ExportConfig, export_raw, "export") if export_raw else None,
+        analytics=(
+            _build_section(AnalyticsConfig, analytics_raw, "analytics") if analytics_raw else None
+        ),
+        source_mtime_ns=mtime_ns,
+    )
+
+
+# --- Cached loader ---
+
+_cache_lock = threading.Lock()
+_cached: Optional[Tuple[Tuple[Any, ...], AppConfig]] = None
+
+
+def clear_config_cache() -> None:
+    global _cached
+    with _cache_lock:
+        _cached = None
+
+
+def load_config(config_path: str = CONFIG_PATH) -> AppConfig:
+    """
+    Load configuration from YAML and environment variables.
+
+    The parsed, validated config is cached and only rebuilt when the file's
+    mtime/size or the relevant environment variables change, so callers can
+    invoke this on every run to pick up edits (hot reload) for the cost of
+    one ``stat``.
+    """
+    global _cached
+
+    try:
+        stat = os.stat(config_path)
+    except FileNotFoundError:
+        logger.critical("config/config.yaml not found")
+        raise RuntimeError("Configuration file missing")
+
+    env_names = list(DB_ENV_VARS.values()) + ["TOMORROW_IO_API_KEY"]
+    cache_key = (
+        os.path.abspath(config_path),
+        stat.st_mtime_ns,
+        stat.st_size,
+        tuple(os.environ.get(name) for name in env_names),
+    )
+
+    with _cache_lock:
+        if _cached is not None and _cached[0] == cache_key:
+            return _cached[1]
+
+    # --- Load YAML ---
+    try:
+        with open(config_path, "r") as f:
+            raw = yaml.load(f, Loader=getattr(yaml, "CSafeLoader", yaml.SafeLoader)) or {}
+    except FileNotFoundError:
+        logger.critical("config/config.yaml not found")
+        raise RuntimeError("Configuration file missing")
+
+    config = build_config(raw, dict(os.environ), stat.st_mtime_ns)
+
+    with _cache_lock:
+        if _cached is not None:
+            logger.info("Configuration reloaded from %s", config_path)
+        _cached = (cache_key, config)
 
     return config
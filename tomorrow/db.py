@@ -1,23 +1,47 @@
 import logging
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterable, Optional
 
-from sqlalchemy import create_engine, Table, MetaData
+from sqlalchemy import create_engine, inspect, literal_column, text, Table, MetaData
 from sqlalchemy.dialects.postgresql import insert
 
+from .cache import QueryCache
+from .changes import NOTIFY_SQL, change_payloads
+from .fields import EXTRA_COLUMN, carries_fields, merge_on_conflict
+from .rollup import ROLLUP_TABLE, refresh_daily_rollup
+from .watermark import ALL_WATERMARKS_SQL, WATERMARK_SQL, LoadWatermarks
+
 logger = logging.getLogger(__name__)
 
+KEY_COLUMNS = ["latitude", "longitude", "time_stamp", "is_forecast"]
 
-class WeatherDB:
-    """PostgreSQL persistence with idempotent inserts."""
 
-    def __init__(self, db_config: Dict[str, str]):
-        db_url = (
-            f"postgresql://{db_config['user']}:{db_config['password']}@"
-            f"{db_config['host']}:{db_config['port']}/{db_config['database']}"
-        )
+def build_db_url(db_config: Dict[str, str]) -> str:
+    """Build a SQLAlchemy PostgreSQL URL from the ``db`` config section."""
+    return (
+        f"postgresql://{db_config['user']}:{db_config['password']}@"
+        f"{db_config['host']}:{db_config['port']}/{db_config['database']}"
+    )
+
+
+class WeatherDB:
+    """PostgreSQL persistence with idempotent, merging inserts."""
+
+    def __init__(
+        self,
+        db_config: Dict[str, str],
+        cache: Optional[QueryCache] = None,
+        notify_channel: Optional[str] = None,
+        watermarks: Optional[LoadWatermarks] = None,
+        merge_fields: Iterable[str] = (),
+    ):
+        self.cache = cache
+        # Change feed (tomorrow.changes): one NOTIFY per location per commit.
+        self.notify_channel = notify_channel
+        # Drops already-stored keys client-side (tomorrow.watermark).
+        self.watermarks = watermarks
 
         self.engine = create_engine(
-            db_url,
+            build_db_url(db_config),
             pool_size=5,
             max_overflow=5,
             pool_timeout=30,
@@ -32,9 +56,35 @@ class WeatherDB:
             autoload_with=self.engine,
         )
 
+        # Databases created before these tables existed keep loading until
+        # `python -m tomorrow schema` has been run against them.
+        inspector = inspect(self.engine)
+        self.maintain_rollups = inspector.has_table(ROLLUP_TABLE)
+        if not self.maintain_rollups:
+            logger.warning("DB: %s missing, daily rollups disabled", ROLLUP_TABLE)
+
+        self.store_extra_fields = EXTRA_COLUMN in self.weather_table.c
+        if not self.store_extra_fields:
+            logger.warning("DB: weather_data.%s missing, extra API fields dropped", EXTRA_COLUMN)
+
+        # Rows with a slower cadence's field fill in columns the stored row
+        # lacks (tomorrow.fields); every other row is inserted or skipped.
+        self._merges = carries_fields(merge_fields)
+        merge_set, merge_where = merge_on_conflict(self.weather_table.c.keys())
+        self._merge_set = {c: literal_column(expr) for c, expr in merge_set.items()}
+        self._merge_where = text(merge_where)
+
+        self.maintain_location_registry = inspector.has_table("weather_locations")
+        if not self.maintain_location_registry:
+            logger.warning("DB: weather_locations missing, location registry disabled")
+
         logger.info("DB: Engine initialized and schema reflected")
 
     def bulk_insert_weather_data(self, rows: List[Dict[str, Any]]) -> int:
+        """
+        Insert valid rows; returns how many were new. Already stored rows
+        are skipped, or merged into when they carry a ``merge_fields`` value.
+        """
         if not rows:
             return 0
 
@@ -45,30 +95,117 @@ class WeatherDB:
             logger.warning("DB: No valid rows to insert")
             return 0
 
-        try:
-            with self.engine.begin() as conn:
-                stmt = insert(self.weather_table).values(rows)
+        if self.watermarks is not None:
+            sent = len(rows)
+            rows = self._skip_known(rows)
+            if not rows:
+                logger.info("DB: All %d rows already stored (watermark)", sent)
+                return 0
 
-                stmt = stmt.on_conflict_do_nothing(
-                    index_elements=[
-                        "latitude",
-                        "longitude",
-                        "time_stamp",
-                        "is_forecast",
-                    ]
-                )
+        if not self.store_extra_fields and EXTRA_COLUMN in rows[0]:
+            rows = [{k: v for k, v in r.items() if k != EXTRA_COLUMN} for r in rows]
 
-                conn.execute(stmt)
+        plain: List[Dict[str, Any]] = []
+        merging: List[Dict[str, Any]] = []
+        for row in rows:
+            (merging if self._merges(row) else plain).append(row)
+
+        try:
+            with self.engine.begin() as conn:
+                inserted = merged = 0
+                if plain:
+                    stmt = insert(self.weather_table).values(plain).on_conflict_do_nothing(
+                        index_elements=KEY_COLUMNS
+                    )
+                    inserted = conn.execute(stmt).rowcount
+                if merging:
+                    stmt = (
+                        insert(self.weather_table)
+                        .values(merging)
+                        .on_conflict_do_update(
+                            index_elements=KEY_COLUMNS,
+                            set_=self._merge_set,
+                            where=self._merge_where,
+                        )
+                        # xmax is 0 for a freshly inserted row version.
+                        .returning(literal_column("xmax = 0"))
+                    )
+                    for (new,) in conn.execute(stmt):
+                        if new:
+                            inserted += 1
+                        else:
+                            merged += 1
+
+                if inserted or merged:
+                    if self.maintain_rollups:
+                        refresh_daily_rollup(conn, rows)
+                    if self.maintain_location_registry:
+                        self._register_locations(conn, rows)
+                    if self.notify_channel:
+                        conn.execute(
+                            text(NOTIFY_SQL),
+                            {
+                                "channel": self.notify_channel,
+                                "payloads": change_payloads(rows, inserted, merged),
+                            },
+                        )
+
+            if self.watermarks is not None:
+                self.watermarks.advance(rows)
+
+            # Neither count includes unchanged rows: nothing new, nothing stale.
+            if inserted or merged:
+                self._invalidate_cache(rows)
 
             logger.info(
-                "DB: Insert attempted for %d rows (duplicates skipped)",
+                "DB: Inserted %d and merged %d of %d rows (duplicates skipped)",
+                inserted,
+                merged,
                 len(rows),
             )
-            return len(rows)
+            return inserted
 
         except Exception:
             logger.exception("DB: Bulk insert failed")
             raise
 
+    def _skip_known(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Drop rows at or below their location's stored watermark."""
+        unknown = self.watermarks.unknown(rows)
+        if unknown:
+            with self.engine.connect() as conn:
+                if self.maintain_location_registry and self.watermarks.claim_bulk_load():
+                    for lat, lon, observed, forecast in conn.execute(text(ALL_WATERMARKS_SQL)):
+                        self.watermarks.set((lat, lon), observed, forecast)
+                    unknown = self.watermarks.unknown(rows)
+                for lat, lon in unknown:
+                    observed, forecast = conn.execute(
+                        text(WATERMARK_SQL), {"lat": lat, "lon": lon}
+                    ).one()
+                    self.watermarks.set((lat, lon), observed, forecast)
+        return self.watermarks.filter(rows)
+
+    def _register_locations(self, conn, rows: List[Dict[str, Any]]) -> None:
+        """Record loaded coordinates in the spatially indexed location registry."""
+        locations = {(r["latitude"], r["longitude"]) for r in rows}
+        conn.execute(
+            text(
+                "INSERT INTO weather_locations (latitude, longitude) "
+                "VALUES (:lat, :lon) ON CONFLICT DO NOTHING"
+            ),
+            [{"lat": lat, "lon": lon} for lat, lon in locations],
+        )
+
+    def _invalidate_cache(self, rows: List[Dict[str, Any]]) -> None:
+        """Drop cached read results for every location touched by a commit."""
+        if self.cache is None:
+            return
+
+        try:
+            for lat, lon in {(r["latitude"], r["longitude"]) for r in rows}:
+                self.cache.invalidate_location(lat, lon)
+        except Exception:
+            logger.exception("DB: Query cache invalidation failed")
+
     def close(self) -> None:
         self.engine.dispose()
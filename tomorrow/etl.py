@@ -1,66 +1,124 @@
+import importlib
 import logging
 import time
-from typing import Dict, Any
+from typing import Dict, Any, Callable, Iterable, Optional
 
-from .api import TomorrowAPIClient
-from .db import WeatherDB
+from .changes import change_channel
+from .circuit import CircuitBreaker, CircuitOpenError, build_circuit_breaker
+from .fields import cadence_only_fields
+from .locations import iter_locations, known_location_count
+from .retry import RetryQueue, build_retry_queue
+from .tracing import NoopTracer, Tracer, build_tracer
+from .watermark import LoadWatermarks, build_watermarks
 
 logger = logging.getLogger(__name__)
 
+# Heavy dependencies (requests, SQLAlchemy, psycopg2) are only imported when
+# an ETL run actually starts, so `python -m tomorrow check-config` and
+# dry runs stay fast.
+_LAZY_IMPORTS = {
+    "TomorrowAPIClient": ".api",
+    "WeatherDB": ".db",
+    "build_cache": ".cache",
+}
+
+
+def __getattr__(name: str) -> Any:
+    module = _LAZY_IMPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __package__), name)
+    globals()[name] = value
+    return value
+
+
+def _resolve(name: str) -> Any:
+    """Module attribute ``name``, imported on first use (honours patches)."""
+    return globals()[name] if name in globals() else __getattr__(name)
+
+
+def _process_location(
+    api_client: Any,
+    db_client: Any,
+    lat: float,
+    lon: float,
+    tracer: Tracer,
+) -> int:
+    """Fetch and load one location; raises on failure."""
+    location_str = f"{lat},{lon}"
+    logger.info("ETL processing location %s", location_str)
+
+    with tracer.span("location", location=location_str) as span:
+        # fetch/parse child spans are recorded by the API client.
+        records = api_client.fetch_weather_data(lat, lon)
+        if not records:
+            logger.warning("No data returned for %s", location_str)
+            return 0
+
+        for record in records:
+            record["latitude"] = lat
+            record["longitude"] = lon
+
+        with tracer.span("load", location=location_str, rows=len(records)) as load_span:
+            inserted = db_client.bulk_insert_weather_data(records)
+            load_span.set_attribute("rows_inserted", inserted)
+        span.set_attribute("records", len(records))
 
-def run_weather_etl(config: Dict[str, Any]) -> int:
-    """
-    Orchestrates the weather ETL pipeline.
-    Returns total number of records attempted to load.
-    """
-
+    logger.info(
+        "ETL loaded %d records for %s",
+        len(records),
+        location_str,
+    )
+    return len(records)
+
+
+def _run_sequential(
+    config: Dict[str, Any],
+    locations: Iterable[Dict[str, Any]],
+    retry_queue: Optional[RetryQueue] = None,
+    breaker: Optional[CircuitBreaker] = None,
+    tracer: Optional[Tracer] = None,
+    watermarks: Optional[LoadWatermarks] = None,
+) -> int:
+    tracer = tracer or NoopTracer()
     try:
-        api_client = TomorrowAPIClient(config["api"])
-        db_client = WeatherDB(config["db"])
+        api_client = _resolve("TomorrowAPIClient")(config["api"], breaker=breaker, tracer=tracer)
+        cache = _resolve("build_cache")(config.get("cache"))
+        db_client = _resolve("WeatherDB")(
+            config["db"],
+            cache=cache,
+            notify_channel=change_channel(config.get("change_feed")),
+            watermarks=watermarks,
+            merge_fields=cadence_only_fields(config["api"].get("cadences") or ()),
+        )
     except Exception:
         logger.exception("ETL initialization failed")
         raise
 
-    locations = config.get("locations")
-    if not isinstance(locations, list):
-        raise RuntimeError("config.locations must be a list")
-
     total_records_processed = 0
     sleep_seconds = config.get("rate_limit_sleep_seconds", 2)
 
-    logger.info("ETL started for %d locations", len(locations))
-
     for location in locations:
         if "lat" not in location or "lon" not in location:
             logger.warning("Skipping invalid location entry: %s", location)
             continue
 
         lat, lon = location["lat"], location["lon"]
-        location_str = f"{lat},{lon}"
 
         try:
-            logger.info("ETL processing location %s", location_str)
-
-            records = api_client.fetch_weather_data(lat, lon)
-            if not records:
-                logger.warning("No data returned for %s", location_str)
-                continue
-
-            for record in records:
-                record["latitude"] = lat
-                record["longitude"] = lon
-
-            db_client.bulk_insert_weather_data(records)
-            total_records_processed += len(records)
-
-            logger.info(
-                "ETL loaded %d records for %s",
-                len(records),
-                location_str,
-            )
-
-        except Exception:
-            logger.exception("ETL failed for location %s", location_str)
+            total_records_processed += _process_location(api_client, db_client, lat, lon, tracer)
+            if retry_queue is not None:
+                retry_queue.record_success(lat, lon)
+        except CircuitOpenError as exc:
+            # No request was made, so there is no rate limit to respect.
+            logger.warning("ETL skipped %s,%s: %s", lat, lon, exc)
+            if retry_queue is not None:
+                retry_queue.defer(lat, lon, exc.retry_at, repr(exc))
+            continue
+        except Exception as exc:
+            logger.exception("ETL failed for location %s,%s", lat, lon)
+            if retry_queue is not None:
+                retry_queue.record_error(lat, lon, exc)
 
         time.sleep(sleep_seconds)
 
@@ -73,3 +131,122 @@ def run_weather_etl(config: Dict[str, Any]) -> int:
     )
 
     return total_records_processed
+
+
+def _drain_retries(
+    process: Callable[[Iterable[Dict[str, Any]]], int],
+    retry_queue: RetryQueue,
+    max_wait_seconds: float,
+) -> int:
+    """
+    Re-run failed locations once their backoff has elapsed, until none are
+    pending or the next retry would exceed the run's wait budget.
+    """
+    deadline = time.monotonic() + max_wait_seconds
+    total = 0
+
+    while True:
+        next_attempt_at = retry_queue.next_attempt_at()
+        if next_attempt_at is None:
+            return total
+
+        wait = max(0.0, next_attempt_at - time.time())
+        if time.monotonic() + wait > deadline:
+            logger.warning("ETL: retry budget exhausted; remaining retries left for the next run")
+            return total
+
+        time.sleep(wait)
+        due = retry_queue.due()
+        logger.info("ETL retrying %d failed locations", len(due))
+        total += process(due)
+
+
+def run_weather_etl(config: Dict[str, Any]) -> int:
+    """
+    Orchestrates the weather ETL pipeline.
+    Returns total number of records attempted to load (rows actually
+    inserted are recorded in etl_runs when the ``audit`` section is set).
+
+    With a ``pipeline`` config section the run is handed to the staged,
+    concurrent ETLPipeline; otherwise locations are processed one by one.
+    With a ``retry`` section, failed locations are retried with backoff
+    after the rest of the run has finished. With a ``circuit_breaker``
+    section, one breaker guards every API call of the run.
+    """
+    retry_config = config.get("retry") or {}
+    retry_queue = build_retry_queue(retry_config)
+    breaker = build_circuit_breaker(config.get("circuit_breaker"))
+
+    # The run audit is built from the run's spans as they finish, so it
+    # works even when trace export is off.
+    audit = config.get("audit")
+    run_audit = None
+    if audit and audit.get("enabled", True):
+        from .audit import RunAudit
+
+        run_audit = RunAudit(config["db"])
+    tracer = build_tracer(
+        config.get("tracing"), on_end=run_audit.on_end if run_audit is not None else None
+    )
+
+    # One set of watermarks for every pass of the run, retry passes included.
+    watermarks = build_watermarks(config.get("watermarks"), config["api"].get("cadences"))
+
+    pipeline = config.get("pipeline")
+    if pipeline and pipeline.get("enabled", True):
+        from .pipeline import ETLPipeline
+
+        def process(locations: Iterable[Dict[str, Any]]) -> int:
+            return ETLPipeline(
+                config,
+                retry_queue=retry_queue,
+                breaker=breaker,
+                tracer=tracer,
+                watermarks=watermarks,
+            ).run(locations)
+    else:
+        def process(locations: Iterable[Dict[str, Any]]) -> int:
+            return _run_sequential(config, locations, retry_queue, breaker, tracer, watermarks)
+
+    logger.info("ETL started for %s locations", known_location_count(config) or "streamed")
+
+    try:
+        with tracer.span("run") as run_span:
+            total = _run_passes(config, process, retry_queue, retry_config)
+            run_span.set_attribute("records", total)
+    finally:
+        if run_audit is not None:
+            run_audit.finish()
+            run_audit.close()
+        tracer.flush()
+
+    return total
+
+
+def _run_passes(
+    config: Dict[str, Any],
+    process: Callable[[Iterable[Dict[str, Any]]], int],
+    retry_queue: Optional[RetryQueue],
+    retry_config: Dict[str, Any],
+) -> int:
+    """Main pass over every location, then retry passes for failures."""
+    if retry_queue is None:
+        return process(iter_locations(config))
+
+    try:
+        carried_over = retry_queue.start_run()
+        if carried_over:
+            logger.info("ETL: %d locations pending retry from an earlier run", carried_over)
+
+        total = process(iter_locations(config))
+        total += _drain_retries(process, retry_queue, retry_config.get("max_wait_seconds", 600))
+
+        for row in retry_queue.chronic(retry_config.get("chronic_after", 3)):
+            logger.warning(
+                "ETL: %s,%s has failed %d times in a row (last error: %s)",
+                row["latitude"], row["longitude"], row["consecutive_failures"], row["last_error"],
+            )
+    finally:
+        retry_queue.close()
+
+    return total
@@ -0,0 +1,246 @@
+import glob
+import json
+import logging
+import os
+import shutil
+from datetime import datetime, timezone
+from itertools import groupby
+from operator import itemgetter
+from typing import Dict, Any, Iterable, Sequence
+
+from sqlalchemy import create_engine, inspect, text
+
+from .db import build_db_url
+from .fields import EXTRA_COLUMN
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_EXPORT_PATH = "/tmp/blobs/export"
+DATASET = "weather_data"
+WATERMARK_FILE = "_watermark.json"
+DEFAULT_CHUNK_SIZE = 50_000
+# Rows are exported only once they are this old, so transactions that were
+# still open when the export started (ingestion_timestamp is the insert's
+# transaction start) are never skipped by the watermark.
+DEFAULT_LAG_SECONDS = 300
+# A day's part files are merged into one once an export leaves more than
+# this many (each hourly export adds a part to every day it touches).
+DEFAULT_COMPACT_PARTS = 16
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+# The day column (first) only routes rows to their partition; it is not
+# stored in the files.
+EXPORT_SQL = """
+SELECT
+    (time_stamp AT TIME ZONE 'UTC')::date AS day,
+    id,
+    ingestion_timestamp,
+    latitude::float8,
+    longitude::float8,
+    time_stamp,
+    is_forecast,
+    temperature::float8,
+    wind_speed::float8,
+    humidity::float8,
+    precipitation_type,
+    {extra} AS extra
+FROM weather_data
+WHERE ingestion_timestamp > :since AND ingestion_timestamp <= :until
+ORDER BY time_stamp
+"""
+
+
+def _schema() -> Any:
+    import pyarrow as pa
+
+    ts = pa.timestamp("us", tz="UTC")
+    return pa.schema(
+        [
+            ("id", pa.int64()),
+            ("ingestion_timestamp", ts),
+            ("latitude", pa.float64()),
+            ("longitude", pa.float64()),
+            ("time_stamp", ts),
+            ("is_forecast", pa.bool_()),
+            ("temperature", pa.float64()),
+            ("wind_speed", pa.float64()),
+            ("humidity", pa.float64()),
+            ("precipitation_type", pa.int32()),
+            # JSON text of the extra API fields.
+            ("extra", pa.string()),
+        ]
+    )
+
+
+def read_watermark(dataset_dir: str) -> datetime:
+    """ingestion_timestamp up to which weather_data has been exported."""
+    path = os.path.join(dataset_dir, WATERMARK_FILE)
+    if not os.path.exists(path):
+        return _EPOCH
+    with open(path) as f:
+        return datetime.fromisoformat(json.load(f)["exported_through"])
+
+
+def _write_watermark(dataset_dir: str, until: datetime, rows: int) -> None:
+    path = os.path.join(dataset_dir, WATERMARK_FILE)
+    with open(path + ".tmp", "w") as f:
+        json.dump({"exported_through": until.isoformat(), "rows": rows}, f)
+    os.replace(path + ".tmp", path)
+
+
+def write_partitions(
+    chunks: Iterable[Sequence[Sequence[Any]]],
+    dataset_dir: str,
+    part_name: str,
+) -> Dict[str, int]:
+    """
+    Write day-ordered row chunks (day first, then the export columns) as
+    ``date=YYYY-MM-DD/<part_name>.parquet`` files, one open writer at a
+    time. Returns rows written per partition.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = _schema()
+    written: Dict[str, int] = {}
+    writer = None
+    current = tmp_path = final_path = None
+
+    try:
+        for chunk in chunks:
+            for day, rows in groupby(chunk, key=itemgetter(0)):
+                rows = list(rows)
+                if day != current:
+                    if writer is not None:
+                        writer.close()
+                        writer = None
+                        os.replace(tmp_path, final_path)
+                    current = day
+                    partition = os.path.join(dataset_dir, f"date={day.isoformat()}")
+                    os.makedirs(partition, exist_ok=True)
+                    final_path = os.path.join(partition, f"{part_name}.parquet")
+                    tmp_path = final_path + ".tmp"
+                    writer = pq.ParquetWriter(tmp_path, schema, compression="zstd")
+
+                columns = list(zip(*rows))[1:]
+                writer.write_table(
+                    pa.Table.from_arrays(
+                        [pa.array(col, type=f.type) for col, f in zip(columns, schema)],
+                        schema=schema,
+                    )
+                )
+                written[current.isoformat()] = written.get(current.isoformat(), 0) + len(rows)
+
+        if writer is not None:
+            writer.close()
+            writer = None
+            os.replace(tmp_path, final_path)
+    finally:
+        if writer is not None:
+            writer.close()
+            os.remove(tmp_path)
+
+    return written
+
+
+def compact_partition(partition_dir: str) -> int:
+    """
+    Rewrite a day partition's part files as one file, keeping the newest
+    copy of each id. The result replaces the newest part (part names sort
+    by export watermark) before the older parts are removed, so a crash in
+    between only leaves duplicates for the next compaction to fold.
+    Returns the number of rows kept.
+    """
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+
+    parts = sorted(glob.glob(os.path.join(partition_dir, "part-*.parquet")))
+    if len(parts) < 2:
+        return 0
+
+    schema = _schema()
+    table = pa.concat_tables(pq.read_table(path, schema=schema) for path in parts)
+    table = table.sort_by([("id", "ascending"), ("ingestion_timestamp", "descending")])
+    if table.num_rows > 1:
+        ids = table.column("id")
+        changed = pc.not_equal(ids.slice(1), ids.slice(0, table.num_rows - 1))
+        table = table.filter(
+            pa.concat_arrays([pa.array([True]), changed.combine_chunks()])
+        )
+    table = table.sort_by("time_stamp")
+
+    target = parts[-1]
+    pq.write_table(table, target + ".tmp", compression="zstd")
+    os.replace(target + ".tmp", target)
+    for path in parts[:-1]:
+        os.remove(path)
+    return table.num_rows
+
+
+def export_weather_data(
+    db_config: Dict[str, str],
+    output_dir: str,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    lag_seconds: float = DEFAULT_LAG_SECONDS,
+    full: bool = False,
+    compact_parts: int = DEFAULT_COMPACT_PARTS,
+) -> Dict[str, Any]:
+    """
+    Export weather_data rows ingested since the last export to
+    ``<output_dir>/weather_data/date=YYYY-MM-DD/part-*.parquet``.
+
+    Rows are streamed through a server-side cursor ``chunk_size`` rows at a
+    time and written per UTC day of ``time_stamp``. Each run adds one file
+    per touched day, and a day with more than ``compact_parts`` files is
+    compacted into one; ``full`` discards the dataset and exports everything
+    again. A row a later cadence merged fields into is exported again with
+    its new ``ingestion_timestamp``, so readers keep the newest copy per id.
+    """
+    dataset_dir = os.path.join(output_dir, DATASET)
+    if full and os.path.isdir(dataset_dir):
+        shutil.rmtree(dataset_dir)
+    os.makedirs(dataset_dir, exist_ok=True)
+
+    since = read_watermark(dataset_dir)
+    # Named after the watermark so a re-run after a crash replaces the
+    # files a failed run left behind instead of duplicating them.
+    part_name = f"part-{since.astimezone(timezone.utc):%Y%m%dT%H%M%S%f}"
+
+    engine = create_engine(build_db_url(db_config), pool_size=1, max_overflow=0, future=True)
+    try:
+        has_extra = any(
+            c["name"] == EXTRA_COLUMN for c in inspect(engine).get_columns("weather_data")
+        )
+        sql = text(EXPORT_SQL.format(extra=f"{EXTRA_COLUMN}::text" if has_extra else "NULL::text"))
+
+        with engine.connect() as conn:
+            until = conn.execute(
+                text("SELECT NOW() - make_interval(secs => :lag)"), {"lag": lag_seconds}
+            ).scalar_one()
+            if until <= since:
+                logger.info("Export: nothing new since %s", since.isoformat())
+                return {"rows": 0, "partitions": {}, "since": since, "until": since}
+
+            # yield_per streams through a psycopg2 named (server-side) cursor.
+            result = conn.execution_options(yield_per=chunk_size).execute(
+                sql, {"since": since, "until": until}
+            )
+            partitions = write_partitions(result.partitions(), dataset_dir, part_name)
+    finally:
+        engine.dispose()
+
+    rows = sum(partitions.values())
+    _write_watermark(dataset_dir, until, rows)
+
+    for day in partitions:
+        partition = os.path.join(dataset_dir, f"date={day}")
+        if len(glob.glob(os.path.join(partition, "part-*.parquet"))) > compact_parts:
+            logger.info("Export: compacting %s", partition)
+            compact_partition(partition)
+    logger.info(
+        "Export: %d rows in %d partitions written to %s (ingested through %s)",
+        rows, len(partitions), dataset_dir, until.isoformat(),
+    )
+    return {"rows": rows, "partitions": partitions, "since": since, "until": until}
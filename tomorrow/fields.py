@@ -0,0 +1,121 @@
+import re
+from typing import Dict, Any, Callable, Iterable, List, Tuple
+
+# Tomorrow.io field name -> weather_data column. Every other requested field
+# is stored under its API name in the ``extra`` JSONB column, so new fields
+# only need adding to config.yaml.
+CORE_FIELDS: Dict[str, str] = {
+    "temperature": "temperature",
+    "windSpeed": "wind_speed",
+    "humidity": "humidity",
+    "precipitationType": "precipitation_type",
+}
+
+EXTRA_COLUMN = "extra"
+
+_CORE_ITEMS = tuple(CORE_FIELDS.items())
+_FIELD_NAME_RE = re.compile(r"^[A-Za-z][A-Za-z0-9]*$")
+_CAMEL_RE = re.compile(r"(?<!^)(?=[A-Z])")
+
+
+def validate_field_name(field: str) -> str:
+    """Reject anything that is not a plain Tomorrow.io field identifier."""
+    if not isinstance(field, str) or not _FIELD_NAME_RE.match(field):
+        raise RuntimeError(f"Invalid API field name: {field!r}")
+    return field
+
+
+def column_name(field: str) -> str:
+    """weather_data column for ``field`` (``dewPoint`` -> ``dew_point``)."""
+    return CORE_FIELDS.get(field) or _CAMEL_RE.sub("_", validate_field_name(field)).lower()
+
+
+def extra_fields(fields: Iterable[str]) -> List[str]:
+    """Requested fields that have no dedicated column."""
+    return [f for f in fields if f not in CORE_FIELDS]
+
+
+def cadence_only_fields(cadences: Iterable[Any]) -> List[str]:
+    """Fields that no hourly (``every_hours: 1``) cadence requests."""
+    cadences = list(cadences)
+    hourly = {
+        f for c in cadences if int(c.get("every_hours", 1)) <= 1 for f in c["fields"]
+    }
+    return list(dict.fromkeys(f for c in cadences for f in c["fields"] if f not in hourly))
+
+
+def carries_fields(fields: Iterable[str]) -> Callable[[Dict[str, Any]], bool]:
+    """Predicate: does a row have a value for any of ``fields``."""
+    fields = list(fields)
+    columns = [CORE_FIELDS[f] for f in fields if f in CORE_FIELDS]
+    extras = [f for f in fields if f not in CORE_FIELDS]
+
+    def carries(row: Dict[str, Any]) -> bool:
+        if any(row.get(c) is not None for c in columns):
+            return True
+        extra = row.get(EXTRA_COLUMN) or {}
+        return any(extra.get(f) is not None for f in extras)
+
+    return carries
+
+
+def merge_on_conflict(columns: Iterable[str]) -> Tuple[Dict[str, str], str]:
+    """
+    SET assignments and WHERE condition for ``ON CONFLICT DO UPDATE`` that
+    merge a re-sent row into the stored one: stored values win, NULL
+    columns and missing ``extra`` keys are filled in. Used only for rows
+    carrying a field of a slower cadence (``cadence_only_fields``), which
+    thereby add it to rows a faster cadence inserted first; every other row
+    is inserted with DO NOTHING. Only rows the merge changes are updated,
+    and their ``ingestion_timestamp`` moves so the incremental export picks
+    them up.
+    """
+    columns = set(columns)
+    merged = {
+        c: f"COALESCE(weather_data.{c}, EXCLUDED.{c})"
+        for c in CORE_FIELDS.values()
+        if c in columns
+    }
+    if EXTRA_COLUMN in columns:
+        merged[EXTRA_COLUMN] = (
+            f"COALESCE(EXCLUDED.{EXTRA_COLUMN} || weather_data.{EXTRA_COLUMN}, "
+            f"weather_data.{EXTRA_COLUMN}, EXCLUDED.{EXTRA_COLUMN})"
+        )
+    where = " OR ".join(f"{expr} IS DISTINCT FROM weather_data.{c}" for c, expr in merged.items())
+    return {**merged, "ingestion_timestamp": "NOW()"}, where
+
+
+def encode_values(values: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Split one interval's ``values`` into core columns plus ``extra``.
+
+    The core keys are popped from a shallow copy and the rest is stored
+    as-is, so the Python work per interval does not grow with the number of
+    extra fields (they are serialized to JSONB in one json.dumps call).
+    """
+    extra = dict(values)
+    row = {column: extra.pop(field, None) for field, column in _CORE_ITEMS}
+    row[EXTRA_COLUMN] = extra or None
+    return row
+
+
+def field_expression(field: str, alias: str = "w") -> str:
+    """SQL expression reading ``field`` as float8 from weather_data."""
+    prefix = f"{alias}." if alias else ""
+    if field in CORE_FIELDS:
+        return f"{prefix}{CORE_FIELDS[field]}::float8"
+    return f"({prefix}{EXTRA_COLUMN}->>'{validate_field_name(field)}')::float8"
+
+
+def promote_field_statement(field: str) -> str:
+    """
+    DDL adding a stored generated column for an extra field, for fields
+    that need indexing or heavy querying. Rewrites weather_data, so run it
+    from ``python -m tomorrow schema --promote-field`` during quiet hours.
+    """
+    if field in CORE_FIELDS:
+        raise RuntimeError(f"{field} already has a dedicated column")
+    return (
+        f"ALTER TABLE weather_data ADD COLUMN IF NOT EXISTS {column_name(field)} "
+        f"double precision GENERATED ALWAYS AS ({field_expression(field, '')}) STORED"
+    )
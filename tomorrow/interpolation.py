@@ -0,0 +1,188 @@
+import logging
+import math
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, Any, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .cache import ALL_LOCATIONS, QueryCache
+from .query import WeatherQuery
+
+logger = logging.getLogger(__name__)
+
+# Continuous fields only; precipitation_type is categorical.
+INTERPOLATED_FIELDS = ("temperature", "wind_speed", "humidity")
+
+
+@dataclass(frozen=True)
+class WeatherCube:
+    """
+    Dense (time, latitude, longitude) arrays for one region/time window.
+    Missing grid cells are NaN.
+    """
+
+    lats: np.ndarray
+    lons: np.ndarray
+    times: np.ndarray  # epoch microseconds
+    values: Dict[str, np.ndarray]
+
+    @classmethod
+    def from_frame(
+        cls, frame: pd.DataFrame, fields: Sequence[str] = INTERPOLATED_FIELDS
+    ) -> "WeatherCube":
+        """Scatter long-format rows onto their unique lat/lon/time axes."""
+        lats, lat_idx = np.unique(frame["latitude"].to_numpy(), return_inverse=True)
+        lons, lon_idx = np.unique(frame["longitude"].to_numpy(), return_inverse=True)
+        times, time_idx = np.unique(_epoch_us(frame["time_stamp"]), return_inverse=True)
+
+        values = {}
+        for field in fields:
+            cube = np.full((times.size, lats.size, lons.size), np.nan)
+            cube[time_idx, lat_idx, lon_idx] = frame[field].to_numpy(dtype=np.float64)
+            values[field] = cube
+
+        return cls(lats=lats, lons=lons, times=times, values=values)
+
+
+def _epoch_us(times: Any) -> np.ndarray:
+    index = pd.DatetimeIndex(pd.to_datetime(times, utc=True))
+    return index.as_unit("us").asi8
+
+
+def _axis_weights(
+    axis: np.ndarray, x: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Lower/upper neighbour indices, upper weight and in-range mask for
+    linear interpolation of ``x`` along a sorted ``axis``.
+    """
+    if axis.size == 1:
+        zeros = np.zeros(x.shape, dtype=np.int64)
+        return zeros, zeros, np.zeros(x.shape), x == axis[0]
+
+    lower = np.clip(np.searchsorted(axis, x, side="right") - 1, 0, axis.size - 2)
+    upper = lower + 1
+    weight = (x - axis[lower]) / (axis[upper] - axis[lower])
+    valid = (x >= axis[0]) & (x <= axis[-1])
+    return lower, upper, weight, valid
+
+
+def interpolate(
+    cube: WeatherCube,
+    lats: Any,
+    lons: Any,
+    times: Any,
+    fields: Sequence[str] = INTERPOLATED_FIELDS,
+) -> pd.DataFrame:
+    """
+    Bilinear (space) x linear (time) interpolation for a batch of points.
+
+    All points are evaluated at once with NumPy fancy indexing; points
+    outside the cube, or whose surrounding cells are missing, yield NaN.
+    """
+    lats = np.asarray(lats, dtype=np.float64)
+    lons = np.asarray(lons, dtype=np.float64)
+    t_us = _epoch_us(times).astype(np.float64)
+
+    result: Dict[str, Any] = {
+        "latitude": lats,
+        "longitude": lons,
+        "time_stamp": pd.to_datetime(t_us.astype(np.int64), unit="us", utc=True),
+    }
+
+    if min(cube.lats.size, cube.lons.size, cube.times.size) == 0:
+        for field in fields:
+            result[field] = np.full(lats.shape, np.nan)
+        return pd.DataFrame(result)
+
+    i0, i1, wy, valid_y = _axis_weights(cube.lats, lats)
+    j0, j1, wx, valid_x = _axis_weights(cube.lons, lons)
+    k0, k1, wt, valid_t = _axis_weights(cube.times.astype(np.float64), t_us)
+    valid = valid_y & valid_x & valid_t
+
+    for field in fields:
+        data = cube.values[field]
+
+        def plane(k: np.ndarray) -> np.ndarray:
+            bottom = data[k, i0, j0] * (1 - wx) + data[k, i0, j1] * wx
+            top = data[k, i1, j0] * (1 - wx) + data[k, i1, j1] * wx
+            return bottom * (1 - wy) + top * wy
+
+        values = plane(k0) * (1 - wt) + plane(k1) * wt
+        result[field] = np.where(valid, values, np.nan)
+
+    return pd.DataFrame(result)
+
+
+class InterpolationService:
+    """
+    Batch interpolation over weather_data with cached cubes.
+
+    Cubes are cached in the query's QueryCache when it has one (so ETL loads
+    invalidate them), otherwise in a private in-memory LRU.
+    """
+
+    def __init__(
+        self,
+        query: WeatherQuery,
+        cache: Optional[QueryCache] = None,
+        snap_deg: float = 0.1,
+    ):
+        self.query = query
+        self.cache = cache or query.cache or QueryCache(max_entries=8)
+        self.snap_deg = snap_deg
+
+    def _window_for(
+        self, lats: np.ndarray, lons: np.ndarray, t_us: np.ndarray
+    ) -> Tuple[Tuple[float, ...], datetime, datetime]:
+        """
+        Bounding box and time window covering the points, snapped outward so
+        nearby batches share a cube.
+        """
+        # Pad by one snap step before snapping so query points near the edge
+        # keep their surrounding grid cells (snap_deg should be >= grid step).
+        snap = self.snap_deg
+        bbox = (
+            round(math.floor(lats.min() / snap - 1) * snap, 6),
+            round(math.ceil(lats.max() / snap + 1) * snap, 6),
+            round(math.floor(lons.min() / snap - 1) * snap, 6),
+            round(math.ceil(lons.max() / snap + 1) * snap, 6),
+        )
+        start = pd.Timestamp(int(t_us.min()), unit="us", tz="UTC").floor("h").to_pydatetime()
+        end = pd.Timestamp(int(t_us.max()), unit="us", tz="UTC").ceil("h").to_pydatetime()
+        return bbox, start, end
+
+    def load_cube(
+        self, bbox: Tuple[float, ...], start: datetime, end: datetime
+    ) -> WeatherCube:
+        key = ("cube", ALL_LOCATIONS, (tuple(bbox), start, end))
+        cube = self.cache.get(key)
+        if cube is None:
+            generation = self.cache.generation(key)
+            frame = self.query.region_window(bbox, start, end)
+            cube = WeatherCube.from_frame(frame)
+            self.cache.set(key, cube, generation)
+            logger.info(
+                "Interpolation: loaded cube %dx%dx%d for %s",
+                cube.times.size, cube.lats.size, cube.lons.size, bbox,
+            )
+        return cube
+
+    def interpolate(
+        self,
+        lats: Any,
+        lons: Any,
+        times: Any,
+        fields: Sequence[str] = INTERPOLATED_FIELDS,
+    ) -> pd.DataFrame:
+        """Interpolate ``fields`` at every (lat, lon, time) query point."""
+        lats = np.atleast_1d(np.asarray(lats, dtype=np.float64))
+        lons = np.atleast_1d(np.asarray(lons, dtype=np.float64))
+        t_us = _epoch_us(np.atleast_1d(times))
+
+        bbox, start, end = self._window_for(lats, lons, t_us)
+        # Pad by an hour so points on the window edge still have neighbours.
+        cube = self.load_cube(bbox, start - timedelta(hours=1), end + timedelta(hours=1))
+        return interpolate(cube, lats, lons, t_us.astype("datetime64[us]"), fields)
@@ -0,0 +1,175 @@
+import csv
+import logging
+import os
+import re
+from typing import Dict, Any, Iterable, Iterator, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Config keys that can describe which points the ETL scrapes.
+LOCATION_SOURCES = ("locations", "location_grid", "location_file", "location_table")
+
+_LAT_COLUMNS = ("lat", "latitude")
+_LON_COLUMNS = ("lon", "longitude")
+
+_TABLE_RE = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*(\.[A-Za-z_][A-Za-z0-9_]*)?$")
+
+
+def has_location_source(config: Dict[str, Any]) -> bool:
+    return any(config.get(source) for source in LOCATION_SOURCES)
+
+
+def known_location_count(config: Dict[str, Any]) -> Optional[int]:
+    """Number of locations if only an explicit list is configured, else None."""
+    locations = config.get("locations")
+    if not isinstance(locations, (list, tuple)):
+        return None
+    if any(config.get(source) for source in LOCATION_SOURCES[1:]):
+        return None
+    return len(locations)
+
+
+def grid_locations(grid: Dict[str, Any]) -> Iterator[Dict[str, float]]:
+    """
+    Points of a regular lat/lon grid over a bounding box (inclusive).
+
+    ``step`` applies to both axes unless ``lat_step``/``lon_step`` are given.
+    """
+    try:
+        min_lat, max_lat = float(grid["min_lat"]), float(grid["max_lat"])
+        min_lon, max_lon = float(grid["min_lon"]), float(grid["max_lon"])
+        lat_step = float(grid.get("lat_step", grid.get("step")))
+        lon_step = float(grid.get("lon_step", grid.get("step")))
+    except (KeyError, TypeError) as exc:
+        raise RuntimeError(f"Invalid location_grid entry: {grid}") from exc
+
+    if lat_step <= 0 or lon_step <= 0 or min_lat > max_lat or min_lon > max_lon:
+        raise RuntimeError(f"Invalid location_grid bounds: {grid}")
+
+    n_lat = int(round((max_lat - min_lat) / lat_step)) + 1
+    n_lon = int(round((max_lon - min_lon) / lon_step)) + 1
+
+    for i in range(n_lat):
+        lat = round(min_lat + i * lat_step, 6)
+        for j in range(n_lon):
+            yield {"lat": lat, "lon": round(min_lon + j * lon_step, 6)}
+
+
+def _pick_column(columns: Iterable[str], candidates: Tuple[str, ...], path: str) -> str:
+    lookup = {c.lower(): c for c in columns}
+    for candidate in candidates:
+        if candidate in lookup:
+            return lookup[candidate]
+    raise RuntimeError(f"{path} has no {'/'.join(candidates)} column")
+
+
+def file_locations(path: str, batch_size: int = 10_000) -> Iterator[Dict[str, float]]:
+    """
+    Stream points from a CSV or Parquet file with lat/lon (or
+    latitude/longitude) columns without loading the whole file.
+    """
+    if not os.path.exists(path):
+        raise RuntimeError(f"Location file not found: {path}")
+
+    if path.endswith(".parquet"):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError as exc:
+            raise RuntimeError("pyarrow is required to read Parquet location files") from exc
+
+        parquet = pq.ParquetFile(path)
+        names = parquet.schema_arrow.names
+        lat_col = _pick_column(names, _LAT_COLUMNS, path)
+        lon_col = _pick_column(names, _LON_COLUMNS, path)
+
+        for batch in parquet.iter_batches(batch_size=batch_size, columns=[lat_col, lon_col]):
+            lats = batch.column(0).to_pylist()
+            lons = batch.column(1).to_pylist()
+            for lat, lon in zip(lats, lons):
+                yield {"lat": float(lat), "lon": float(lon)}
+        return
+
+    with open(path, newline="") as f:
+        reader = csv.DictReader(f)
+        lat_col = _pick_column(reader.fieldnames or [], _LAT_COLUMNS, path)
+        lon_col = _pick_column(reader.fieldnames or [], _LON_COLUMNS, path)
+        for row in reader:
+            yield {"lat": float(row[lat_col]), "lon": float(row[lon_col])}
+
+
+def table_locations(
+    db_config: Dict[str, str], table: str, batch_size: int = 10_000
+) -> Iterator[Dict[str, float]]:
+    """
+    Stream points from a database table with lat/lon (or latitude/longitude)
+    columns, ``batch_size`` rows per query. Pages are read by keyset on
+    (lat, lon) in short separate transactions, so a long run holds neither
+    the table nor an open snapshot.
+    """
+    if not _TABLE_RE.match(table):
+        raise RuntimeError(f"Invalid location_table name: {table!r}")
+
+    from sqlalchemy import create_engine, inspect, text
+
+    from .db import build_db_url
+
+    engine = create_engine(build_db_url(db_config), pool_size=1, max_overflow=0, future=True)
+    try:
+        schema, _, name = table.rpartition(".")
+        columns = [c["name"] for c in inspect(engine).get_columns(name, schema=schema or None)]
+        lat_col = _pick_column(columns, _LAT_COLUMNS, table)
+        lon_col = _pick_column(columns, _LON_COLUMNS, table)
+
+        select = (
+            f"SELECT {lat_col}, {lon_col} FROM {table} "
+            f"WHERE {lat_col} IS NOT NULL AND {lon_col} IS NOT NULL"
+        )
+        first_page = text(f"{select} ORDER BY 1, 2 LIMIT :limit")
+        next_page = text(
+            f"{select} AND ({lat_col}, {lon_col}) > (:lat, :lon) ORDER BY 1, 2 LIMIT :limit"
+        )
+
+        last = None
+        while True:
+            with engine.connect() as conn:
+                if last is None:
+                    page = conn.execute(first_page, {"limit": batch_size}).all()
+                else:
+                    page = conn.execute(
+                        next_page, {"lat": last[0], "lon": last[1], "limit": batch_size}
+                    ).all()
+            for lat, lon in page:
+                yield {"lat": float(lat), "lon": float(lon)}
+            if len(page) < batch_size:
+                return
+            last = page[-1]
+    finally:
+        engine.dispose()
+
+
+def iter_locations(config: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """
+    Lazily yield every configured location: the explicit ``locations`` list,
+    then each ``location_grid`` box, then ``location_file`` rows, then
+    ``location_table`` rows.
+    """
+    locations = config.get("locations")
+    if locations is not None and not isinstance(locations, (list, tuple)):
+        raise RuntimeError("config.locations must be a list")
+    if not has_location_source(config):
+        raise RuntimeError("config.locations must be a list")
+
+    for location in locations or []:
+        yield location
+
+    grids = config.get("location_grid") or []
+    for grid in grids if isinstance(grids, (list, tuple)) else [grids]:
+        yield from grid_locations(grid)
+
+    files = config.get("location_file") or []
+    for path in files if isinstance(files, (list, tuple)) else [files]:
+        yield from file_locations(path)
+
+    tables = config.get("location_table") or []
+    for table in tables if isinstance(tables, (list, tuple)) else [tables]:
+        yield from table_locations(config["db"], table)
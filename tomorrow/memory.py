@@ -0,0 +1,72 @@
+import logging
+import os
+import threading
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+_MB = 1024 * 1024
+
+
+def current_rss_bytes() -> int:
+    """Resident set size of this process."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        import resource
+
+        # Peak rather than current RSS (KiB on Linux): errs towards throttling.
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class MemoryGuard:
+    """
+    Admission control for the staged pipeline: a location is fetched only
+    while RSS is below ``max_rss_mb``. Above the cap fetchers block until
+    in-flight locations finish and memory is freed; if RSS stays high with
+    nothing in flight, locations go through one at a time, so the working
+    set never grows past the cap plus one location.
+    """
+
+    def __init__(
+        self,
+        max_rss_mb: float,
+        poll_seconds: float = 0.2,
+        rss: Callable[[], int] = current_rss_bytes,
+    ):
+        if max_rss_mb <= 0:
+            raise ValueError("max_rss_mb must be positive")
+        self.limit = int(max_rss_mb * _MB)
+        self.poll_seconds = poll_seconds
+        self.rss = rss
+        self.inflight = 0
+        self.throttled = 0
+        self._cond = threading.Condition()
+
+    def admit(self) -> None:
+        """Block until one more location fits under the cap."""
+        with self._cond:
+            if self.rss() > self.limit and self.inflight:
+                self.throttled += 1
+                logger.log(
+                    logging.WARNING if self.throttled == 1 else logging.DEBUG,
+                    "Memory: RSS above %d MB, pausing fetches (%d in flight)",
+                    self.limit // _MB, self.inflight,
+                )
+                while self.inflight and self.rss() > self.limit:
+                    self._cond.wait(self.poll_seconds)
+            self.inflight += 1
+
+    def release(self) -> None:
+        """Mark one admitted location as finished."""
+        with self._cond:
+            self.inflight -= 1
+            self._cond.notify_all()
+
+
+def build_memory_guard(max_rss_mb: Optional[float]) -> Optional[MemoryGuard]:
+    """MemoryGuard for the pipeline's ``max_rss_mb`` setting (None: no cap)."""
+    if not max_rss_mb:
+        return None
+    return MemoryGuard(max_rss_mb)
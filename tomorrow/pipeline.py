@@ -0,0 +1,385 @@
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Callable, List, Dict, Any, Iterable, Optional, Tuple
+
+from .api import TomorrowAPIClient, parse_weather_response
+from .async_db import AsyncLoader
+from .cache import build_cache
+from .changes import change_channel
+from .circuit import OPEN, CircuitBreaker, CircuitOpenError
+from .db import WeatherDB
+from .fields import cadence_only_fields
+from .memory import build_memory_guard
+from .retry import RetryQueue
+from .tracing import NoopTracer, Span, Tracer, current_span
+from .watermark import LoadWatermarks, build_watermarks
+
+logger = logging.getLogger(__name__)
+
+# Marks the end of a queue for one consumer thread.
+_DONE = object()
+
+DEFAULT_FETCH_WORKERS = 4
+DEFAULT_LOAD_WORKERS = 2
+DEFAULT_QUEUE_SIZE = 64
+
+
+def _timed_parse(
+    raw: Dict[str, Any], now: Any, location: str
+) -> Tuple[List[Dict[str, Any]], int, int]:
+    """parse_weather_response plus wall-clock bounds for the parse span."""
+    start_ns = time.time_ns()
+    records = parse_weather_response(raw, now, location)
+    return records, start_ns, time.time_ns()
+
+
+def _run_inline(fn, *args) -> Future:
+    """Call ``fn`` now and wrap the outcome in a finished Future."""
+    future: Future = Future()
+    try:
+        future.set_result(fn(*args))
+    except Exception as exc:
+        future.set_exception(exc)
+    return future
+
+
+class _ParseInline:
+    """Stand-in for the process pool when ``parse_workers`` is 0."""
+
+    def submit(self, fn, *args) -> Future:
+        return _run_inline(fn, *args)
+
+    def shutdown(self, wait: bool = True, cancel_futures: bool = False) -> None:
+        pass
+
+
+class RequestSpacing:
+    """
+    Spaces API requests from every fetch thread at least ``interval``
+    seconds apart: one ``rate_limit_sleep_seconds`` budget for the whole
+    pipeline, however many fetchers share it.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = max(0.0, interval)
+        self._lock = threading.Lock()
+        self._next_at = 0.0
+
+    def wait(self) -> None:
+        """Block until this thread's request slot comes up."""
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_at)
+            self._next_at = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+
+
+class ETLPipeline:
+    """
+    Staged ETL: fetch threads -> parse process pool -> loader threads.
+
+    Stages are connected by bounded queues, so a slow loader blocks the
+    fetchers (and the location stream) instead of buffering every response
+    in memory. Parsing runs in separate processes and therefore never holds
+    up the next fetch or load.
+
+    ``max_rss_mb`` puts a hard cap on the process: above it the fetchers
+    pause until in-flight locations have been loaded (MemoryGuard).
+
+    With ``async_db`` the loaders hand batches to an asyncpg pool sized to
+    ``fetch_workers`` and move on; up to ``queue_size`` inserts are in
+    flight at once, overlapping with the API calls still running.
+    Finished inserts are completed on separate threads, never on the
+    asyncpg event loop.
+
+    ``watermarks`` lets several pipelines of one run (retry passes) share
+    the load watermarks; by default each run builds its own from config.
+    """
+
+    def __init__(
+        self,
+        config: Dict[str, Any],
+        retry_queue: Optional[RetryQueue] = None,
+        breaker: Optional[CircuitBreaker] = None,
+        tracer: Optional[Tracer] = None,
+        watermarks: Optional[LoadWatermarks] = None,
+    ):
+        settings = config.get("pipeline") or {}
+
+        self.config = config
+        self.retry_queue = retry_queue
+        self.breaker = breaker
+        self.tracer = tracer or NoopTracer()
+        self.watermarks = watermarks
+        self._run_span: Optional[Span] = None
+        self.fetch_workers = max(1, int(settings.get("fetch_workers") or DEFAULT_FETCH_WORKERS))
+        parse_workers = settings.get("parse_workers")
+        if parse_workers is None:
+            parse_workers = os.cpu_count() or 1
+        self.parse_workers = int(parse_workers)
+        self.load_workers = max(1, int(settings.get("load_workers") or DEFAULT_LOAD_WORKERS))
+        self.queue_size = max(1, int(settings.get("queue_size") or DEFAULT_QUEUE_SIZE))
+        self.spacing = RequestSpacing(config.get("rate_limit_sleep_seconds", 2))
+        self.async_db = bool(settings.get("async_db", False))
+        self._inflight = threading.BoundedSemaphore(self.queue_size)
+        self.memory = build_memory_guard(settings.get("max_rss_mb"))
+
+        self._total = 0
+        self._total_lock = threading.Lock()
+        self._record_lock = threading.Lock()
+        self._completions: Optional[ThreadPoolExecutor] = None
+
+    def _parse_pool(self):
+        if self.parse_workers <= 0:
+            return _ParseInline()
+        # spawn: forking a process that already runs fetch/load threads is unsafe.
+        return ProcessPoolExecutor(
+            max_workers=self.parse_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+
+    def _feed(self, locations: Iterable[Dict[str, Any]], fetch_q: queue.Queue) -> None:
+        try:
+            for location in locations:
+                if "lat" not in location or "lon" not in location:
+                    logger.warning("Skipping invalid location entry: %s", location)
+                    continue
+                fetch_q.put(location)
+        finally:
+            for _ in range(self.fetch_workers):
+                fetch_q.put(_DONE)
+
+    def _fetch(
+        self,
+        api_client: TomorrowAPIClient,
+        fetch_q: queue.Queue,
+        load_q: queue.Queue,
+        pool: Any,
+    ) -> None:
+        try:
+            while True:
+                location = fetch_q.get()
+                if location is _DONE:
+                    return
+
+                # Admitted before the response is fetched: that is where a
+                # location starts to cost memory. Released in _record.
+                if self.memory is not None:
+                    self.memory.admit()
+
+                # An open breaker fails fast without a request: no slot needed.
+                if self.breaker is None or self.breaker.state != OPEN:
+                    self.spacing.wait()
+
+                lat, lon = location["lat"], location["lon"]
+                location_str = f"{lat},{lon}"
+                # Ended by the loader (or below on failure), on another thread.
+                span = self.tracer.start_span("location", self._run_span, location=location_str)
+                try:
+                    with self.tracer.activate(span):
+                        raw, now = api_client.fetch_raw(lat, lon)
+                    future = pool.submit(_timed_parse, raw, now, location_str)
+                    load_q.put((lat, lon, future, span))
+                except CircuitOpenError as exc:
+                    logger.warning("ETL skipped %s: %s", location_str, exc)
+                    self._record(lat, lon, span, exc)
+                except Exception as exc:
+                    logger.exception("ETL fetch failed for location %s", location_str)
+                    self._record(lat, lon, span, exc)
+        finally:
+            api_client.close()
+
+    def _load(self, load_q: queue.Queue, db_client: WeatherDB) -> None:
+        while True:
+            item = load_q.get()
+            if item is _DONE:
+                return
+
+            lat, lon, future, span = item
+            location_str = f"{lat},{lon}"
+            try:
+                records, parse_start_ns, parse_end_ns = future.result()
+                parse_span = self.tracer.start_span(
+                    "parse", span, start_ns=parse_start_ns,
+                    location=location_str, records=len(records),
+                )
+                self.tracer.end_span(parse_span, end_ns=parse_end_ns)
+
+                if not records:
+                    logger.warning("No data returned for %s", location_str)
+                    self._record(lat, lon, span)
+                    continue
+
+                for record in records:
+                    record["latitude"] = lat
+                    record["longitude"] = lon
+
+                load_span = self.tracer.start_span(
+                    "load", span, location=location_str, rows=len(records)
+                )
+                loaded = partial(self._loaded, lat, lon, span, load_span, len(records))
+                if self.async_db:
+                    # Blocks only once queue_size inserts are in flight.
+                    self._inflight.acquire()
+                    try:
+                        future = db_client.submit(records)
+                    except Exception:
+                        self._inflight.release()
+                        raise
+                    future.add_done_callback(partial(self._insert_done, loaded))
+                else:
+                    loaded(_run_inline(db_client.bulk_insert_weather_data, records))
+            except Exception as exc:
+                logger.exception("ETL failed for location %s", location_str)
+                self._record(lat, lon, span, exc)
+
+    def _insert_done(self, loaded: Callable[[Future], None], future: Future) -> None:
+        """
+        Done-callback of an async insert, called on the asyncpg loop thread.
+        Finishing the location (span export, retry queue) is blocking I/O, so
+        it is handed to the completion threads.
+        """
+        self._inflight.release()
+        self._completions.submit(loaded, future)
+
+    def _loaded(
+        self, lat: float, lon: float, span: Span, load_span: Span, rows: int, future: Future
+    ) -> None:
+        """Finish a location once its insert is done."""
+        location_str = f"{lat},{lon}"
+        try:
+            inserted = future.result()
+        except Exception as exc:
+            load_span.record_error(exc)
+            self.tracer.end_span(load_span)
+            logger.error("ETL failed for location %s", location_str, exc_info=exc)
+            self._record(lat, lon, span, exc)
+            return
+
+        load_span.set_attribute("rows_inserted", inserted)
+        self.tracer.end_span(load_span)
+        with self._total_lock:
+            self._total += rows
+
+        logger.info("ETL loaded %d records for %s", rows, location_str)
+        span.set_attribute("records", rows)
+        self._record(lat, lon, span)
+
+    def _record(
+        self, lat: float, lon: float, span: Span, exc: Optional[Exception] = None
+    ) -> None:
+        """Close the location's span and update its retry state (once per location)."""
+        with self._record_lock:
+            # A failure after the location was already recorded (e.g. in
+            # _loaded) lands here again; its memory slot is released once.
+            if span.end_ns is not None:
+                return
+            span.end_ns = time.time_ns()
+
+        if self.memory is not None:
+            self.memory.release()
+        if exc is not None:
+            span.record_error(exc)
+        self.tracer.end_span(span)
+
+        if self.retry_queue is None:
+            return
+        if exc is None:
+            self.retry_queue.record_success(lat, lon)
+        elif isinstance(exc, CircuitOpenError):
+            self.retry_queue.defer(lat, lon, exc.retry_at, repr(exc))
+        else:
+            self.retry_queue.record_error(lat, lon, exc)
+
+    def run(self, locations: Iterable[Dict[str, Any]]) -> int:
+        """Process every location and return the number of records loaded."""
+        try:
+            # requests.Session is not thread-safe: one client per fetch thread.
+            api_clients = [
+                TomorrowAPIClient(self.config["api"], breaker=self.breaker, tracer=self.tracer)
+                for _ in range(self.fetch_workers)
+            ]
+            watermarks = self.watermarks
+            if watermarks is None:
+                watermarks = build_watermarks(
+                    self.config.get("watermarks"), self.config["api"].get("cadences")
+                )
+            options = {
+                "cache": build_cache(self.config.get("cache")),
+                "notify_channel": change_channel(self.config.get("change_feed")),
+                "watermarks": watermarks,
+                "merge_fields": cadence_only_fields(self.config["api"].get("cadences") or ()),
+            }
+            if self.async_db:
+                db_client = AsyncLoader(
+                    self.config["db"], pool_size=self.fetch_workers, **options
+                )
+                self._completions = ThreadPoolExecutor(
+                    max_workers=self.load_workers, thread_name_prefix="etl-complete"
+                )
+            else:
+                db_client = WeatherDB(self.config["db"], **options)
+        except Exception:
+            logger.exception("ETL initialization failed")
+            raise
+
+        # Location spans are started on fetch threads; parent them explicitly.
+        self._run_span = current_span()
+        pool = self._parse_pool()
+        fetch_q: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        load_q: queue.Queue = queue.Queue(maxsize=self.queue_size)
+
+        logger.info(
+            "ETL pipeline started (fetch=%d, parse=%d, load=%d%s, queue=%d)",
+            self.fetch_workers, self.parse_workers, self.load_workers,
+            " async" if self.async_db else "", self.queue_size,
+        )
+
+        fetchers = [
+            threading.Thread(
+                target=self._fetch, args=(client, fetch_q, load_q, pool), name=f"etl-fetch-{i}"
+            )
+            for i, client in enumerate(api_clients)
+        ]
+        loaders = [
+            threading.Thread(target=self._load, args=(load_q, db_client), name=f"etl-load-{i}")
+            for i in range(self.load_workers)
+        ]
+        for thread in fetchers + loaders:
+            thread.start()
+
+        try:
+            # The location stream is consumed on the calling thread; a full
+            # fetch queue pauses it.
+            self._feed(locations, fetch_q)
+        finally:
+            # Drain downstream stages even if the location stream failed.
+            for thread in fetchers:
+                thread.join()
+            for _ in loaders:
+                load_q.put(_DONE)
+            for thread in loaders:
+                thread.join()
+            pool.shutdown(wait=True)
+            # Waits for in-flight async inserts before closing the pool.
+            db_client.close()
+            if self._completions is not None:
+                self._completions.shutdown(wait=True)
+
+        if self.memory is not None and self.memory.throttled:
+            logger.info(
+                "ETL fetchers paused %d times at the %d MB RSS cap",
+                self.memory.throttled, self.memory.limit // (1024 * 1024),
+            )
+        logger.info(
+            "ETL completed successfully. Total records processed: %d", self._total
+        )
+        return self._total
+
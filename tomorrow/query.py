@@ -0,0 +1,580 @@
+import logging
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from typing import List, Dict, Any, Callable, Iterator, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import create_engine, event
+
+from .cache import QueryCache, location_key
+from .db import build_db_url
+from .fields import column_name, field_expression
+from .spatial import EARTH_RADIUS_KM
+
+logger = logging.getLogger(__name__)
+
+# Time columns are shipped as epoch microseconds and measurements as float8 so
+# the driver hands back plain ints/floats instead of datetime/Decimal objects,
+# and each result converts to NumPy columns in a single C-level pass.
+_EPOCH_US = "(EXTRACT(EPOCH FROM {col}) * 1000000)::int8"
+
+PREPARED_STATEMENTS: Dict[str, Tuple[str, str]] = {
+    # Latest observed (non-forecast) row per location.
+    "tomorrow_latest_values": (
+        "",
+        f"""
+        SELECT DISTINCT ON (w.latitude, w.longitude)
+            w.latitude::float8,
+            w.longitude::float8,
+            {_EPOCH_US.format(col="w.time_stamp")},
+            w.temperature::float8,
+            w.wind_speed::float8,
+            w.humidity::float8,
+            w.precipitation_type::float8
+        FROM weather_data w
+        WHERE NOT w.is_forecast
+        ORDER BY w.latitude, w.longitude, w.time_stamp DESC
+        """,
+    ),
+    # Hourly series for one location inside [start, end].
+    "tomorrow_time_series": (
+        "(numeric, numeric, timestamptz, timestamptz)",
+        f"""
+        SELECT
+            {_EPOCH_US.format(col="w.time_stamp")},
+            w.is_forecast,
+            w.temperature::float8,
+            w.wind_speed::float8,
+            w.humidity::float8,
+            w.precipitation_type::float8
+        FROM weather_data w
+        WHERE w.latitude = $1
+          AND w.longitude = $2
+          AND w.time_stamp >= $3
+          AND w.time_stamp <= $4
+        ORDER BY w.time_stamp, w.is_forecast
+        """,
+    ),
+    # Bucketed aggregates for one location inside [start, end); one row per
+    # hour, preferring the observed row over the forecast row.
+    "tomorrow_window_aggregates": (
+        "(numeric, numeric, timestamptz, timestamptz, text)",
+        f"""
+        SELECT
+            {_EPOCH_US.format(col="date_trunc($5, w.time_stamp, 'UTC')")},
+            COUNT(*)::int8,
+            MIN(w.temperature)::float8,
+            MAX(w.temperature)::float8,
+            AVG(w.temperature)::float8,
+            MAX(w.wind_speed)::float8,
+            AVG(w.wind_speed)::float8,
+            AVG(w.humidity)::float8
+        FROM (
+            SELECT DISTINCT ON (time_stamp)
+                time_stamp, temperature, wind_speed, humidity
+            FROM weather_data
+            WHERE latitude = $1
+              AND longitude = $2
+              AND time_stamp >= $3
+              AND time_stamp < $4
+            ORDER BY time_stamp, is_forecast
+        ) w
+        GROUP BY 1
+        ORDER BY 1
+        """,
+    ),
+}
+
+LATEST_VALUES_DTYPE = np.dtype(
+    [
+        ("latitude", "f8"),
+        ("longitude", "f8"),
+        ("time_stamp", "i8"),
+        ("temperature", "f8"),
+        ("wind_speed", "f8"),
+        ("humidity", "f8"),
+        ("precipitation_type", "f8"),
+    ]
+)
+
+TIME_SERIES_DTYPE = np.dtype(
+    [
+        ("time_stamp", "i8"),
+        ("is_forecast", "?"),
+        ("temperature", "f8"),
+        ("wind_speed", "f8"),
+        ("humidity", "f8"),
+        ("precipitation_type", "f8"),
+    ]
+)
+
+WINDOW_AGGREGATES_DTYPE = np.dtype(
+    [
+        ("bucket", "i8"),
+        ("row_count", "i8"),
+        ("temperature_min", "f8"),
+        ("temperature_max", "f8"),
+        ("temperature_mean", "f8"),
+        ("wind_speed_max", "f8"),
+        ("wind_speed_mean", "f8"),
+        ("humidity_mean", "f8"),
+    ]
+)
+
+DAILY_ROLLUP_DTYPE = np.dtype(
+    [
+        ("latitude", "f8"),
+        ("longitude", "f8"),
+        ("day", "i8"),
+        ("is_forecast", "?"),
+        ("hours", "i8"),
+        ("temperature_min", "f8"),
+        ("temperature_max", "f8"),
+        ("temperature_mean", "f8"),
+        ("wind_speed_min", "f8"),
+        ("wind_speed_max", "f8"),
+        ("wind_speed_mean", "f8"),
+        ("humidity_min", "f8"),
+        ("humidity_max", "f8"),
+        ("humidity_mean", "f8"),
+    ]
+)
+
+# Not prepared on connect: weather_daily_rollup may not exist on databases
+# that have not been migrated with `python -m tomorrow schema` yet.
+DAILY_ROLLUP_SQL = f"""
+SELECT
+    r.latitude::float8,
+    r.longitude::float8,
+    {_EPOCH_US.format(col="r.day::timestamp AT TIME ZONE 'UTC'")},
+    r.is_forecast,
+    r.hours::int8,
+    r.temperature_min::float8,
+    r.temperature_max::float8,
+    r.temperature_mean::float8,
+    r.wind_speed_min::float8,
+    r.wind_speed_max::float8,
+    r.wind_speed_mean::float8,
+    r.humidity_min::float8,
+    r.humidity_max::float8,
+    r.humidity_mean::float8
+FROM weather_daily_rollup r
+WHERE r.day >= %s AND r.day < %s
+ORDER BY r.latitude, r.longitude, r.day, r.is_forecast
+"""
+
+REGION_WINDOW_DTYPE = np.dtype(
+    [
+        ("latitude", "f8"),
+        ("longitude", "f8"),
+        ("time_stamp", "i8"),
+        ("temperature", "f8"),
+        ("wind_speed", "f8"),
+        ("humidity", "f8"),
+    ]
+)
+
+# One row per location-hour inside a bounding box, preferring the observed
+# row over the forecast row when both exist.
+REGION_WINDOW_SQL = f"""
+SELECT DISTINCT ON (w.latitude, w.longitude, w.time_stamp)
+    w.latitude::float8,
+    w.longitude::float8,
+    {_EPOCH_US.format(col="w.time_stamp")},
+    w.temperature::float8,
+    w.wind_speed::float8,
+    w.humidity::float8
+FROM weather_data w
+WHERE w.latitude BETWEEN %s AND %s
+  AND w.longitude BETWEEN %s AND %s
+  AND w.time_stamp >= %s
+  AND w.time_stamp <= %s
+ORDER BY w.latitude, w.longitude, w.time_stamp, w.is_forecast
+"""
+
+# KNN over idx_weather_locations_point (the ORDER BY expression must match
+# the indexed expression exactly for the GiST index to be used). Its distance
+# is in plain degrees, which overweights longitude away from the equator, so
+# the nearest NEAREST_CANDIDATES points are re-ranked by haversine distance.
+NEAREST_CANDIDATES = 8
+
+NEAREST_LOCATION_SQL = f"""
+WITH candidates AS (
+    SELECT l.latitude::float8 AS lat, l.longitude::float8 AS lon
+    FROM weather_locations l
+    ORDER BY point(l.longitude::float8, l.latitude::float8) <-> point(%s, %s)
+    LIMIT {NEAREST_CANDIDATES}
+)
+SELECT lat, lon, 2 * {EARTH_RADIUS_KM} * asin(sqrt(
+    sin(radians(lat - %s) / 2) ^ 2
+    + cos(radians(%s)) * cos(radians(lat)) * sin(radians(lon - %s) / 2) ^ 2
+)) AS distance_km
+FROM candidates
+ORDER BY distance_km
+LIMIT 1
+"""
+
+# Any requested API fields for one location; columns are filled in from the
+# field registry (core columns or ``extra`` JSONB keys).
+FIELD_SERIES_SQL = f"""
+SELECT
+    {_EPOCH_US.format(col="w.time_stamp")},
+    w.is_forecast{{columns}}
+FROM weather_data w
+WHERE w.latitude = %s
+  AND w.longitude = %s
+  AND w.time_stamp >= %s
+  AND w.time_stamp <= %s
+ORDER BY w.time_stamp, w.is_forecast
+"""
+
+HISTORY_DTYPE = np.dtype(
+    [
+        ("latitude", "f8"),
+        ("longitude", "f8"),
+        ("time_stamp", "i8"),
+        ("is_forecast", "?"),
+        ("temperature", "f8"),
+        ("wind_speed", "f8"),
+        ("humidity", "f8"),
+        ("precipitation_type", "f8"),
+    ]
+)
+
+# Every row in [start, end) for all locations (optionally a bounding box);
+# meant for multi-year pulls through a server-side cursor.
+HISTORY_SQL = f"""
+SELECT
+    w.latitude::float8,
+    w.longitude::float8,
+    {_EPOCH_US.format(col="w.time_stamp")},
+    w.is_forecast,
+    w.temperature::float8,
+    w.wind_speed::float8,
+    w.humidity::float8,
+    w.precipitation_type::float8
+FROM weather_data w
+WHERE w.time_stamp >= %s
+  AND w.time_stamp < %s{{bbox}}
+ORDER BY w.latitude, w.longitude, w.time_stamp, w.is_forecast
+"""
+
+HISTORY_BBOX_SQL = """
+  AND w.latitude BETWEEN %s AND %s
+  AND w.longitude BETWEEN %s AND %s"""
+
+AGGREGATE_BUCKETS = {"hour", "day", "week", "month"}
+
+# Rows per fetch from a server-side cursor: bounds the driver's Python
+# tuples in memory to one chunk at a time.
+DEFAULT_CHUNK_ROWS = 50_000
+
+
+def _prepare_statements(dbapi_connection, connection_record) -> None:
+    """Register the read statements once on every new pooled connection."""
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, (arg_types, sql) in PREPARED_STATEMENTS.items():
+            cursor.execute(f"PREPARE {name}{arg_types} AS {sql}")
+        dbapi_connection.commit()
+    finally:
+        cursor.close()
+
+
+def rows_to_frame(
+    rows: Sequence[Tuple[Any, ...]],
+    dtype: np.dtype,
+    time_columns: Sequence[str] = ("time_stamp",),
+) -> pd.DataFrame:
+    """
+    Convert driver tuples into a columnar DataFrame.
+
+    NULL measurements become NaN; epoch-microsecond columns become
+    tz-aware UTC datetimes.
+    """
+    array = np.array(rows, dtype=dtype) if rows else np.empty(0, dtype=dtype)
+    return array_to_frame(array, time_columns)
+
+
+def array_to_frame(
+    array: np.ndarray,
+    time_columns: Sequence[str] = ("time_stamp",),
+) -> pd.DataFrame:
+    """DataFrame from a structured array, one typed column per field."""
+    dtype = array.dtype
+    columns: Dict[str, Any] = {}
+    for name in dtype.names:
+        column = array[name]
+        if name in time_columns:
+            column = pd.to_datetime(column, unit="us", utc=True)
+        columns[name] = column
+
+    return pd.DataFrame(columns)
+
+
+class WeatherQuery:
+    """Read-side access to weather_data through server-side prepared statements."""
+
+    def __init__(
+        self,
+        db_config: Dict[str, str],
+        cache: Optional[QueryCache] = None,
+    ):
+        self.cache = cache
+        self.engine = create_engine(
+            build_db_url(db_config),
+            pool_size=5,
+            max_overflow=5,
+            pool_timeout=30,
+            future=True,
+        )
+        event.listen(self.engine, "connect", _prepare_statements)
+
+        logger.info("Query: Engine initialized")
+
+    def _execute(self, name: str, params: Sequence[Any] = ()) -> List[Tuple[Any, ...]]:
+        statement = f"EXECUTE {name}"
+        if params:
+            statement += "(" + ", ".join(["%s"] * len(params)) + ")"
+        return self._fetch(statement, params)
+
+    def _fetch(self, statement: str, params: Sequence[Any] = ()) -> List[Tuple[Any, ...]]:
+        conn = self.engine.raw_connection()
+        try:
+            cursor = conn.cursor()
+            try:
+                cursor.execute(statement, tuple(params))
+                return cursor.fetchall()
+            finally:
+                cursor.close()
+        finally:
+            conn.close()
+
+    def iter_chunks(
+        self,
+        statement: str,
+        params: Sequence[Any],
+        dtype: np.dtype,
+        chunk_size: int = DEFAULT_CHUNK_ROWS,
+    ) -> Iterator[np.ndarray]:
+        """
+        Stream ``statement`` through a named (server-side) cursor, yielding
+        structured arrays of at most ``chunk_size`` rows.
+        """
+        conn = self.engine.raw_connection()
+        try:
+            cursor = conn.cursor(name=f"tomorrow_stream_{uuid.uuid4().hex}")
+            cursor.itersize = chunk_size
+            try:
+                cursor.execute(statement, tuple(params))
+                while True:
+                    rows = cursor.fetchmany(chunk_size)
+                    if not rows:
+                        return
+                    yield np.array(rows, dtype=dtype)
+            finally:
+                cursor.close()
+        finally:
+            conn.close()
+
+    def iter_frames(
+        self,
+        statement: str,
+        params: Sequence[Any],
+        dtype: np.dtype,
+        chunk_size: int = DEFAULT_CHUNK_ROWS,
+        time_columns: Sequence[str] = ("time_stamp",),
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Like ``pd.read_sql(chunksize=...)`` for large results: one typed
+        DataFrame per ``chunk_size`` rows, so memory stays bounded by a
+        chunk however long the result is.
+        """
+        for array in self.iter_chunks(statement, params, dtype, chunk_size):
+            yield array_to_frame(array, time_columns)
+
+    def _cached(
+        self, key: Tuple[str, str, Any], build: Callable[[], pd.DataFrame]
+    ) -> pd.DataFrame:
+        if self.cache is None:
+            return build()
+
+        frame = self.cache.get(key)
+        if frame is None:
+            generation = self.cache.generation(key)
+            frame = build()
+            self.cache.set(key, frame, generation)
+
+        # Callers get their own copy so they cannot mutate the cached frame.
+        return frame.copy()
+
+    def latest_values(self) -> pd.DataFrame:
+        """Latest observed temperature, wind speed, etc. for every location."""
+        return self._cached(
+            ("latest_values", location_key(None, None), None),
+            lambda: rows_to_frame(
+                self._execute("tomorrow_latest_values"), LATEST_VALUES_DTYPE
+            ),
+        )
+
+    def time_series(
+        self,
+        lat: float,
+        lon: float,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+    ) -> pd.DataFrame:
+        """
+        Hourly series for one location.
+        Defaults to 24h ago through 5 days in the future, aligned to the
+        current hour so repeated calls within the hour share a cache entry.
+        """
+        now = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+        start = start or now - timedelta(hours=24)
+        end = end or now + timedelta(days=5)
+
+        return self._cached(
+            ("time_series", location_key(lat, lon), (start, end)),
+            lambda: rows_to_frame(
+                self._execute("tomorrow_time_series", (lat, lon, start, end)),
+                TIME_SERIES_DTYPE,
+            ),
+        )
+
+    def field_series(
+        self,
+        lat: float,
+        lon: float,
+        fields: Sequence[str],
+        start: datetime,
+        end: datetime,
+    ) -> pd.DataFrame:
+        """
+        Hourly series of arbitrary API fields (e.g. ``dewPoint``) for one
+        location, one float column per field named after its column.
+        """
+        fields = tuple(fields)
+        dtype = np.dtype(
+            [("time_stamp", "i8"), ("is_forecast", "?")]
+            + [(column_name(f), "f8") for f in fields]
+        )
+        statement = FIELD_SERIES_SQL.format(
+            columns="".join(f",\n    {field_expression(f)}" for f in fields)
+        )
+
+        return self._cached(
+            ("field_series", location_key(lat, lon), (fields, start, end)),
+            lambda: rows_to_frame(self._fetch(statement, (lat, lon, start, end)), dtype),
+        )
+
+    def window_aggregates(
+        self,
+        lat: float,
+        lon: float,
+        start: datetime,
+        end: datetime,
+        bucket: str = "day",
+    ) -> pd.DataFrame:
+        """Min/max/mean measurements per ``bucket`` for one location."""
+        if bucket not in AGGREGATE_BUCKETS:
+            raise ValueError(
+                f"Unsupported aggregate bucket: {bucket} "
+                f"(expected one of {sorted(AGGREGATE_BUCKETS)})"
+            )
+
+        return self._cached(
+            ("window_aggregates", location_key(lat, lon), (start, end, bucket)),
+            lambda: rows_to_frame(
+                self._execute(
+                    "tomorrow_window_aggregates", (lat, lon, start, end, bucket)
+                ),
+                WINDOW_AGGREGATES_DTYPE,
+                time_columns=("bucket",),
+            ),
+        )
+
+    def region_window(
+        self,
+        bbox: Tuple[float, float, float, float],
+        start: datetime,
+        end: datetime,
+    ) -> pd.DataFrame:
+        """
+        Every location-hour inside ``bbox`` = (min_lat, max_lat, min_lon,
+        max_lon) between ``start`` and ``end``, observed rows preferred.
+        """
+        min_lat, max_lat, min_lon, max_lon = bbox
+        return self._cached(
+            ("region_window", location_key(None, None), (tuple(bbox), start, end)),
+            lambda: rows_to_frame(
+                self._fetch(
+                    REGION_WINDOW_SQL,
+                    (min_lat, max_lat, min_lon, max_lon, start, end),
+                ),
+                REGION_WINDOW_DTYPE,
+            ),
+        )
+
+    def nearest_location(self, lat: float, lon: float) -> Optional[Tuple[float, float, float]]:
+        """
+        Closest ingested location to an arbitrary point as
+        (lat, lon, distance_km), or None if nothing has been loaded yet.
+        """
+        lat, lon = float(lat), float(lon)
+        rows = self._fetch(NEAREST_LOCATION_SQL, (lon, lat, lat, lat, lon))
+        if not rows:
+            return None
+
+        nearest_lat, nearest_lon, distance_km = rows[0]
+        return nearest_lat, nearest_lon, float(distance_km)
+
+    def weather_at_point(
+        self,
+        lat: float,
+        lon: float,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+    ) -> pd.DataFrame:
+        """time_series for the ingested location nearest to (lat, lon)."""
+        nearest = self.nearest_location(lat, lon)
+        if nearest is None:
+            return rows_to_frame([], TIME_SERIES_DTYPE)
+
+        return self.time_series(nearest[0], nearest[1], start, end)
+
+    def daily_summary(self, start: date, end: date) -> pd.DataFrame:
+        """
+        Per-location daily min/max/mean from weather_daily_rollup for
+        days in [start, end); reads one row per location-day.
+        """
+        return self._cached(
+            ("daily_summary", location_key(None, None), (start, end)),
+            lambda: rows_to_frame(
+                self._fetch(DAILY_ROLLUP_SQL, (start, end)),
+                DAILY_ROLLUP_DTYPE,
+                time_columns=("day",),
+            ),
+        )
+
+    def iter_history(
+        self,
+        start: datetime,
+        end: datetime,
+        bbox: Optional[Tuple[float, float, float, float]] = None,
+        chunk_size: int = DEFAULT_CHUNK_ROWS,
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Every stored row in [start, end) for all locations, or those inside
+        ``bbox`` = (min_lat, max_lat, min_lon, max_lon), as one DataFrame per
+        ``chunk_size`` rows (ordered by location, then time). Not cached;
+        meant for multi-year pulls aggregated chunk by chunk.
+        """
+        params: List[Any] = [start, end]
+        if bbox is not None:
+            params.extend(bbox)
+        statement = HISTORY_SQL.format(bbox=HISTORY_BBOX_SQL if bbox is not None else "")
+        return self.iter_frames(statement, params, HISTORY_DTYPE, chunk_size)
+
+    def close(self) -> None:
+        self.engine.dispose()
@@ -0,0 +1,122 @@
+import json
+import logging
+import os
+import sys
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, Optional
+from urllib.parse import urlparse, parse_qs
+
+from .cache import build_cache
+from .config_loader import load_config
+from .query import WeatherQuery
+
+logger = logging.getLogger(__name__)
+
+
+def _parse_time(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+class QueryRequestHandler(BaseHTTPRequestHandler):
+    """
+    Minimal JSON API for dashboards.
+
+    GET /latest
+    GET /timeseries?lat=..&lon=..[&start=..&end=..]
+    GET /aggregates?lat=..&lon=..&start=..&end=..[&bucket=day]
+    GET /point?lat=..&lon=..[&start=..&end=..]   (nearest ingested location)
+    """
+
+    query: WeatherQuery
+
+    def do_GET(self) -> None:
+        url = urlparse(self.path)
+        params = {k: v[0] for k, v in parse_qs(url.query).items()}
+
+        try:
+            if url.path == "/latest":
+                frame = self.query.latest_values()
+            elif url.path == "/timeseries":
+                frame = self.query.time_series(
+                    float(params["lat"]),
+                    float(params["lon"]),
+                    _parse_time(params.get("start")),
+                    _parse_time(params.get("end")),
+                )
+            elif url.path == "/aggregates":
+                frame = self.query.window_aggregates(
+                    float(params["lat"]),
+                    float(params["lon"]),
+                    _parse_time(params["start"]),
+                    _parse_time(params["end"]),
+                    params.get("bucket", "day"),
+                )
+            elif url.path == "/point":
+                frame = self.query.weather_at_point(
+                    float(params["lat"]),
+                    float(params["lon"]),
+                    _parse_time(params.get("start")),
+                    _parse_time(params.get("end")),
+                )
+            else:
+                self._send(404, b'{"error": "not found"}')
+                return
+        except (KeyError, ValueError) as exc:
+            self._send(400, json.dumps({"error": f"bad request: {exc}"}).encode())
+            return
+        except Exception:
+            logger.exception("Query failed for %s", self.path)
+            self._send(500, b'{"error": "query failed"}')
+            return
+
+        self._send(200, frame.to_json(orient="split", date_format="iso").encode())
+
+    def _send(self, status: int, body: bytes) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+
+def build_server(config: Dict[str, Any], host: str, port: int) -> ThreadingHTTPServer:
+    """Create (but do not start) the query HTTP server."""
+    handler = type(
+        "BoundQueryRequestHandler",
+        (QueryRequestHandler,),
+        {"query": WeatherQuery(config["db"], cache=build_cache(config.get("cache")))},
+    )
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def main() -> None:
+    """Serve read queries over HTTP until interrupted."""
+    logging.basicConfig(
+        level=os.getenv("LOG_LEVEL", "INFO").upper(),
+        format="%(asctime)s | %(levelname)s | %(name)s | %(message)s",
+        handlers=[logging.StreamHandler(sys.stdout)],
+    )
+
+    host = os.getenv("QUERY_HOST", "0.0.0.0")
+    port = int(os.getenv("QUERY_PORT", "8080"))
+
+    server = build_server(load_config(), host, port)
+    logger.info("Query service listening on %s:%s", host, port)
+
+    try:
+        server.serve_forever()
+    except (KeyboardInterrupt, SystemExit):
+        logger.info("Query service shutting down")
+    finally:
+        server.server_close()
+        server.RequestHandlerClass.query.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import List, Dict, Any, Optional, Tuple
+
+from sqlalchemy import create_engine, inspect, text
+
+from .db import build_db_url
+from .rollup import FILL_MISSING_BEFORE_SQL, ROLLUP_TABLE
+
+logger = logging.getLogger(__name__)
+
+# Loads refresh rollups and insert rows from 24h ago (a day boundary earlier
+# once truncated), so anything younger than two days may still be written.
+MIN_RETENTION_DAYS = 2
+
+# Per-location batches go through idx_weather_location_series
+# (latitude, longitude, time_stamp): a range scan, never a full table scan.
+DELETE_BATCH_SQL = text(
+    """
+    DELETE FROM weather_data
+    WHERE ctid IN (
+        SELECT ctid FROM weather_data
+        WHERE latitude = :lat
+          AND longitude = :lon
+          AND time_stamp < :cutoff
+          AND is_forecast = :is_forecast
+        LIMIT :batch_size
+    )
+    """
+)
+
+
+def retention_cutoffs(
+    history_days: int, forecast_days: int, now: Optional[datetime] = None
+) -> Tuple[datetime, datetime]:
+    """UTC-midnight cutoffs for hourly history and for stale forecast rows."""
+    if min(history_days, forecast_days) < MIN_RETENTION_DAYS:
+        raise RuntimeError(f"Retention periods must be at least {MIN_RETENTION_DAYS} days")
+
+    today = (now or datetime.now(timezone.utc)).astimezone(timezone.utc).replace(
+        hour=0, minute=0, second=0, microsecond=0
+    )
+    return today - timedelta(days=history_days), today - timedelta(days=forecast_days)
+
+
+class RetentionJob:
+    """
+    Keeps weather_data small: hourly observations older than
+    ``history_days`` survive only as daily aggregates in
+    weather_daily_rollup, and forecast rows for hours more than
+    ``forecast_days`` in the past (superseded by observations) are purged.
+
+    Deletes run per location in batches of ``batch_size`` rows, each in its
+    own short transaction, so the hourly loads are never blocked for long.
+    """
+
+    def __init__(
+        self,
+        db_config: Dict[str, str],
+        history_days: int = 90,
+        forecast_days: int = 2,
+        batch_size: int = 5000,
+    ):
+        self.history_days = history_days
+        self.forecast_days = forecast_days
+        self.batch_size = batch_size
+        self.engine = create_engine(
+            build_db_url(db_config), pool_size=1, max_overflow=0, future=True
+        )
+
+    def _locations(self) -> List[Tuple[Any, Any]]:
+        inspector = inspect(self.engine)
+        source = "weather_locations" if inspector.has_table("weather_locations") else "weather_data"
+        with self.engine.connect() as conn:
+            return [
+                tuple(row)
+                for row in conn.execute(text(f"SELECT DISTINCT latitude, longitude FROM {source}"))
+            ]
+
+    def _purge(self, lat: Any, lon: Any, cutoff: datetime, is_forecast: bool) -> int:
+        deleted = 0
+        while True:
+            with self.engine.begin() as conn:
+                count = conn.execute(
+                    DELETE_BATCH_SQL,
+                    {
+                        "lat": lat,
+                        "lon": lon,
+                        "cutoff": cutoff,
+                        "is_forecast": is_forecast,
+                        "batch_size": self.batch_size,
+                    },
+                ).rowcount
+            deleted += count
+            if count < self.batch_size:
+                return deleted
+
+    def run(self, now: Optional[datetime] = None) -> Dict[str, int]:
+        """Downsample and purge; returns rolled-up days and deleted row counts."""
+        history_cutoff, forecast_cutoff = retention_cutoffs(
+            self.history_days, self.forecast_days, now
+        )
+
+        purge_history = inspect(self.engine).has_table(ROLLUP_TABLE)
+        rolled_up = 0
+        if purge_history:
+            with self.engine.begin() as conn:
+                rolled_up = conn.execute(
+                    FILL_MISSING_BEFORE_SQL, {"cutoff": history_cutoff}
+                ).rowcount
+        else:
+            logger.warning(
+                "Retention: %s missing, keeping hourly history (run `python -m tomorrow schema`)",
+                ROLLUP_TABLE,
+            )
+
+        stats = {"rolled_up_days": rolled_up, "history_deleted": 0, "forecasts_deleted": 0}
+        for lat, lon in self._locations():
+            stats["forecasts_deleted"] += self._purge(lat, lon, forecast_cutoff, True)
+            if purge_history:
+                stats["history_deleted"] += self._purge(lat, lon, history_cutoff, False)
+
+        logger.info(
+            "Retention: %d location-days rolled up, %d observed and %d forecast rows deleted "
+            "(history before %s, forecasts before %s)",
+            stats["rolled_up_days"], stats["history_deleted"], stats["forecasts_deleted"],
+            history_cutoff.date(), forecast_cutoff.date(),
+        )
+        return stats
+
+    def close(self) -> None:
+        self.engine.dispose()
+
+
+def build_retention_job(config: Dict[str, Any]) -> Optional[RetentionJob]:
+    """Create a RetentionJob from the optional ``retention`` config section."""
+    retention_config = config.get("retention")
+    if not retention_config or not retention_config.get("enabled", True):
+        return None
+
+    return RetentionJob(
+        config["db"],
+        history_days=retention_config.get("history_days", 90),
+        forecast_days=retention_config.get("forecast_days", 2),
+        batch_size=retention_config.get("batch_size", 5000),
+    )
+
+
+def run_retention(config: Dict[str, Any]) -> Optional[Dict[str, int]]:
+    """Run the configured retention job once (None when not configured)."""
+    job = build_retention_job(config)
+    if job is None:
+        return None
+    try:
+        return job.run()
+    finally:
+        job.close()
@@ -0,0 +1,261 @@
+import logging
+import os
+import random
+import sqlite3
+import threading
+import time
+from typing import Dict, Any, List, Optional
+
+from .cache import location_key
+
+logger = logging.getLogger(__name__)
+
+# A rate-limited (429) location is retried by the next hourly run at the
+# earliest: the quota does not reset within a run.
+RATE_LIMIT_DEFER_SECONDS = 3600
+
+
+def is_rate_limited(exc: BaseException) -> bool:
+    """True for an HTTP 429 from the API."""
+    response = getattr(exc, "response", None)
+    return getattr(response, "status_code", None) == 429
+
+
+def backoff_delay(
+    attempt: int,
+    base_seconds: float,
+    max_seconds: float,
+    rng: Optional[random.Random] = None,
+) -> float:
+    """
+    Exponential backoff with full jitter: uniform in
+    [0, min(max_seconds, base_seconds * 2 ** attempt)].
+    """
+    ceiling = min(max_seconds, base_seconds * (2 ** attempt))
+    return (rng or random).uniform(0, ceiling)
+
+
+class RetryQueue:
+    """
+    Durable retry / dead-letter queue for failed locations (SQLite).
+
+    A failed location is scheduled for another attempt after an exponential,
+    jittered delay. After ``max_attempts`` failures in one run it is
+    dead-lettered: no more retries this run, but the next scheduled run still
+    tries it (``start_run`` resets its attempts) and a success clears it.
+    Consecutive and total failure counts feed the chronic-failure report.
+    A location skipped because the circuit breaker was open is deferred
+    until the breaker half-opens, and a rate-limited one until the next
+    scheduled run, neither using up an attempt.
+
+    Without ``path`` the queue lives in memory and only spans one run.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        max_attempts: int = 3,
+        base_delay_seconds: float = 5,
+        max_delay_seconds: float = 300,
+    ):
+        self.path = path
+        self.max_attempts = max_attempts
+        self.base_delay_seconds = base_delay_seconds
+        self.max_delay_seconds = max_delay_seconds
+
+        if path:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path or ":memory:", timeout=5, check_same_thread=False)
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS location_failures (
+                location TEXT PRIMARY KEY,
+                latitude REAL NOT NULL,
+                longitude REAL NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                consecutive_failures INTEGER NOT NULL DEFAULT 0,
+                total_failures INTEGER NOT NULL DEFAULT 0,
+                pending INTEGER NOT NULL DEFAULT 0,
+                next_attempt_at REAL,
+                last_error TEXT,
+                first_failed_at REAL,
+                last_failed_at REAL,
+                last_success_at REAL
+            );
+            CREATE INDEX IF NOT EXISTS idx_location_failures_due
+                ON location_failures (next_attempt_at) WHERE pending = 1;
+            """
+        )
+        if path:
+            logger.info("Retry: durable retry queue at %s", path)
+
+    def record_failure(self, lat: float, lon: float, error: str) -> Optional[float]:
+        """
+        Schedule a retry for a failed location.
+        Returns the delay in seconds, or None if it was dead-lettered.
+        """
+        now = time.time()
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT attempts FROM location_failures WHERE location = ?",
+                (location_key(lat, lon),),
+            ).fetchone()
+            attempts = (row[0] if row else 0) + 1
+
+            delay = None
+            if attempts < self.max_attempts:
+                delay = backoff_delay(attempts - 1, self.base_delay_seconds, self.max_delay_seconds)
+
+            self._conn.execute(
+                """
+                INSERT INTO location_failures (
+                    location, latitude, longitude, attempts, consecutive_failures,
+                    total_failures, pending, next_attempt_at, last_error,
+                    first_failed_at, last_failed_at
+                )
+                VALUES (?, ?, ?, ?, 1, 1, ?, ?, ?, ?, ?)
+                ON CONFLICT (location) DO UPDATE SET
+                    attempts = excluded.attempts,
+                    consecutive_failures = consecutive_failures + 1,
+                    total_failures = total_failures + 1,
+                    pending = excluded.pending,
+                    next_attempt_at = excluded.next_attempt_at,
+                    last_error = excluded.last_error,
+                    first_failed_at = COALESCE(first_failed_at, excluded.first_failed_at),
+                    last_failed_at = excluded.last_failed_at
+                """,
+                (
+                    location_key(lat, lon), lat, lon, attempts,
+                    int(delay is not None),
+                    now + delay if delay is not None else None,
+                    error[:500], now, now,
+                ),
+            )
+            self._conn.commit()
+
+        if delay is None:
+            logger.error(
+                "Retry: %s,%s dead-lettered after %d attempts: %s", lat, lon, attempts, error
+            )
+        else:
+            logger.warning("Retry: %s,%s queued for retry in %.1fs", lat, lon, delay)
+        return delay
+
+    def record_error(self, lat: float, lon: float, exc: Exception) -> Optional[float]:
+        """
+        record_failure, except that a rate-limited location is deferred past
+        this run (RATE_LIMIT_DEFER_SECONDS) instead of retried with backoff.
+        """
+        if is_rate_limited(exc):
+            return self.defer(lat, lon, time.time() + RATE_LIMIT_DEFER_SECONDS, repr(exc))
+        return self.record_failure(lat, lon, repr(exc))
+
+    def defer(self, lat: float, lon: float, until: float, error: str) -> float:
+        """
+        Schedule a location that was skipped without an attempt (the circuit
+        breaker was open, the API rate limit was hit) for ``until`` at the
+        earliest. Attempts and failure
+        counts are left alone, so an upstream outage cannot dead-letter a
+        location before it has been tried. Returns the delay in seconds.
+        """
+        now = time.time()
+        next_attempt_at = max(until, now + self.base_delay_seconds)
+
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT INTO location_failures (
+                    location, latitude, longitude, pending, next_attempt_at, last_error
+                )
+                VALUES (?, ?, ?, 1, ?, ?)
+                ON CONFLICT (location) DO UPDATE SET
+                    pending = 1,
+                    next_attempt_at = excluded.next_attempt_at,
+                    last_error = excluded.last_error
+                """,
+                (location_key(lat, lon), lat, lon, next_attempt_at, error[:500]),
+            )
+            self._conn.commit()
+
+        logger.info("Retry: %s,%s deferred for %.1fs: %s", lat, lon, next_attempt_at - now, error)
+        return next_attempt_at - now
+
+    def record_success(self, lat: float, lon: float) -> None:
+        with self._lock:
+            self._conn.execute(
+                """
+                UPDATE location_failures
+                SET attempts = 0, consecutive_failures = 0, pending = 0,
+                    next_attempt_at = NULL, first_failed_at = NULL, last_success_at = ?
+                WHERE location = ?
+                """,
+                (time.time(), location_key(lat, lon)),
+            )
+            self._conn.commit()
+
+    def start_run(self) -> int:
+        """
+        Give dead-lettered locations a fresh set of attempts for a new run.
+        Returns the number of retries still pending from an earlier run.
+        """
+        with self._lock:
+            self._conn.execute("UPDATE location_failures SET attempts = 0 WHERE pending = 0")
+            self._conn.commit()
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM location_failures WHERE pending = 1"
+            ).fetchone()[0]
+
+    def next_attempt_at(self) -> Optional[float]:
+        """Epoch seconds of the earliest pending retry, or None."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT MIN(next_attempt_at) FROM location_failures WHERE pending = 1"
+            ).fetchone()[0]
+
+    def due(self, now: Optional[float] = None) -> List[Dict[str, float]]:
+        """Pending locations whose retry time has come, earliest first."""
+        with self._lock:
+            rows = self._conn.execute(
+                """
+                SELECT latitude, longitude FROM location_failures
+                WHERE pending = 1 AND next_attempt_at <= ?
+                ORDER BY next_attempt_at
+                """,
+                (time.time() if now is None else now,),
+            ).fetchall()
+        return [{"lat": lat, "lon": lon} for lat, lon in rows]
+
+    def chronic(self, min_failures: int = 3) -> List[Dict[str, Any]]:
+        """Locations that have failed at least ``min_failures`` times in a row."""
+        with self._lock:
+            cursor = self._conn.execute(
+                """
+                SELECT latitude, longitude, consecutive_failures, total_failures,
+                       last_error, first_failed_at, last_failed_at, last_success_at
+                FROM location_failures
+                WHERE consecutive_failures >= ?
+                ORDER BY consecutive_failures DESC, total_failures DESC
+                """,
+                (min_failures,),
+            )
+            names = [d[0] for d in cursor.description]
+            return [dict(zip(names, row)) for row in cursor.fetchall()]
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+def build_retry_queue(retry_config: Optional[Dict[str, Any]]) -> Optional[RetryQueue]:
+    """Create a RetryQueue from the optional ``retry`` config section."""
+    if not retry_config or not retry_config.get("enabled", True):
+        return None
+
+    return RetryQueue(
+        path=retry_config.get("path"),
+        max_attempts=retry_config.get("max_attempts", 3),
+        base_delay_seconds=retry_config.get("base_delay_seconds", 5),
+        max_delay_seconds=retry_config.get("max_delay_seconds", 300),
+    )
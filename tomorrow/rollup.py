@@ -0,0 +1,112 @@
+import logging
+from collections import defaultdict
+from typing import List, Dict, Any, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+logger = logging.getLogger(__name__)
+
+ROLLUP_TABLE = "weather_daily_rollup"
+
+_AGGREGATES = """
+    COUNT(*),
+    MIN(temperature), MAX(temperature), AVG(temperature),
+    MIN(wind_speed), MAX(wind_speed), AVG(wind_speed),
+    MIN(humidity), MAX(humidity), AVG(humidity)
+"""
+
+_INSERT_SELECT = f"""
+INSERT INTO {ROLLUP_TABLE} (
+    latitude, longitude, day, is_forecast, hours,
+    temperature_min, temperature_max, temperature_mean,
+    wind_speed_min, wind_speed_max, wind_speed_mean,
+    humidity_min, humidity_max, humidity_mean
+)
+SELECT
+    latitude,
+    longitude,
+    (time_stamp AT TIME ZONE 'UTC')::date,
+    is_forecast,
+    {_AGGREGATES}
+FROM weather_data
+WHERE {{where}}
+GROUP BY 1, 2, 3, 4
+"""
+
+_UPSERT = _INSERT_SELECT + """
+ON CONFLICT (latitude, longitude, day, is_forecast) DO UPDATE SET
+    hours = EXCLUDED.hours,
+    temperature_min = EXCLUDED.temperature_min,
+    temperature_max = EXCLUDED.temperature_max,
+    temperature_mean = EXCLUDED.temperature_mean,
+    wind_speed_min = EXCLUDED.wind_speed_min,
+    wind_speed_max = EXCLUDED.wind_speed_max,
+    wind_speed_mean = EXCLUDED.wind_speed_mean,
+    humidity_min = EXCLUDED.humidity_min,
+    humidity_max = EXCLUDED.humidity_max,
+    humidity_mean = EXCLUDED.humidity_mean,
+    updated_at = NOW()
+"""
+
+# Recompute only the UTC days a load touched, for one location; the range
+# scan is served by idx_weather_location_series.
+REFRESH_LOCATION_SQL = text(
+    _UPSERT.format(
+        where="""
+            latitude = :lat
+            AND longitude = :lon
+            AND time_stamp >= date_trunc('day', CAST(:start AS timestamptz), 'UTC')
+            AND time_stamp < date_trunc('day', CAST(:end AS timestamptz), 'UTC')
+                + INTERVAL '1 day'
+        """
+    )
+)
+
+# Same refresh with asyncpg ($n) placeholders, for tomorrow.async_db.
+REFRESH_LOCATION_ASYNC_SQL = _UPSERT.format(
+    where="""
+        latitude = $1
+        AND longitude = $2
+        AND time_stamp >= date_trunc('day', $3::timestamptz, 'UTC')
+        AND time_stamp < date_trunc('day', $4::timestamptz, 'UTC') + INTERVAL '1 day'
+    """
+)
+
+BACKFILL_SQL = text(_UPSERT.format(where="TRUE"))
+
+# Roll up days before :cutoff that have no rollup row yet (retention runs it
+# before deleting hourly history). Existing rows are left alone: they were
+# computed from complete days at load time, while the hourly rows of a day
+# may already be partly purged.
+FILL_MISSING_BEFORE_SQL = text(
+    _INSERT_SELECT.format(where="time_stamp < CAST(:cutoff AS timestamptz)")
+    + "\nON CONFLICT (latitude, longitude, day, is_forecast) DO NOTHING\n"
+)
+
+
+def touched_ranges(rows: List[Dict[str, Any]]) -> Dict[Tuple[Any, Any], Tuple[Any, Any]]:
+    """Earliest and latest time_stamp per (latitude, longitude) in a batch."""
+    ranges: Dict[Tuple[Any, Any], List[Any]] = defaultdict(list)
+    for row in rows:
+        ranges[(row["latitude"], row["longitude"])].append(row["time_stamp"])
+    return {key: (min(stamps), max(stamps)) for key, stamps in ranges.items()}
+
+
+def refresh_daily_rollup(conn: Connection, rows: List[Dict[str, Any]]) -> None:
+    """
+    Re-aggregate the days touched by ``rows`` into weather_daily_rollup.
+    Runs on the caller's connection so it commits with the insert.
+    """
+    for (lat, lon), (start, end) in touched_ranges(rows).items():
+        conn.execute(
+            REFRESH_LOCATION_SQL,
+            {"lat": lat, "lon": lon, "start": start, "end": end},
+        )
+
+
+def backfill_daily_rollup(conn: Connection) -> int:
+    """Rebuild the rollup from every row in weather_data."""
+    result = conn.execute(BACKFILL_SQL)
+    logger.info("Rollup: backfilled %d location-days", result.rowcount)
+    return result.rowcount
@@ -1,23 +1,36 @@
 import logging
 import sys
-from apscheduler.schedulers.blocking import BlockingScheduler
+from typing import Any
 
 from .config_loader import load_config
 from .etl import run_weather_etl
 
-# 🔹 CRITICAL FIX: send logs to stdout for Docker
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s | %(levelname)s | %(name)s | %(message)s",
-    handlers=[logging.StreamHandler(sys.stdout)],
-)
-
 logger = logging.getLogger(__name__)
 
 
+def __getattr__(name: str) -> Any:
+    # APScheduler is only needed once the service actually starts.
+    if name == "BlockingScheduler":
+        from apscheduler.schedulers.blocking import BlockingScheduler
+
+        globals()[name] = BlockingScheduler
+        return BlockingScheduler
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def configure_logging() -> None:
+    # 🔹 CRITICAL FIX: send logs to stdout for Docker
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s | %(levelname)s | %(name)s | %(message)s",
+        handlers=[logging.StreamHandler(sys.stdout)],
+    )
+
+
 def main() -> None:
     """Run bootstrap ETL and start hourly scheduler."""
 
+    configure_logging()
     logger.info("Scheduler service starting")
 
     config = load_config()
@@ -37,15 +50,47 @@ def main() -> None:
 
     # --- Scheduled job definition ---
     def scheduled_job() -> None:
+        nonlocal config
+
+        # load_config is cached on the file's mtime, so this only re-parses
+        # when config.yaml was edited (e.g. locations added) since last run.
+        try:
+            config = load_config()
+        except Exception:
+            logger.exception("Config reload failed; keeping previous configuration")
+
         logger.info("Scheduled ETL job started")
         records = run_weather_etl(config)
         logger.info(
             "Scheduled ETL job finished (records processed=%s)",
             records,
         )
+        schedule_analytics_export()
+
+    # --- Analytics export refresh after each ETL run ---
+    def analytics_job() -> None:
+        from .analytics import sync_analytics
+
+        # Logs its own failures.
+        sync_analytics(config)
+
+    def schedule_analytics_export() -> None:
+        analytics = config.get("analytics")
+        if not analytics or not analytics.get("enabled", True):
+            return
+        # A one-off job of its own: the mirror follows every run without
+        # delaying the next scrape, and a still-running export is not doubled.
+        scheduler.add_job(
+            func=analytics_job,
+            id="analytics_export",
+            replace_existing=True,
+            max_instances=1,
+            misfire_grace_time=3600,
+        )
 
     # --- Scheduler setup ---
-    scheduler = BlockingScheduler()
+    scheduler_cls = globals().get("BlockingScheduler") or __getattr__("BlockingScheduler")
+    scheduler = scheduler_cls()
     scheduler.add_job(
         func=scheduled_job,
         trigger="interval",
@@ -55,6 +100,31 @@ def main() -> None:
         misfire_grace_time=300,
     )
 
+    # --- Daily retention (downsampling + stale forecast purge) ---
+    retention = config.get("retention")
+    if retention and retention.get("enabled", True):
+
+        def retention_job() -> None:
+            from .retention import run_retention
+
+            try:
+                run_retention(config)
+            except Exception:
+                logger.exception("Retention job failed")
+
+        scheduler.add_job(
+            func=retention_job,
+            trigger="cron",
+            hour=retention.get("hour", 3),
+            id="daily_retention",
+            coalesce=True,
+            misfire_grace_time=3600,
+        )
+        logger.info("Daily retention job scheduled at %02d:00", retention.get("hour", 3))
+
+    # Export what the bootstrap run loaded as soon as the scheduler starts.
+    schedule_analytics_export()
+
     logger.info("Hourly scheduler started (interval=1h)")
 
     try:
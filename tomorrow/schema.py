@@ -0,0 +1,176 @@
+import logging
+from typing import List, Dict, Any, Sequence, Tuple
+
+from sqlalchemy import create_engine, text
+
+from .audit import AUDIT_TABLES
+from .db import build_db_url
+from .fields import EXTRA_COLUMN, promote_field_statement
+from .rollup import backfill_daily_rollup
+
+logger = logging.getLogger(__name__)
+
+# Columns added to weather_data after the initial release (nullable, no
+# default: a catalog-only change). Keep in sync with scripts/init-db.sql.
+COLUMNS: List[str] = [
+    f"ALTER TABLE weather_data ADD COLUMN IF NOT EXISTS {EXTRA_COLUMN} JSONB",
+]
+
+# Derived tables, created before indexes. Keep in sync with scripts/init-db.sql.
+TABLES: List[str] = [
+    """
+    CREATE TABLE IF NOT EXISTS weather_daily_rollup (
+        latitude NUMERIC(10,6) NOT NULL,
+        longitude NUMERIC(10,6) NOT NULL,
+        day DATE NOT NULL,
+        is_forecast BOOLEAN NOT NULL,
+        hours INTEGER NOT NULL,
+        temperature_min NUMERIC,
+        temperature_max NUMERIC,
+        temperature_mean NUMERIC,
+        wind_speed_min NUMERIC,
+        wind_speed_max NUMERIC,
+        wind_speed_mean NUMERIC,
+        humidity_min NUMERIC,
+        humidity_max NUMERIC,
+        humidity_mean NUMERIC,
+        updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+        PRIMARY KEY (latitude, longitude, day, is_forecast)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS weather_locations (
+        latitude NUMERIC(10,6) NOT NULL,
+        longitude NUMERIC(10,6) NOT NULL,
+        first_loaded_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+        PRIMARY KEY (latitude, longitude)
+    )
+    """,
+] + AUDIT_TABLES
+
+# (name, definition) pairs. Definitions are appended to
+# "CREATE INDEX CONCURRENTLY IF NOT EXISTS <name>" so they can be rolled out
+# against a live table without blocking the hourly inserts.
+INDEXES: List[Tuple[str, str]] = [
+    # Latest observation per location: index-only scan of observed rows,
+    # newest first within each (latitude, longitude).
+    (
+        "idx_weather_observed_latest",
+        """
+        ON weather_data (latitude, longitude, time_stamp DESC)
+        INCLUDE (temperature, wind_speed, humidity, precipitation_type)
+        WHERE NOT is_forecast
+        """,
+    ),
+    # -24h..+5d series and windowed aggregates for one location: index-only
+    # range scan over (latitude, longitude, time_stamp).
+    (
+        "idx_weather_location_series",
+        """
+        ON weather_data (latitude, longitude, time_stamp)
+        INCLUDE (is_forecast, temperature, wind_speed, humidity, precipitation_type)
+        """,
+    ),
+    # Incremental Parquet export (rows ingested since the last watermark).
+    # ingestion_timestamp follows insertion order, so a BRIN index stays a
+    # few pages and skips every block outside the window.
+    (
+        "idx_weather_ingestion_brin",
+        """
+        ON weather_data USING brin (ingestion_timestamp)
+        """,
+    ),
+    # Nearest ingested location (KNN ``<->`` ordering over a GiST point index).
+    (
+        "idx_weather_locations_point",
+        """
+        ON weather_locations USING gist (point(longitude::float8, latitude::float8))
+        """,
+    ),
+]
+
+# Indexes made redundant by INDEXES; dropping them saves a write per row.
+SUPERSEDED_INDEXES: List[str] = [
+    "idx_weather_location_time",
+]
+
+# weather_data is insert-mostly, so make autovacuum set the visibility map
+# (which index-only scans depend on) after inserts rather than only after
+# updates/deletes.
+TABLE_SETTINGS = """
+ALTER TABLE weather_data SET (
+    autovacuum_vacuum_insert_scale_factor = 0.05,
+    autovacuum_analyze_scale_factor = 0.05
+)
+"""
+
+
+def index_statements() -> List[str]:
+    """CREATE INDEX statements for every managed index."""
+    return [
+        f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} {definition.strip()}"
+        for name, definition in INDEXES
+    ]
+
+
+def ensure_schema(
+    db_config: Dict[str, Any],
+    drop_superseded: bool = True,
+    backfill_rollups: bool = False,
+    promote_fields: Sequence[str] = (),
+) -> None:
+    """
+    Bring an existing database up to the current table and index layout.
+
+    Safe to run repeatedly; CONCURRENTLY requires autocommit, so each
+    statement runs outside a transaction.
+    """
+    engine = create_engine(
+        build_db_url(db_config),
+        isolation_level="AUTOCOMMIT",
+        future=True,
+    )
+
+    try:
+        with engine.connect() as conn:
+            for statement in COLUMNS + TABLES:
+                conn.execute(text(statement))
+
+            conn.execute(text(TABLE_SETTINGS))
+
+            # An interrupted CONCURRENTLY build leaves an INVALID index that
+            # IF NOT EXISTS would otherwise keep forever.
+            invalid = conn.execute(
+                text(
+                    "SELECT c.relname FROM pg_index i "
+                    "JOIN pg_class c ON c.oid = i.indexrelid "
+                    "WHERE NOT i.indisvalid AND c.relname = ANY(:names)"
+                ),
+                {"names": [name for name, _ in INDEXES]},
+            ).scalars().all()
+            for name in invalid:
+                logger.warning("Schema: rebuilding invalid index %s", name)
+                conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+
+            for statement in index_statements():
+                logger.info("Schema: %s", " ".join(statement.split()))
+                conn.execute(text(statement))
+
+            if drop_superseded:
+                for name in SUPERSEDED_INDEXES:
+                    logger.info("Schema: dropping superseded index %s", name)
+                    conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+
+            for field in promote_fields:
+                logger.info("Schema: promoting extra field %s to a column", field)
+                conn.execute(text(promote_field_statement(field)))
+
+            if backfill_rollups:
+                backfill_daily_rollup(conn)
+
+        logger.info("Schema: up to date")
+    except Exception:
+        logger.exception("Schema: migration failed")
+        raise
+    finally:
+        engine.dispose()
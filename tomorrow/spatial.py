@@ -0,0 +1,121 @@
+import logging
+import math
+from collections import defaultdict
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+def haversine_km(lat1: Any, lon1: Any, lat2: Any, lon2: Any) -> Any:
+    """Great-circle distance; works on scalars and NumPy arrays."""
+    lat1, lon1, lat2, lon2 = map(np.radians, (lat1, lon1, lat2, lon2))
+    a = (
+        np.sin((lat2 - lat1) / 2) ** 2
+        + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+
+
+class LocationIndex:
+    """
+    In-memory uniform-grid spatial index for nearest-location lookups.
+
+    Points are bucketed into ``cell_deg`` square cells; a lookup scans rings
+    of cells outward from the query cell and stops once no unvisited cell can
+    hold a closer point, so cost depends on local density, not on the total
+    number of points.
+    """
+
+    MAX_RINGS = 8
+
+    def __init__(
+        self,
+        lats: Iterable[float],
+        lons: Iterable[float],
+        cell_deg: Optional[float] = None,
+    ):
+        self.lats = np.asarray(list(lats), dtype=np.float64)
+        self.lons = np.asarray(list(lons), dtype=np.float64)
+        if self.lats.size == 0:
+            raise ValueError("LocationIndex needs at least one location")
+
+        if cell_deg is None:
+            # Aim for a handful of points per cell.
+            span = max(np.ptp(self.lats), np.ptp(self.lons), 1e-6)
+            cell_deg = max(span / math.sqrt(self.lats.size / 4), 1e-4)
+        self.cell_deg = cell_deg
+
+        cells: Dict[Tuple[int, int], List[int]] = defaultdict(list)
+        for i, key in enumerate(zip(self._cell(self.lats), self._cell(self.lons))):
+            cells[key].append(i)
+        self._cells = {k: np.asarray(v, dtype=np.int64) for k, v in cells.items()}
+
+        lat_keys = [k[0] for k in self._cells]
+        lon_keys = [k[1] for k in self._cells]
+        self._bounds = (min(lat_keys), max(lat_keys), min(lon_keys), max(lon_keys))
+
+    @classmethod
+    def from_locations(
+        cls,
+        locations: Iterable[Dict[str, Any]],
+        cell_deg: Optional[float] = None,
+    ) -> "LocationIndex":
+        points = [(float(l["lat"]), float(l["lon"])) for l in locations]
+        return cls([p[0] for p in points], [p[1] for p in points], cell_deg)
+
+    def __len__(self) -> int:
+        return int(self.lats.size)
+
+    def _cell(self, values: Any) -> Any:
+        return np.floor(np.asarray(values) / self.cell_deg).astype(np.int64)
+
+    def _ring(self, ci: int, cj: int, r: int) -> Iterator[np.ndarray]:
+        if r == 0:
+            cell = self._cells.get((ci, cj))
+            if cell is not None:
+                yield cell
+            return
+        for di in range(-r, r + 1):
+            for dj in (-r, r) if abs(di) != r else range(-r, r + 1):
+                cell = self._cells.get((ci + di, cj + dj))
+                if cell is not None:
+                    yield cell
+
+    def nearest(self, lat: float, lon: float) -> Tuple[float, float, float]:
+        """Return (lat, lon, distance_km) of the closest indexed location."""
+        ci, cj = int(self._cell(lat)), int(self._cell(lon))
+        # Scale longitude differences so the search metric tracks km.
+        lon_scale = max(math.cos(math.radians(lat)), 1e-6)
+
+        min_i, max_i, min_j, max_j = self._bounds
+        rings = max(abs(ci - min_i), abs(ci - max_i), abs(cj - min_j), abs(cj - max_j))
+        outside = max(min_i - ci, ci - max_i, min_j - cj, cj - max_j, 0)
+
+        if outside > self.MAX_RINGS:
+            # Far outside the indexed area: a vectorised scan is cheaper.
+            dist = np.hypot(self.lats - lat, (self.lons - lon) * lon_scale)
+            best_index = int(np.argmin(dist))
+        else:
+            best_index, best_dist = -1, math.inf
+            for r in range(rings + 1):
+                cells = list(self._ring(ci, cj, r))
+                if cells:
+                    candidates = np.concatenate(cells) if len(cells) > 1 else cells[0]
+                    dist = np.hypot(
+                        self.lats[candidates] - lat,
+                        (self.lons[candidates] - lon) * lon_scale,
+                    )
+                    k = int(np.argmin(dist))
+                    if dist[k] < best_dist:
+                        best_index, best_dist = int(candidates[k]), float(dist[k])
+
+                # Anything outside ring r is more than r cells away on some axis.
+                if best_index >= 0 and best_dist <= r * self.cell_deg * lon_scale:
+                    break
+
+        lat_n, lon_n = float(self.lats[best_index]), float(self.lons[best_index])
+        return lat_n, lon_n, float(haversine_km(lat, lon, lat_n, lon_n))
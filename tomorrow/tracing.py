@@ -0,0 +1,350 @@
+import contextvars
+import json
+import logging
+import os
+import secrets
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Callable, Dict, Any, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+SERVICE_NAME = "tomorrow-etl"
+
+# Finished spans held before they are flushed mid-run (several per location).
+DEFAULT_MAX_BUFFERED = 1024
+
+# OTLP status codes.
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+_current_span: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar(
+    "tomorrow_current_span", default=None
+)
+
+
+class Span:
+    """One timed operation; serialized as an OTLP/JSON span."""
+
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "start_ns", "end_ns",
+                 "attributes", "status", "error")
+
+    def __init__(
+        self,
+        name: str,
+        trace_id: str,
+        parent_id: Optional[str] = None,
+        attributes: Optional[Dict[str, Any]] = None,
+        start_ns: Optional[int] = None,
+    ):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.start_ns = time.time_ns() if start_ns is None else start_ns
+        self.end_ns: Optional[int] = None
+        self.attributes: Dict[str, Any] = dict(attributes or {})
+        self.status = STATUS_OK
+        self.error: Optional[str] = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def record_error(self, exc: BaseException) -> None:
+        self.status = STATUS_ERROR
+        self.error = repr(exc)
+
+    @property
+    def duration_ms(self) -> float:
+        end_ns = time.time_ns() if self.end_ns is None else self.end_ns
+        return (end_ns - self.start_ns) / 1e6
+
+    def to_otlp(self) -> Dict[str, Any]:
+        span: Dict[str, Any] = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": 1,  # SPAN_KIND_INTERNAL
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.start_ns if self.end_ns is None else self.end_ns),
+            "attributes": [_otlp_attribute(k, v) for k, v in self.attributes.items()],
+            "status": {"code": self.status},
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        if self.error:
+            span["status"]["message"] = self.error
+        return span
+
+
+def _otlp_attribute(key: str, value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        typed = {"boolValue": value}
+    elif isinstance(value, int):
+        typed = {"intValue": str(value)}
+    elif isinstance(value, float):
+        typed = {"doubleValue": value}
+    else:
+        typed = {"stringValue": str(value)}
+    return {"key": key, "value": typed}
+
+
+def _attribute_value(attribute: Dict[str, Any]) -> Any:
+    value = attribute["value"]
+    if "intValue" in value:
+        return int(value["intValue"])
+    return next(iter(value.values()))
+
+
+# One OTLP/JSON ExportTraceServiceRequest, split where the spans go.
+_PAYLOAD_HEAD, _PAYLOAD_TAIL = json.dumps(
+    {
+        "resourceSpans": [
+            {
+                "resource": {"attributes": [_otlp_attribute("service.name", SERVICE_NAME)]},
+                "scopeSpans": [{"scope": {"name": __name__}, "spans": [None]}],
+            }
+        ]
+    },
+    separators=(",", ":"),
+).split("null")
+
+
+def _payload_parts(spans: List[Span]) -> Iterator[str]:
+    """The export payload in pieces, serializing one span at a time."""
+    yield _PAYLOAD_HEAD
+    for i, span in enumerate(spans):
+        if i:
+            yield ","
+        yield json.dumps(span.to_otlp(), separators=(",", ":"))
+    yield _PAYLOAD_TAIL
+
+
+class Tracer:
+    """
+    Minimal OpenTelemetry-compatible tracer for ETL runs.
+
+    Spans nest through a context variable within a thread; work handed to
+    other threads passes its parent span explicitly. ``flush`` writes the
+    finished spans as one OTLP/JSON ``ExportTraceServiceRequest`` line to
+    ``path`` and, if configured, POSTs it to an OTLP/HTTP collector
+    ``endpoint`` (``.../v1/traces``). It also runs every ``max_buffered``
+    finished spans, so memory does not grow with the number of locations; a
+    large run then spans several lines with the same trace id, which
+    ``load_runs`` joins. ``on_end`` sees every finished span (the run audit).
+    """
+
+    enabled = True
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        endpoint: Optional[str] = None,
+        max_buffered: int = DEFAULT_MAX_BUFFERED,
+        on_end: Optional[Callable[[Span], None]] = None,
+    ):
+        self.path = path
+        self.endpoint = endpoint
+        self.max_buffered = max_buffered
+        self.on_end = on_end
+        self._lock = threading.Lock()
+        self._finished: List[Span] = []
+
+    def start_span(
+        self,
+        name: str,
+        parent: Optional[Span] = None,
+        start_ns: Optional[int] = None,
+        **attributes: Any,
+    ) -> Span:
+        parent = parent or _current_span.get()
+        trace_id = parent.trace_id if parent else secrets.token_hex(16)
+        return Span(
+            name,
+            trace_id,
+            parent.span_id if parent else None,
+            attributes,
+            start_ns=start_ns,
+        )
+
+    def end_span(self, span: Span, end_ns: Optional[int] = None) -> None:
+        span.end_ns = time.time_ns() if end_ns is None else end_ns
+        if self.on_end is not None:
+            self.on_end(span)
+        with self._lock:
+            self._finished.append(span)
+            full = len(self._finished) >= self.max_buffered
+        if full:
+            self.flush()
+
+    @contextmanager
+    def span(self, name: str, parent: Optional[Span] = None, **attributes: Any) -> Iterator[Span]:
+        span = self.start_span(name, parent, **attributes)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as exc:
+            span.record_error(exc)
+            raise
+        finally:
+            _current_span.reset(token)
+            self.end_span(span)
+
+    @contextmanager
+    def activate(self, span: Span) -> Iterator[Span]:
+        """Make an already started span the parent for spans in this thread."""
+        token = _current_span.set(span)
+        try:
+            yield span
+        finally:
+            _current_span.reset(token)
+
+    def spans(self) -> List[Span]:
+        """Finished spans not yet flushed."""
+        with self._lock:
+            return list(self._finished)
+
+    def flush(self) -> int:
+        """Export and forget all finished spans; returns how many were exported."""
+        with self._lock:
+            spans, self._finished = self._finished, []
+        if not spans:
+            return 0
+
+        if self.path:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            with open(self.path, "a") as f:
+                f.writelines(_payload_parts(spans))
+                f.write("\n")
+
+        if self.endpoint:
+            try:
+                import requests
+
+                requests.post(
+                    self.endpoint,
+                    data="".join(_payload_parts(spans)),
+                    headers={"Content-Type": "application/json"},
+                    timeout=5,
+                ).raise_for_status()
+            except Exception:
+                logger.exception("Tracing: export to %s failed", self.endpoint)
+
+        return len(spans)
+
+
+class NoopTracer(Tracer):
+    """Tracer used when tracing is disabled; spans are created but dropped."""
+
+    enabled = False
+
+    def end_span(self, span: Span, end_ns: Optional[int] = None) -> None:
+        span.end_ns = time.time_ns() if end_ns is None else end_ns
+        if self.on_end is not None:
+            self.on_end(span)
+
+    def flush(self) -> int:
+        return 0
+
+
+def build_tracer(
+    tracing_config: Optional[Dict[str, Any]],
+    on_end: Optional[Callable[[Span], None]] = None,
+) -> Tracer:
+    """
+    Create a Tracer from the optional ``tracing`` config section. ``on_end``
+    (used by the run audit) sees every finished span even when tracing
+    export is disabled.
+    """
+    if not tracing_config or not tracing_config.get("enabled", True):
+        return NoopTracer(on_end=on_end)
+    return Tracer(
+        path=tracing_config.get("path"),
+        endpoint=tracing_config.get("endpoint"),
+        on_end=on_end,
+    )
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+# --- reporting ---
+
+def load_runs(path: str, last: int = 24) -> List[List[Dict[str, Any]]]:
+    """
+    Spans (flattened, attributes decoded) of the last ``last`` exported
+    runs. A run flushed in several lines is joined by its trace id.
+    """
+    if not os.path.exists(path):
+        raise RuntimeError(f"Trace file not found: {path}")
+
+    with open(path) as f:
+        lines = f.readlines()
+
+    # Newest line first; a run's lines are contiguous.
+    runs: Dict[str, List[Dict[str, Any]]] = {}
+    for line in reversed(lines):
+        spans = []
+        trace_ids = set()
+        for resource in json.loads(line).get("resourceSpans", []):
+            for scope in resource.get("scopeSpans", []):
+                for span in scope.get("spans", []):
+                    trace_ids.add(span["traceId"])
+                    spans.append(
+                        {
+                            "name": span["name"],
+                            "duration_ms": (
+                                int(span["endTimeUnixNano"]) - int(span["startTimeUnixNano"])
+                            ) / 1e6,
+                            "error": span.get("status", {}).get("code") == STATUS_ERROR,
+                            "attributes": {
+                                a["key"]: _attribute_value(a) for a in span.get("attributes", [])
+                            },
+                        }
+                    )
+        trace_id = min(trace_ids, default="")
+        if trace_id not in runs and len(runs) == last:
+            break
+        runs[trace_id] = spans + runs.get(trace_id, [])
+    return list(reversed(runs.values()))
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def summarize(runs: List[List[Dict[str, Any]]], top: int = 10) -> Dict[str, Any]:
+    """Per-stage latency percentiles and the slowest locations across runs."""
+    stages: Dict[str, List[float]] = defaultdict(list)
+    errors: Dict[str, int] = defaultdict(int)
+    locations: Dict[str, List[float]] = defaultdict(list)
+
+    for spans in runs:
+        for span in spans:
+            stages[span["name"]].append(span["duration_ms"])
+            errors[span["name"]] += span["error"]
+            if span["name"] == "location":
+                locations[span["attributes"].get("location", "?")].append(span["duration_ms"])
+
+    return {
+        "runs": len(runs),
+        "stages": {
+            name: {
+                "count": len(values),
+                "errors": errors[name],
+                "p50_ms": round(_percentile(values, 50), 1),
+                "p95_ms": round(_percentile(values, 95), 1),
+                "max_ms": round(max(values), 1),
+            }
+            for name, values in sorted(stages.items())
+        },
+        "slowest_locations": [
+            {"location": loc, "runs": len(values), "max_ms": round(max(values), 1),
+             "mean_ms": round(sum(values) / len(values), 1)}
+            for loc, values in sorted(locations.items(), key=lambda kv: -max(kv[1]))[:top]
+        ],
+    }
@@ -0,0 +1,124 @@
+import logging
+import threading
+from datetime import datetime
+from typing import List, Dict, Any, Iterable, Optional, Tuple
+
+from .fields import cadence_only_fields, carries_fields
+
+logger = logging.getLogger(__name__)
+
+# Newest stored observed / forecast time_stamp of one location: two
+# backward probes of idx_weather_location_series.
+_MARKS = """
+    (SELECT MAX(time_stamp) FROM weather_data
+     WHERE latitude = {lat} AND longitude = {lon} AND NOT is_forecast),
+    (SELECT MAX(time_stamp) FROM weather_data
+     WHERE latitude = {lat} AND longitude = {lon} AND is_forecast)
+"""
+
+WATERMARK_SQL = "SELECT" + _MARKS.format(lat=":lat", lon=":lon")
+
+# asyncpg (tomorrow.async_db) placeholders.
+WATERMARK_ASYNC_SQL = "SELECT" + _MARKS.format(lat="$1", lon="$2")
+
+# Every location in the registry at once: the same two probes per location,
+# in one round trip.
+ALL_WATERMARKS_SQL = (
+    "SELECT l.latitude::float8, l.longitude::float8,"
+    + _MARKS.format(lat="l.latitude", lon="l.longitude")
+    + "FROM weather_locations AS l"
+)
+
+Location = Tuple[Any, Any]
+
+
+class LoadWatermarks:
+    """
+    Newest stored ``time_stamp`` per (location, is_forecast), used to drop
+    rows that are already in weather_data before an insert is built.
+
+    Every load sends a contiguous hourly window, so a row at or below its
+    location's watermark is already stored. Re-sent rows only change the
+    stored one when they carry a field it lacks (ON CONFLICT merge), which
+    happens for ``merge_fields``, the fields of cadences slower than
+    hourly: rows with a value for one of them are always kept.
+
+    One instance serves a whole ETL run, retry passes included. The writer
+    that first meets an unknown location loads every registered location's
+    watermarks in one query (``claim_bulk_load``); locations missing from
+    the registry are read one by one. Watermarks advance after each commit.
+    """
+
+    def __init__(self, merge_fields: Iterable[str] = ()) -> None:
+        self._lock = threading.Lock()
+        self._marks: Dict[Location, Tuple[Optional[datetime], Optional[datetime]]] = {}
+        self._bulk_claimed = False
+        self._carries_merge_field = carries_fields(merge_fields)
+
+    def unknown(self, rows: Iterable[Dict[str, Any]]) -> List[Location]:
+        """Locations in ``rows`` whose watermarks have not been loaded yet."""
+        with self._lock:
+            return list(
+                {(r["latitude"], r["longitude"]) for r in rows} - self._marks.keys()
+            )
+
+    def claim_bulk_load(self) -> bool:
+        """True for the one caller that should load every stored watermark."""
+        with self._lock:
+            claimed, self._bulk_claimed = self._bulk_claimed, True
+            return not claimed
+
+    def set(
+        self,
+        location: Location,
+        observed: Optional[datetime],
+        forecast: Optional[datetime],
+    ) -> None:
+        with self._lock:
+            self._marks[location] = (observed, forecast)
+
+    def filter(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Rows newer than their location's watermark, or carrying a merge field."""
+        kept = []
+        with self._lock:
+            for row in rows:
+                mark = self._marks.get((row["latitude"], row["longitude"]), (None, None))[
+                    1 if row["is_forecast"] else 0
+                ]
+                stamp = row["time_stamp"]
+                if (
+                    mark is None
+                    or not isinstance(stamp, datetime)
+                    or stamp > mark
+                    or self._carries_merge_field(row)
+                ):
+                    kept.append(row)
+        return kept
+
+    def advance(self, rows: Iterable[Dict[str, Any]]) -> None:
+        """Raise watermarks to the newest rows of a committed batch."""
+        with self._lock:
+            for row in rows:
+                stamp = row["time_stamp"]
+                if not isinstance(stamp, datetime):
+                    continue
+                key = (row["latitude"], row["longitude"])
+                observed, forecast = self._marks.get(key, (None, None))
+                if row["is_forecast"]:
+                    forecast = stamp if forecast is None else max(forecast, stamp)
+                else:
+                    observed = stamp if observed is None else max(observed, stamp)
+                self._marks[key] = (observed, forecast)
+
+
+def build_watermarks(
+    watermark_config: Optional[Dict[str, Any]],
+    cadences: Optional[Iterable[Any]] = None,
+) -> Optional[LoadWatermarks]:
+    """
+    Create LoadWatermarks from the optional ``watermarks`` config section;
+    ``cadences`` (``api.cadences``) decides which fields bypass the filter.
+    """
+    if not watermark_config or not watermark_config.get("enabled", True):
+        return None
+    return LoadWatermarks(cadence_only_fields(cadences or ()))